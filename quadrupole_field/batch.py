@@ -0,0 +1,439 @@
+"""Batch runner for many simulation configurations.
+
+A manifest lists jobs, each a set of the configuration models of the command line
+interface, in JSON or TOML:
+
+    [defaults.simulation]
+    total_time = 20.0
+
+    [[jobs]]
+    name = "q_0.3"
+    trap = {target_q = 0.3}
+
+    [[jobs]]
+    name = "q_0.6"
+    trap = {target_q = 0.6}
+    particle = {mass = 2.0}
+
+Sections are ``simulation``, ``trap``, ``particle``, ``output`` and ``initial``, with
+the fields of ``SimulationConfig``, ``TrapConfig``, ``ParticleConfig``,
+``OutputConfig`` and ``InitialConditionsConfig``; ``defaults`` applies to every job.
+Every job is validated before any of them runs. Jobs then run headless on a process
+pool, whose workers stay alive across jobs, so imports and cached tables are loaded
+once per worker. Each job writes its results and log to the output directory. A job
+that fails on a transient error, such as a full disk or a crashed worker, is retried;
+a failed job is reported without stopping the others:
+
+    python -m quadrupole_field.batch manifest.toml --output_dir results --workers 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import tomllib
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from quadrupole_field.core.trap import LossReason
+from quadrupole_field.simulation.config import (
+    InitialConditionsConfig,
+    OutputConfig,
+    ParticleConfig,
+    SimulationConfig,
+    TrapConfig,
+)
+
+# Manifest section name -> configuration model
+SECTIONS: dict[str, type[BaseModel]] = {
+    "simulation": SimulationConfig,
+    "trap": TrapConfig,
+    "particle": ParticleConfig,
+    "output": OutputConfig,
+    "initial": InitialConditionsConfig,
+}
+
+# Output fields naming files a job writes, which no two jobs may share
+OUTPUT_PATH_FIELDS: tuple[str, ...] = ("npz_file", "trajectory_dir", "checkpoint_file")
+
+# Failures that may not recur on another attempt; any other error fails the job
+TRANSIENT_ERRORS: tuple[type[Exception], ...] = (OSError, BrokenProcessPool)
+
+SUMMARY_FILENAME = "summary.csv"
+
+
+@dataclass
+class BatchJob:
+    """One validated configuration set of a manifest."""
+
+    name: str
+    sim_config: SimulationConfig
+    trap_config: TrapConfig
+    particle_config: ParticleConfig
+    output_config: OutputConfig
+    initial_config: InitialConditionsConfig
+
+
+@dataclass
+class JobResult:
+    """Outcome of a batch job."""
+
+    name: str
+    status: str  # "ok" or "failed"
+    attempts: int
+    wall_time: float  # Seconds spent on all attempts
+    results_file: str | None
+    n_samples: int | None = None
+    loss_reason: str | None = None
+    loss_time: float | None = None
+    error: str | None = None  # Last error message of a failed job
+
+
+def read_manifest(path: str | Path) -> dict[str, Any]:
+    """Read a JSON or TOML manifest, chosen by the file extension."""
+    path = Path(path)
+    if path.suffix == ".toml":
+        with open(path, "rb") as file:
+            return tomllib.load(file)
+    with open(path) as file:
+        return json.load(file)
+
+
+def _job_name(index: int, entry: dict[str, Any]) -> str:
+    return str(entry.get("name", f"job_{index:04d}"))
+
+
+def load_jobs(manifest: dict[str, Any]) -> list[BatchJob]:
+    """
+    Build and validate the jobs of a manifest.
+
+    All problems are collected before raising, so a manifest can be fixed in one go.
+    :param manifest: Parsed manifest with ``jobs`` and optional ``defaults``.
+    :return: Validated jobs in manifest order.
+    :raises ValueError: If any job is invalid, listing every problem.
+    """
+    defaults = manifest.get("defaults", {})
+    entries = manifest.get("jobs", [])
+    errors = []
+    if not entries:
+        errors.append("manifest has no jobs")
+    if not isinstance(defaults, dict):
+        errors.append("defaults: must be a table")
+        defaults = {}
+    for section, values in defaults.items():
+        if section not in SECTIONS:
+            errors.append(f"defaults: unknown section {section!r}")
+        elif not isinstance(values, dict):
+            errors.append(f"defaults: {section} must be a table")
+    defaults = {
+        section: values
+        for section, values in defaults.items()
+        if section in SECTIONS and isinstance(values, dict)
+    }
+
+    jobs = []
+    names: set[str] = set()
+    output_paths: dict[tuple[str, str], str] = {}  # (field, path) -> job name
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append(f"job_{index:04d}: must be a table")
+            continue
+        name = _job_name(index, entry)
+        if name in names:
+            errors.append(f"{name}: duplicate job name")
+        if not name or Path(name).name != name:
+            errors.append(f"{name!r}: job names must be plain file names")
+        names.add(name)
+
+        unknown = set(entry) - set(SECTIONS) - {"name"}
+        if unknown:
+            errors.append(f"{name}: unknown sections {sorted(unknown)}")
+
+        configs: dict[str, Any] = {}
+        for section, model in SECTIONS.items():
+            if not isinstance(entry.get(section, {}), dict):
+                errors.append(f"{name}: {section} must be a table")
+                continue
+            values = {**defaults.get(section, {}), **entry.get(section, {})}
+            unknown = set(values) - set(model.model_fields)
+            if unknown:
+                errors.append(f"{name}: unknown {section} fields {sorted(unknown)}")
+            try:
+                configs[section] = model(**values)
+            except ValidationError as error:
+                for detail in error.errors():
+                    field = ".".join(str(part) for part in detail["loc"])
+                    errors.append(f"{name}: {section}.{field}: {detail['msg']}")
+
+        if "output" in configs:
+            for field in OUTPUT_PATH_FIELDS:
+                path = getattr(configs["output"], field)
+                if path is None:
+                    continue
+                key = (field, os.path.normpath(path))
+                if key in output_paths:
+                    errors.append(
+                        f"{name}: output.{field} {path!r} is also written by "
+                        f"{output_paths[key]}"
+                    )
+                else:
+                    output_paths[key] = name
+
+            # Combinations that run_simulation would only reject once the job runs
+            output = configs["output"]
+            if output.live:
+                errors.append(
+                    f"{name}: output.live needs a display, batch jobs run headless"
+                )
+            if (
+                "simulation" in configs
+                and configs["simulation"].dimensionless
+                and output.checkpoint_file is not None
+            ):
+                errors.append(
+                    f"{name}: simulation.dimensionless runs cannot be checkpointed, "
+                    "drop output.checkpoint_file"
+                )
+
+        if len(configs) == len(SECTIONS):
+            jobs.append(
+                BatchJob(
+                    name,
+                    configs["simulation"],
+                    configs["trap"],
+                    configs["particle"],
+                    configs["output"],
+                    configs["initial"],
+                )
+            )
+
+    if errors:
+        raise ValueError("Invalid manifest:\n  " + "\n  ".join(errors))
+    return jobs
+
+
+def _summarize_results(result: JobResult) -> None:
+    """Fill in the outcome of a finished job from its results file."""
+    if result.results_file is None or not os.path.exists(result.results_file):
+        return
+    with np.load(result.results_file) as data:
+        result.n_samples = len(data["times"])
+        reasons = np.atleast_1d(data["loss_reason"])
+        loss_times = np.atleast_1d(data["loss_time"])
+    if len(reasons) == 1:
+        result.loss_reason = LossReason(int(reasons[0])).name.lower()
+        result.loss_time = None if np.isnan(loss_times[0]) else float(loss_times[0])
+    else:
+        result.loss_reason = f"{np.count_nonzero(reasons)}/{len(reasons)} lost"
+
+
+def run_job(job: BatchJob, output_dir: str, retries: int) -> JobResult:
+    """
+    Run a job headless, retrying attempts that fail on a ``TRANSIENT_ERRORS`` error.
+
+    Module-level so that it can be pickled to worker processes. The job's output
+    is written to ``<name>.log`` in the output directory.
+    :param job: Job to run.
+    :param output_dir: Directory for the results and log files.
+    :param retries: Number of further attempts after a transient failure.
+    :return: Outcome of the job.
+    """
+    # Imported here so that the batch module itself stays light to import
+    from quadrupole_field.main import run_simulation
+
+    directory = Path(output_dir)
+    output_config = job.output_config.model_copy(
+        update={
+            "no_display": True,
+            "npz_file": job.output_config.npz_file
+            or str(directory / f"{job.name}.npz"),
+        }
+    )
+    # Streamed runs keep their trajectory in trajectory_dir instead
+    results_file = (
+        output_config.npz_file if output_config.trajectory_dir is None else None
+    )
+
+    start = time.perf_counter()
+    error = None
+    attempts = 0
+    with open(directory / f"{job.name}.log", "w") as log:
+        for attempts in range(1, retries + 2):
+            try:
+                with redirect_stdout(log), redirect_stderr(log):
+                    run_simulation(
+                        job.sim_config,
+                        job.trap_config,
+                        job.particle_config,
+                        output_config,
+                        job.initial_config,
+                    )
+            except Exception as exception:
+                error = f"{type(exception).__name__}: {exception}"
+                log.write(f"\nAttempt {attempts} failed:\n{traceback.format_exc()}")
+                log.flush()
+                # Invalid configurations and bugs fail the same way every time
+                if not isinstance(exception, TRANSIENT_ERRORS):
+                    break
+            else:
+                error = None
+                break
+
+    result = JobResult(
+        name=job.name,
+        status="failed" if error is not None else "ok",
+        attempts=attempts,
+        wall_time=time.perf_counter() - start,
+        results_file=results_file if error is None else None,
+        error=error,
+    )
+    if error is None:
+        _summarize_results(result)
+    return result
+
+
+def run_batch(
+    jobs: list[BatchJob],
+    output_dir: str | Path,
+    max_workers: int | None = None,
+    retries: int = 1,
+) -> list[JobResult]:
+    """
+    Run jobs on a process pool and write a summary table.
+
+    :param jobs: Validated jobs, e.g. from ``load_jobs``.
+    :param output_dir: Directory for results, logs and ``summary.csv``.
+    :param max_workers: Number of worker processes, all cores if omitted; 1 runs
+        the jobs in the current process.
+    :param retries: Number of further attempts of a job failing on a transient error.
+    :return: Outcome of every job, in manifest order.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+    max_workers = min(max_workers, len(jobs))
+
+    results: dict[str, JobResult] = {}
+
+    def report(result: JobResult) -> None:
+        results[result.name] = result
+        message = f"[{len(results)}/{len(jobs)}] {result.name}: {result.status}"
+        if result.error is not None:
+            message += f" after {result.attempts} attempt(s) ({result.error})"
+        print(message, flush=True)
+
+    def report_failure(job: BatchJob, attempts: int, exception: Exception) -> None:
+        report(
+            JobResult(
+                name=job.name,
+                status="failed",
+                attempts=attempts,
+                wall_time=0.0,
+                results_file=None,
+                error=f"{type(exception).__name__}: {exception}",
+            )
+        )
+
+    if max_workers <= 1:
+        for job in jobs:
+            report(run_job(job, str(output_dir), retries))
+    else:
+        crashes = {job.name: 0 for job in jobs}
+        pending = list(jobs)
+        while pending:
+            # A worker that dies, e.g. killed for running out of memory, breaks the
+            # pool and fails every unfinished job with it. Those jobs go to a fresh
+            # pool, each crash counting as one of their attempts.
+            resubmit = []
+            with ProcessPoolExecutor(min(max_workers, len(pending))) as executor:
+                futures = {
+                    executor.submit(run_job, job, str(output_dir), retries): job
+                    for job in pending
+                }
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        report(future.result())
+                    except BrokenProcessPool as exception:
+                        crashes[job.name] += 1
+                        if crashes[job.name] > retries:
+                            report_failure(job, crashes[job.name], exception)
+                        else:
+                            resubmit.append(job)
+                    except Exception as exception:
+                        report_failure(job, 1, exception)
+            if resubmit:
+                print(
+                    f"Worker pool broke, resubmitting {len(resubmit)} job(s)",
+                    flush=True,
+                )
+            pending = resubmit
+
+    ordered = [results[job.name] for job in jobs]
+    write_summary(ordered, output_dir / SUMMARY_FILENAME)
+    return ordered
+
+
+def write_summary(results: list[JobResult], filename: str | Path) -> None:
+    """Write the outcome of every job as a CSV table."""
+    with open(filename, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(asdict(results[0])))
+        writer.writeheader()
+        for result in results:
+            writer.writerow(asdict(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a manifest of Paul trap jobs")
+    parser.add_argument("manifest", help="JSON or TOML manifest of jobs")
+    parser.add_argument(
+        "--output_dir",
+        default="batch_results",
+        help="Directory for per-job results and logs and the summary table",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Number of worker processes, all cores if omitted"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=1,
+        help="Number of further attempts of a job failing on a transient error",
+    )
+    parser.add_argument(
+        "--validate_only",
+        action="store_true",
+        help="Check the manifest without running any job",
+    )
+    args = parser.parse_args()
+
+    try:
+        jobs = load_jobs(read_manifest(args.manifest))
+    except ValueError as error:
+        sys.exit(str(error))
+    print(f"{len(jobs)} valid job(s) in {args.manifest}")
+    if args.validate_only:
+        return
+
+    results = run_batch(jobs, args.output_dir, args.workers, args.retries)
+    n_failed = sum(result.status != "ok" for result in results)
+    print(
+        f"\n{len(results) - n_failed} succeeded, {n_failed} failed; summary written "
+        f"to {Path(args.output_dir) / SUMMARY_FILENAME}"
+    )
+    if n_failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""Performance benchmarks.
+
+Times the hot paths of the simulation, visualization and data analysis over a range
+of problem sizes and reports throughputs: field points, integration steps, frames
+and fits per second. Results are written as JSON, and a run can be compared against
+a stored baseline, failing when any benchmark slowed down by more than a threshold:
+
+    python -m quadrupole_field.benchmark --output baseline.json
+    python -m quadrupole_field.benchmark --baseline baseline.json --threshold 0.2
+
+Each case is timed with ``timeit``: the number of calls is grown until one batch
+takes at least ``--min_time`` seconds, and the best of ``--repeat`` batches is kept,
+which filters out most of the noise from other processes.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any
+
+import numpy as np
+
+from quadrupole_field.core.rod import Rod
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.simulation.config import (
+    ParticleConfig,
+    SimulationConfig,
+    TrapConfig,
+)
+from quadrupole_field.simulation.ensemble import EnsembleSimulation
+from quadrupole_field.simulation.schedule import SineSchedule
+from quadrupole_field.simulation.simulation import Simulation
+from quadrupole_field.utils.initialization import get_initial_parameters
+
+# Relative slowdown against the baseline above which a benchmark fails
+DEFAULT_THRESHOLD: float = 0.25
+
+# Minimum duration of one timed batch of calls (s)
+DEFAULT_MIN_TIME: float = 0.2
+
+# Number of timed batches; the fastest one is reported
+DEFAULT_REPEAT: int = 3
+
+
+@dataclass
+class BenchmarkResult:
+    """Throughput of one benchmark at one problem size."""
+
+    name: str
+    size: str  # Problem size, e.g. "resolution=100"
+    unit: str  # Unit of the rate, e.g. "points/s"
+    rate: float  # Work items per second
+    seconds_per_call: float
+
+    @property
+    def key(self) -> str:
+        """Identifier matching results of the same case across runs."""
+        return f"{self.name}[{self.size}]"
+
+
+@dataclass
+class BenchmarkCase:
+    """One timed function call and the amount of work it does."""
+
+    size: str
+    call: Callable[[], Any]
+    work: float  # Work items per call, in the unit of the benchmark
+
+
+def time_call(call: Callable[[], Any], min_time: float, repeat: int) -> float:
+    """Best time per call over ``repeat`` batches lasting at least ``min_time``."""
+    timer = timeit.Timer(call)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        # Aim slightly past min_time, at most a tenfold increase per round
+        number = int(number * min(10.0, 1.2 * min_time / max(elapsed, 1e-9))) + 1
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        best = min(best, timer.timeit(number) / number)
+    return best
+
+
+def _default_setup() -> tuple[TrapConfig, ParticleConfig, SimulationConfig, Any]:
+    """Default configuration and its stable initial conditions."""
+    trap_config = TrapConfig()
+    particle_config = ParticleConfig()
+    sim_config = SimulationConfig()
+    params = get_initial_parameters(
+        trap_config.rod_distance,
+        particle_config.charge,
+        particle_config.mass,
+        trap_config.driving_frequency,
+        trap_config.target_q,
+    )
+    return trap_config, particle_config, sim_config, params
+
+
+def _field_grid(a: float, resolution: int) -> tuple[np.ndarray, np.ndarray]:
+    """Square grid over the trap, as used by the field visualization."""
+    x = np.linspace(-1.5 * a, 1.5 * a, resolution)
+    return np.meshgrid(x, x)
+
+
+def rod_field_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``Rod.electric_field_at`` over grids of increasing resolution."""
+    rod = Rod((1.0, 0.0))
+    rod.set_voltage(100.0)
+    for resolution in (20, 100) if quick else (20, 100, 400):
+        X, Y = _field_grid(1.0, resolution)
+        yield BenchmarkCase(
+            f"resolution={resolution}",
+            partial(rod.electric_field_at, X, Y),
+            resolution**2,
+        )
+
+
+def trap_field_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``Trap.electric_field_at`` over grids of increasing resolution."""
+    trap = Trap(1.0)
+    trap.set_voltages(100.0 * trap.polarity)
+    for resolution in (20, 100) if quick else (20, 100, 400):
+        X, Y = _field_grid(1.0, resolution)
+        yield BenchmarkCase(
+            f"resolution={resolution}",
+            partial(trap.electric_field_at, X, Y),
+            resolution**2,
+        )
+
+
+def simulation_run_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``Simulation.run`` of a single particle for increasing durations."""
+    trap_config, particle_config, sim_config, params = _default_setup()
+
+    def run(total_time: float) -> None:
+        simulation = Simulation(
+            trap_config.rod_distance,
+            particle_config.charge,
+            particle_config.mass,
+            params.initial_position,
+            params.initial_velocity,
+            sim_config.dt,
+        )
+        schedule = SineSchedule(
+            params.voltage_amplitude,
+            params.driving_frequency,
+            simulation.trap.polarity,
+        )
+        simulation.run(schedule, total_time)
+
+    for total_time in (0.2, 1.0) if quick else (0.2, 1.0, 5.0):
+        yield BenchmarkCase(
+            f"total_time={total_time}",
+            partial(run, total_time),
+            round(total_time / sim_config.dt),
+        )
+
+
+def ensemble_run_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``EnsembleSimulation.run`` for increasing ensemble sizes.
+
+    The rate counts particle steps, so perfect vectorization keeps it growing
+    linearly with the ensemble size.
+    """
+    trap_config, particle_config, sim_config, params = _default_setup()
+    total_time = 0.2
+    n_steps = round(total_time / sim_config.dt)
+
+    def run(n_particles: int) -> None:
+        simulation = EnsembleSimulation(
+            trap_config.rod_distance,
+            np.full(n_particles, particle_config.charge),
+            particle_config.mass,
+            np.tile(params.initial_position, (n_particles, 1)),
+            np.tile(params.initial_velocity, (n_particles, 1)),
+            sim_config.dt,
+        )
+        schedule = SineSchedule(
+            params.voltage_amplitude,
+            params.driving_frequency,
+            simulation.trap.polarity,
+        )
+        simulation.run(schedule, total_time, record_stride=n_steps)
+
+    for n_particles in (1, 100) if quick else (1, 100, 10000):
+        yield BenchmarkCase(
+            f"n_particles={n_particles}",
+            partial(run, n_particles),
+            n_particles * n_steps,
+        )
+
+
+def field_visualizer_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``FieldVisualizer.update``, alone and followed by drawing the figure."""
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import Normalize
+
+    from quadrupole_field.visualization.components.field import FieldVisualizer
+
+    trap_config, _, _, params = _default_setup()
+    trap = Trap(trap_config.rod_distance)
+    trap.set_voltages(params.voltage_amplitude * trap.polarity)
+    fig, ax = plt.subplots()
+    visualizer = FieldVisualizer(
+        ax, trap, trap_config.rod_distance, 1.0, Normalize(-1.0, 1.0)
+    )
+
+    def update_and_draw() -> None:
+        visualizer.update()
+        fig.canvas.draw()
+
+    yield BenchmarkCase("update", visualizer.update, 1)
+    if not quick:
+        yield BenchmarkCase("update+draw", update_and_draw, 1)
+
+
+def potential_map_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``PotentialVisualizer.update``, alone and followed by drawing the figure."""
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import Normalize
+
+    from quadrupole_field.visualization.components.potential import PotentialVisualizer
+
+    trap_config, _, _, params = _default_setup()
+    trap = Trap(trap_config.rod_distance)
+    trap.set_voltages(params.voltage_amplitude * trap.polarity)
+    fig, ax = plt.subplots()
+    visualizer = PotentialVisualizer(
+        ax, trap, trap_config.rod_distance, Normalize(-1.0, 1.0)
+    )
+
+    def update_and_draw() -> None:
+        visualizer.update()
+        fig.canvas.draw()
+
+    yield BenchmarkCase("update", visualizer.update, 1)
+    if not quick:
+        yield BenchmarkCase("update+draw", update_and_draw, 1)
+
+
+def max_field_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``calculate_max_field_magnitude`` over voltage histories of several lengths."""
+    from quadrupole_field.utils.field_analysis import calculate_max_field_magnitude
+
+    trap_config, _, sim_config, params = _default_setup()
+    trap = Trap(trap_config.rod_distance)
+    schedule = SineSchedule(
+        params.voltage_amplitude, params.driving_frequency, trap.polarity
+    )
+    for n_samples in (1000,) if quick else (1000, 100000):
+        voltages_history = schedule.voltages(np.arange(n_samples) * sim_config.dt)
+        yield BenchmarkCase(
+            f"history={n_samples}",
+            partial(
+                calculate_max_field_magnitude,
+                trap,
+                voltages_history,
+                trap_config.rod_distance,
+            ),
+            1,
+        )
+
+
+def odr_fit_cases(quick: bool) -> Iterator[BenchmarkCase]:
+    """``odr_fit.perform_odr`` of straight lines with increasing numbers of points."""
+    from paul_trap_experiment_data_analysis.ODR.odr_fit import perform_odr
+
+    rng = np.random.default_rng(0)
+    for n_points in (10, 100) if quick else (10, 100, 1000):
+        x = np.linspace(0, 10, n_points)
+        dx = np.full(n_points, 0.1)
+        dy = np.full(n_points, 0.2)
+        y = 2 * x + 1 + rng.normal(0, 0.2, n_points)
+        yield BenchmarkCase(
+            f"n_points={n_points}",
+            partial(perform_odr, x, dx, y, dy),
+            1,
+        )
+
+
+# Benchmark name -> (case generator, unit of the rate)
+BENCHMARKS: dict[str, tuple[Callable[[bool], Iterator[BenchmarkCase]], str]] = {
+    "rod_field": (rod_field_cases, "points/s"),
+    "trap_field": (trap_field_cases, "points/s"),
+    "simulation_run": (simulation_run_cases, "steps/s"),
+    "ensemble_run": (ensemble_run_cases, "particle-steps/s"),
+    "field_visualizer": (field_visualizer_cases, "frames/s"),
+    "potential_map": (potential_map_cases, "frames/s"),
+    "max_field": (max_field_cases, "calls/s"),
+    "odr_fit": (odr_fit_cases, "fits/s"),
+}
+
+
+def run_benchmarks(
+    names: list[str] | None = None,
+    quick: bool = False,
+    min_time: float = DEFAULT_MIN_TIME,
+    repeat: int = DEFAULT_REPEAT,
+) -> list[BenchmarkResult]:
+    """
+    Run benchmarks and print their throughputs.
+
+    :param names: Benchmarks to run, all of ``BENCHMARKS`` if omitted.
+    :param quick: Run only the smaller problem sizes.
+    :param min_time: Minimum duration of one timed batch (s).
+    :param repeat: Number of timed batches per case.
+    :return: Result of every case.
+    """
+    results = []
+    for name in names if names is not None else BENCHMARKS:
+        cases, unit = BENCHMARKS[name]
+        for case in cases(quick):
+            seconds = time_call(case.call, min_time, repeat)
+            result = BenchmarkResult(
+                name, case.size, unit, case.work / seconds, seconds
+            )
+            print(f"{result.key:<40} {result.rate:>14.4g} {unit}")
+            results.append(result)
+    return results
+
+
+def save_results(results: list[BenchmarkResult], filename: str) -> None:
+    """Save results to a JSON file, together with a description of the machine."""
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "results": [asdict(result) for result in results],
+    }
+    with open(filename, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def compare_results(
+    results: list[BenchmarkResult], baseline_file: str, threshold: float
+) -> list[str]:
+    """
+    Compare results against a baseline file written by ``save_results``.
+
+    :param results: Results of the current run.
+    :param baseline_file: JSON file with the baseline results.
+    :param threshold: Relative slowdown above which a case counts as regressed.
+    :return: Keys of the regressed cases.
+    """
+    with open(baseline_file) as file:
+        baseline = {
+            BenchmarkResult(**entry).key: entry["rate"]
+            for entry in json.load(file)["results"]
+        }
+
+    regressions = []
+    for result in results:
+        if result.key not in baseline:
+            continue
+        slowdown = baseline[result.key] / result.rate - 1
+        status = "REGRESSION" if slowdown > threshold else "ok"
+        print(f"{result.key:<40} {-slowdown:>+8.1%} {status}")
+        if slowdown > threshold:
+            regressions.append(result.key)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Paul trap performance benchmarks")
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=list(BENCHMARKS),
+        help="Benchmark to run, may be repeated; all if omitted",
+    )
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON file with results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative slowdown against the baseline that fails the run",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Run only the smaller problem sizes"
+    )
+    parser.add_argument(
+        "--min_time",
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help="Minimum duration of one timed batch in seconds",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Number of timed batches per case",
+    )
+    args = parser.parse_args()
+
+    # Time the rendering code without opening windows
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    results = run_benchmarks(args.only, args.quick, args.min_time, args.repeat)
+    if args.output is not None:
+        save_results(results, args.output)
+        print(f"Results written to {args.output}")
+    if args.baseline is not None:
+        print(f"\nChange against {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare_results(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slowed down: {regressions}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Ensembles of independent charged particles.
+
+This module implements the vectorized counterpart of ``Particle``: the state of N
+non-interacting particles is held in (N, 2) arrays, so that a whole ensemble is
+advanced with a handful of array operations per time step.
+"""
+
+from typing import Callable
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from quadrupole_field.core.integrators import Integrator
+
+
+class ParticleEnsemble:
+    """A collection of independent charged particles in electromagnetic fields.
+
+    Each particle has its own charge and mass. Particles do not interact with each
+    other; they only respond to the external trap field. They are advanced by the
+    same integrators as ``Particle``, all at once.
+    """
+
+    # Physical properties
+    q: NDArray[np.float64]  # Charges, shape (N,)
+    m: NDArray[np.float64]  # Masses, shape (N,)
+
+    # Dynamic state
+    positions: NDArray[np.float64]  # Current positions, shape (N, 2)
+    velocities: NDArray[np.float64]  # Current velocities, shape (N, 2)
+
+    def __init__(
+        self,
+        charges: ArrayLike,
+        masses: ArrayLike,
+        positions: ArrayLike,
+        velocities: ArrayLike,
+    ) -> None:
+        """Initialize the ensemble.
+
+        Args:
+            charges: Particle charges (C), scalar or shape (N,)
+            masses: Particle masses (kg), scalar or shape (N,)
+            positions: Initial positions (m), shape (N, 2)
+            velocities: Initial velocities (m/s), shape (N, 2)
+        """
+        self.positions = np.array(positions, dtype=float)
+        self.velocities = np.array(velocities, dtype=float)
+        if self.positions.ndim != 2 or self.positions.shape[1] != 2:
+            raise ValueError("Positions must have shape (N, 2).")
+        if self.velocities.shape != self.positions.shape:
+            raise ValueError("Velocities must have the same shape as positions.")
+
+        n_particles = len(self.positions)
+        self.q = np.broadcast_to(
+            np.asarray(charges, dtype=float), (n_particles,)
+        ).copy()
+        self.m = np.broadcast_to(np.asarray(masses, dtype=float), (n_particles,)).copy()
+
+    def __len__(self) -> int:
+        """Number of particles in the ensemble."""
+        return len(self.positions)
+
+    @property
+    def charge_to_mass(self) -> NDArray[np.float64]:
+        """Charge-to-mass ratio of each particle as a column, shape (N, 1)."""
+        return (self.q / self.m)[:, np.newaxis]
+
+    def compact(self, keep: NDArray[np.bool_]) -> None:
+        """Drop particles from the ensemble, keeping the order of the others.
+
+        Args:
+            keep: Mask of the particles to keep, shape (N,)
+        """
+        self.q = self.q[keep]
+        self.m = self.m[keep]
+        self.positions = self.positions[keep]
+        self.velocities = self.velocities[keep]
+
+    def advance(
+        self,
+        integrator: Integrator,
+        electric_field_at: Callable[[NDArray[np.float64], float], NDArray[np.float64]],
+        t: float,
+        dt: float,
+    ) -> None:
+        """Advance all particles by one time step with the given integrator.
+
+        Args:
+            integrator: Integration scheme
+            electric_field_at: Function returning the field at positions of shape
+                (N, 2) and a time, with shape (N, 2)
+            t: Current time
+            dt: Time step for the update
+        """
+        charge_to_mass = self.charge_to_mass
+
+        def acceleration(positions: NDArray[np.float64], time: float) -> NDArray:
+            return charge_to_mass * electric_field_at(positions, time)
+
+        self.positions, self.velocities = integrator.step(
+            self.positions, self.velocities, t, dt, acceleration
+        )
@@ -0,0 +1,139 @@
+"""Precomputed rod fields on a fixed grid.
+
+The field and potential of the trap are linear in the rod voltages, so on a fixed
+set of points they are weighted sums of the field and potential of each rod at unit
+voltage. ``FieldBasis`` evaluates those unit fields once and then composes the
+field for any voltages with a single small matrix product, instead of evaluating
+every rod at every point again.
+
+Most drives keep the voltages proportional to one fixed pattern, e.g. the rod
+polarity scaled by V sin(Ωt). For voltages parallel to the pattern given to
+``FieldBasis``, the composed pattern field is only multiplied by a scalar.
+"""
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from quadrupole_field.core.rod import line_charge_field, line_charge_potential
+
+# Relative deviation from the fixed pattern below which voltages count as parallel
+PATTERN_TOLERANCE: float = 1e-12
+
+
+class FieldBasis:
+    """Field and potential of each rod at unit voltage on a fixed set of points."""
+
+    x: NDArray[np.float64]
+    y: NDArray[np.float64]
+    rod_positions: NDArray[np.float64]  # Shape (N, 2)
+    Ex: NDArray[np.float64]  # Unit-voltage field of each rod, shape (N, *points)
+    Ey: NDArray[np.float64]
+    potential: NDArray[np.float64]  # Unit-voltage potential, shape (N, *points)
+    pattern: NDArray[np.float64] | None  # Fixed voltage pattern, shape (N,)
+    _pattern_Ex: NDArray[np.float64]
+    _pattern_Ey: NDArray[np.float64]
+    _pattern_potential: NDArray[np.float64]
+
+    def __init__(
+        self,
+        x: ArrayLike,
+        y: ArrayLike,
+        rod_positions: ArrayLike,
+        pattern: ArrayLike | None = None,
+        min_distance: float = 1e-9,
+    ) -> None:
+        """
+        :param x: X-coordinates of the points, any shape.
+        :param y: Y-coordinates of the points, broadcastable against x.
+        :param rod_positions: Rod positions, shape (N, 2).
+        :param pattern: Voltage pattern, shape (N,), for which scaled voltages are
+            composed with a single multiplication; typically the trap polarity.
+        :param min_distance: Regularization distance of the line-charge fields.
+        """
+        self.x, self.y = np.broadcast_arrays(
+            np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        )
+        self.rod_positions = np.asarray(rod_positions, dtype=float)
+        unit = np.ones(1)
+        fields = [
+            line_charge_field(self.x, self.y, position[np.newaxis], unit, min_distance)
+            for position in self.rod_positions
+        ]
+        self.Ex = np.stack([Ex for Ex, _ in fields])
+        self.Ey = np.stack([Ey for _, Ey in fields])
+        self.potential = np.stack(
+            [
+                line_charge_potential(
+                    self.x, self.y, position[np.newaxis], unit, min_distance
+                )
+                for position in self.rod_positions
+            ]
+        )
+        self.set_pattern(pattern)
+
+    @property
+    def n_rods(self) -> int:
+        """Number of rods in the basis."""
+        return len(self.rod_positions)
+
+    def set_pattern(self, pattern: ArrayLike | None) -> None:
+        """
+        Precompose the field and potential of a fixed voltage pattern.
+        :param pattern: Voltage pattern, shape (N,), or None to always compose.
+        """
+        if pattern is None or not np.any(pattern):
+            self.pattern = None
+            return
+        self.pattern = np.asarray(pattern, dtype=float)
+        self._pattern_Ex, self._pattern_Ey, self._pattern_potential = (
+            self._compose(self.pattern, array)
+            for array in (self.Ex, self.Ey, self.potential)
+        )
+
+    def _pattern_scale(self, voltages: NDArray[np.float64]) -> float | None:
+        """Scale of voltages parallel to the fixed pattern, None otherwise."""
+        if self.pattern is None:
+            return None
+        scale = float(voltages @ self.pattern) / float(self.pattern @ self.pattern)
+        residual = np.max(np.abs(voltages - scale * self.pattern))
+        if residual > PATTERN_TOLERANCE * np.max(np.abs(voltages)):
+            return None
+        return scale
+
+    @staticmethod
+    def _compose(
+        voltages: NDArray[np.float64], basis: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        return np.tensordot(voltages, basis, axes=1)
+
+    def field(
+        self, voltages: ArrayLike
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Calculate the electric field at the basis points.
+        :param voltages: Rod voltages, shape (N,).
+        :return: Electric field components (Ex, Ey) with the shape of the points.
+        """
+        voltages = np.asarray(voltages, dtype=float)
+        scale = self._pattern_scale(voltages)
+        if scale is not None:
+            return scale * self._pattern_Ex, scale * self._pattern_Ey
+        return self._compose(voltages, self.Ex), self._compose(voltages, self.Ey)
+
+    def potential_at(
+        self, voltages: ArrayLike, out: NDArray[np.float64] | None = None
+    ) -> NDArray[np.float64]:
+        """
+        Calculate the electric potential at the basis points.
+        :param voltages: Rod voltages, shape (N,).
+        :param out: Array with the shape of the points to write the potential into,
+            instead of allocating a new one.
+        :return: Electric potential with the shape of the points.
+        """
+        voltages = np.asarray(voltages, dtype=float)
+        scale = self._pattern_scale(voltages)
+        if scale is not None:
+            return np.multiply(scale, self._pattern_potential, out=out)
+        if out is None:
+            return self._compose(voltages, self.potential)
+        return np.einsum("i,i...->...", voltages, self.potential, out=out)
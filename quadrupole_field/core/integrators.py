@@ -0,0 +1,310 @@
+"""Time integrators for charged particle motion.
+
+Every integrator advances positions and velocities by one time step given an
+acceleration function ``acceleration(position, t)``. The acceleration is re-evaluated
+at each substage of the scheme, at the substage's own time, so time-dependent trap
+voltages are resolved within the step. Positions and velocities may have shape (2,)
+for a single particle or (N, 2) for an ensemble.
+
+Available schemes:
+- ``euler_cromer``: the original scheme, four Euler-Cromer substeps with the field
+  sampled once at the start of the step (1st order)
+- ``verlet``: velocity Verlet (2nd order, symplectic)
+- ``yoshida4``: Yoshida's 4th-order symplectic composition of leapfrog steps
+- ``rk45`` and ``dop853``: adaptive Runge-Kutta with error control via SciPy
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Literal
+
+import numpy as np
+from numpy.typing import NDArray
+
+AccelerationFunction = Callable[[NDArray[np.float64], float], NDArray[np.float64]]
+AdaptiveMethod = Literal["RK45", "DOP853"]  # SciPy solve_ivp methods
+
+# Lower bound on the number of steps per RF period chosen by the dt planner
+MIN_STEPS_PER_PERIOD: int = 16
+
+
+class Integrator(ABC):
+    """A scheme advancing particle state by one time step."""
+
+    name: str
+    order: int  # Global order of accuracy
+
+    @abstractmethod
+    def step(
+        self,
+        position: NDArray[np.float64],
+        velocity: NDArray[np.float64],
+        t: float,
+        dt: float,
+        acceleration: AccelerationFunction,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Advance the state from t to t + dt.
+
+        Args:
+            position: Current position(s), shape (2,) or (N, 2)
+            velocity: Current velocity(ies), same shape as position
+            t: Current time
+            dt: Time step
+            acceleration: Function returning the acceleration at given positions and
+                time
+
+        Returns:
+            Tuple of (new position, new velocity); the inputs are not modified
+        """
+
+    def state_dict(self) -> dict[str, Any]:
+        """Internal state carried between steps, for checkpointing."""
+        return {}
+
+    def load_state_dict(self, state: dict[str, Any]) -> None:
+        """Restore internal state saved by ``state_dict``."""
+
+
+class EulerCromerIntegrator(Integrator):
+    """Four Euler-Cromer substeps with the field sampled once per step.
+
+    This is the scheme the simulation originally used. It is only first order
+    accurate and needs very small time steps.
+    """
+
+    name = "euler_cromer"
+    order = 1
+
+    def step(
+        self,
+        position: NDArray[np.float64],
+        velocity: NDArray[np.float64],
+        t: float,
+        dt: float,
+        acceleration: AccelerationFunction,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        dt_small = dt / 4
+        velocity_kick = acceleration(position, t) * dt_small
+        position = position.copy()
+        velocity = velocity.copy()
+        for _ in range(4):
+            velocity += velocity_kick
+            position += velocity * dt_small
+        return position, velocity
+
+
+class VelocityVerletIntegrator(Integrator):
+    """Velocity Verlet (kick-drift-kick leapfrog), 2nd order and symplectic.
+
+    The acceleration at the end of a step is reused at the start of the next one
+    when the caller passes back the returned position, so each step costs a single
+    field evaluation.
+    """
+
+    name = "verlet"
+    order = 2
+
+    _last_position: NDArray[np.float64] | None
+    _last_time: float | None
+    _last_acceleration: NDArray[np.float64] | None
+
+    def __init__(self) -> None:
+        self._last_position = None
+        self._last_time = None
+        self._last_acceleration = None
+
+    def step(
+        self,
+        position: NDArray[np.float64],
+        velocity: NDArray[np.float64],
+        t: float,
+        dt: float,
+        acceleration: AccelerationFunction,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        if (
+            self._last_time is not None
+            and self._last_position is not None
+            and self._last_acceleration is not None
+            and abs(t - self._last_time) <= 1e-6 * dt
+            and np.array_equal(position, self._last_position)
+        ):
+            start_acceleration = self._last_acceleration
+        else:
+            start_acceleration = acceleration(position, t)
+
+        half_velocity = velocity + 0.5 * dt * start_acceleration
+        new_position = position + dt * half_velocity
+        end_acceleration = acceleration(new_position, t + dt)
+        new_velocity = half_velocity + 0.5 * dt * end_acceleration
+
+        self._last_position = new_position
+        self._last_time = t + dt
+        self._last_acceleration = end_acceleration
+        return new_position, new_velocity
+
+    def state_dict(self) -> dict[str, Any]:
+        if self._last_time is None:
+            return {}
+        return {
+            "last_position": self._last_position,
+            "last_time": self._last_time,
+            "last_acceleration": self._last_acceleration,
+        }
+
+    def load_state_dict(self, state: dict[str, Any]) -> None:
+        self._last_position = state.get("last_position")
+        self._last_time = state.get("last_time")
+        self._last_acceleration = state.get("last_acceleration")
+
+
+class Yoshida4Integrator(Integrator):
+    """Yoshida's 4th-order symplectic integrator.
+
+    Three drift-kick-drift leapfrog steps with weights w1, w0, w1 are composed so
+    that the 3rd-order error terms cancel. Time advances with the drifts, so each of
+    the three field evaluations happens at the matching intermediate time.
+    """
+
+    name = "yoshida4"
+    order = 4
+
+    _W1 = 1 / (2 - 2 ** (1 / 3))
+    _W0 = -(2 ** (1 / 3)) * _W1
+    DRIFT_COEFFICIENTS = (_W1 / 2, (_W0 + _W1) / 2, (_W0 + _W1) / 2, _W1 / 2)
+    KICK_COEFFICIENTS = (_W1, _W0, _W1)
+
+    def step(
+        self,
+        position: NDArray[np.float64],
+        velocity: NDArray[np.float64],
+        t: float,
+        dt: float,
+        acceleration: AccelerationFunction,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        stage_time = t
+        for drift, kick in zip(self.DRIFT_COEFFICIENTS, self.KICK_COEFFICIENTS):
+            position = position + drift * dt * velocity
+            stage_time += drift * dt
+            velocity = velocity + kick * dt * acceleration(position, stage_time)
+        position = position + self.DRIFT_COEFFICIENTS[-1] * dt * velocity
+        return position, velocity
+
+
+class AdaptiveRungeKuttaIntegrator(Integrator):
+    """Embedded Runge-Kutta integration with error control (RK45 or DOP853).
+
+    Each call integrates from t to t + dt with as many internal steps as needed to
+    meet the tolerances, so dt acts as the output interval rather than the step size.
+    """
+
+    method: AdaptiveMethod
+    rtol: float
+    atol: float | None
+
+    def __init__(
+        self,
+        method: AdaptiveMethod = "DOP853",
+        rtol: float = 1e-6,
+        atol: float | None = None,
+    ) -> None:
+        """Initialize the integrator.
+
+        Args:
+            method: SciPy ``solve_ivp`` method, "RK45" or "DOP853"
+            rtol: Relative tolerance
+            atol: Absolute tolerance; defaults to rtol times the state magnitude
+        """
+        if method not in ("RK45", "DOP853"):
+            raise ValueError("Adaptive method must be 'RK45' or 'DOP853'.")
+        self.method = method
+        self.name = method.lower()
+        self.order = 5 if method == "RK45" else 8
+        self.rtol = rtol
+        self.atol = atol
+
+    def step(
+        self,
+        position: NDArray[np.float64],
+        velocity: NDArray[np.float64],
+        t: float,
+        dt: float,
+        acceleration: AccelerationFunction,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        # SciPy's integrate package is slow to import; only adaptive runs need it
+        from scipy.integrate import solve_ivp
+
+        shape = position.shape
+        size = position.size
+
+        def derivatives(time: float, state: NDArray[np.float64]) -> NDArray[np.float64]:
+            accel = acceleration(state[:size].reshape(shape), time)
+            return np.concatenate([state[size:], np.ravel(accel)])
+
+        state = np.concatenate([np.ravel(position), np.ravel(velocity)])
+        atol = self.atol
+        if atol is None:
+            atol = self.rtol * max(float(np.max(np.abs(state))), 1e-12)
+        solution = solve_ivp(
+            derivatives,
+            (t, t + dt),
+            state,
+            method=self.method,
+            rtol=self.rtol,
+            atol=atol,
+        )
+        if not solution.success:
+            raise RuntimeError(f"Adaptive integration failed: {solution.message}")
+        final_state = solution.y[:, -1]
+        return final_state[:size].reshape(shape), final_state[size:].reshape(shape)
+
+
+INTEGRATORS: tuple[str, ...] = ("euler_cromer", "verlet", "yoshida4", "rk45", "dop853")
+
+
+def get_integrator(name: str, tolerance: float = 1e-6) -> Integrator:
+    """Create an integrator by name.
+
+    Args:
+        name: One of ``INTEGRATORS``
+        tolerance: Relative tolerance, used by the adaptive integrators
+
+    Returns:
+        A fresh integrator instance
+    """
+    if name == "euler_cromer":
+        return EulerCromerIntegrator()
+    if name == "verlet":
+        return VelocityVerletIntegrator()
+    if name == "yoshida4":
+        return Yoshida4Integrator()
+    if name in ("rk45", "dop853"):
+        method: AdaptiveMethod = "RK45" if name == "rk45" else "DOP853"
+        return AdaptiveRungeKuttaIntegrator(method, rtol=tolerance)
+    raise ValueError(f"Unknown integrator {name!r}, expected one of {INTEGRATORS}.")
+
+
+def plan_time_step(
+    driving_frequency: float, integrator: Integrator, tolerance: float
+) -> float:
+    """Choose a time step for the given RF frequency and target accuracy.
+
+    For a method of order p the error accumulated over one RF period scales as
+    (Ω·dt)^p = (2π/n)^p for n steps per period, so n = 2π·tolerance^(-1/p) steps
+    reach the requested tolerance. Adaptive integrators control their own error, so
+    only the minimum output resolution applies to them.
+
+    Args:
+        driving_frequency: RF driving frequency (Hz)
+        integrator: Integrator the time step is planned for
+        tolerance: Target relative accuracy per RF period
+
+    Returns:
+        Time step in seconds
+    """
+    if isinstance(integrator, AdaptiveRungeKuttaIntegrator):
+        steps_per_period = MIN_STEPS_PER_PERIOD
+    else:
+        steps_per_period = max(
+            MIN_STEPS_PER_PERIOD,
+            int(np.ceil(2 * np.pi * tolerance ** (-1 / integrator.order))),
+        )
+    return 1 / (driving_frequency * steps_per_period)
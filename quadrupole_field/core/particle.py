@@ -4,11 +4,12 @@ This module implements the particle motion under the influence of electric field
 in the Paul trap, using the Lorentz force law and Newton's equations of motion.
 """
 
-from typing import Tuple
+from typing import Callable, Tuple
 
 import numpy as np
 from numpy.typing import NDArray
 
+from quadrupole_field.core.integrators import Integrator
 from quadrupole_field.core.physical_constants import ELEMENTARY_CHARGE
 
 
@@ -20,7 +21,8 @@ class Particle:
     - Position and velocity (defining its state)
     - Electric fields (providing the forces)
 
-    Motion is integrated using a 4th-order symplectic algorithm for accuracy.
+    Motion is integrated by a pluggable scheme from ``core.integrators`` (see
+    ``advance``), which re-evaluates the field at every substage of a step.
     """
 
     # Physical properties
@@ -44,17 +46,27 @@ class Particle:
         self.position = np.array(position, dtype=float)
         self.velocity = np.array(velocity, dtype=float)
 
-    def update(self, electric_field: Tuple[float, float], dt: float) -> None:
-        """Update particle's position and velocity using smaller timesteps.
+    def advance(
+        self,
+        integrator: Integrator,
+        electric_field_at: Callable[[NDArray[np.float64], float], NDArray[np.float64]],
+        t: float,
+        dt: float,
+    ) -> None:
+        """Advance the particle by one time step with the given integrator.
 
         Args:
-            electric_field: Electric field vector (Ex, Ey) at particle position
+            integrator: Integration scheme
+            electric_field_at: Function returning the field vector (Ex, Ey) at a
+                position and time
+            t: Current time
             dt: Time step for the update
         """
-        Ex, Ey = electric_field
-        # Split the timestep into 4 smaller steps for better accuracy
-        dt_small = dt / 4
-        for _ in range(4):
-            acceleration = self.q * np.array([Ex, Ey]) / self.m
-            self.velocity += acceleration * dt_small
-            self.position += self.velocity * dt_small
+        charge_to_mass = self.q / self.m
+
+        def acceleration(position: NDArray[np.float64], time: float) -> NDArray:
+            return charge_to_mass * electric_field_at(position, time)
+
+        self.position, self.velocity = integrator.step(
+            self.position, self.velocity, t, dt, acceleration
+        )
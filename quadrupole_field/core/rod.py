@@ -2,10 +2,70 @@
 
 This module defines the Rod class, which represents a single electrode in the Paul trap.
 Each rod contributes to the total electric field and can have its voltage varied over time.
+
+The field and potential of a set of rods are computed by the vectorized
+``line_charge_field`` and ``line_charge_potential`` functions, which broadcast over
+both the evaluation points and the rods. ``Rod`` and ``Trap`` are thin wrappers
+around them.
 """
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
+
+
+def line_charge_field(
+    x: ArrayLike,
+    y: ArrayLike,
+    rod_positions: NDArray[np.float64],
+    voltages: NDArray[np.float64],
+    min_distance: float = 1e-9,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Calculate the summed electric field of a set of line-charge rods.
+
+    Args:
+        x: X-coordinate(s) of the point(s), scalar or array
+        y: Y-coordinate(s) of the point(s), broadcastable against x
+        rod_positions: Rod positions, shape (N, 2)
+        voltages: Rod voltages, shape (N,)
+        min_distance: Distance added to avoid division by zero at a rod
+
+    Returns:
+        Electric field components (Ex, Ey) with the broadcast shape of x, y
+    """
+    # Trailing axis runs over rods and is summed away at the end
+    dx = np.asarray(x, dtype=float)[..., np.newaxis] - rod_positions[:, 0]
+    dy = np.asarray(y, dtype=float)[..., np.newaxis] - rod_positions[:, 1]
+    R = np.sqrt(dx**2 + dy**2) + min_distance
+    E_magnitude = voltages / R
+    Ex = np.sum(E_magnitude * (dx / R), axis=-1)
+    Ey = np.sum(E_magnitude * (dy / R), axis=-1)
+    return Ex, Ey
+
+
+def line_charge_potential(
+    x: ArrayLike,
+    y: ArrayLike,
+    rod_positions: NDArray[np.float64],
+    voltages: NDArray[np.float64],
+    min_distance: float = 1e-9,
+) -> NDArray[np.float64]:
+    """Calculate the summed electric potential of a set of line-charge rods.
+
+    Args:
+        x: X-coordinate(s) of the point(s), scalar or array
+        y: Y-coordinate(s) of the point(s), broadcastable against x
+        rod_positions: Rod positions, shape (N, 2)
+        voltages: Rod voltages, shape (N,)
+        min_distance: Minimum distance threshold to prevent singularities
+
+    Returns:
+        Electric potential with the broadcast shape of x, y
+    """
+    dx = np.asarray(x, dtype=float)[..., np.newaxis] - rod_positions[:, 0]
+    dy = np.asarray(y, dtype=float)[..., np.newaxis] - rod_positions[:, 1]
+    R = np.sqrt(dx**2 + dy**2) + min_distance
+    # Negative because higher voltage = lower potential
+    return -np.sum(voltages * np.log(R), axis=-1)
 
 
 class Rod:
@@ -33,23 +93,25 @@ class Rod:
         """
         self.voltage = voltage
 
-    def electric_field_at(self, x: float, y: float) -> tuple[float, float]:
+    def electric_field_at(
+        self, x: ArrayLike, y: ArrayLike
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
         """
-        Calculate the electric field contribution at a point (x, y).
-        :param x: X-coordinate of the point.
-        :param y: Y-coordinate of the point.
+        Calculate the electric field contribution at one or more points.
+
+        ``x`` and ``y`` may be scalars or arrays of any broadcastable shape; the
+        returned components have the broadcast shape.
+        :param x: X-coordinate(s) of the point(s).
+        :param y: Y-coordinate(s) of the point(s).
         :return: Electric field vector (Ex, Ey).
         """
-        dx, dy = x - self.position[0], y - self.position[1]
-        R = np.sqrt(dx**2 + dy**2) + 1e-9  # Avoid division by zero
-        E_magnitude = self.voltage / R
-        Ex = E_magnitude * (dx / R)
-        Ey = E_magnitude * (dy / R)
-        return Ex, Ey
+        return line_charge_field(
+            x, y, self.position[np.newaxis], np.array([self.voltage])
+        )
 
     def electric_potential_at(
-        self, x: float, y: float, min_distance: float = 1e-9
-    ) -> float:
+        self, x: ArrayLike, y: ArrayLike, min_distance: float = 1e-9
+    ) -> NDArray[np.float64]:
         """Calculate the electric potential at a point due to this rod.
 
         For an infinite line charge, the potential follows:
@@ -60,16 +122,13 @@ class Rod:
             r₀ is a reference distance
 
         Args:
-            x: X-coordinate of the point
-            y: Y-coordinate of the point
+            x: X-coordinate(s) of the point(s), scalar or array
+            y: Y-coordinate(s) of the point(s), broadcastable against x
             min_distance: Minimum distance threshold to prevent singularities
 
         Returns:
-            Electric potential value at the given point
+            Electric potential at the given point(s), with the broadcast shape of x, y
         """
-        dx = x - self.position[0]
-        dy = y - self.position[1]
-        R = np.sqrt(dx**2 + dy**2) + min_distance
-        return -self.voltage * np.log(
-            R
-        )  # Negative because higher voltage = lower potential
+        return line_charge_potential(
+            x, y, self.position[np.newaxis], np.array([self.voltage]), min_distance
+        )
@@ -1,48 +1,249 @@
 """Core trap physics implementation.
 
-This module implements the quadrupole Paul trap geometry and field calculations.
-The trap consists of four rods arranged in a square configuration, with
-time-varying voltages creating the trapping field.
+This module implements the multipole Paul trap geometry and field calculations.
+The default trap consists of four rods arranged in a square configuration, with
+time-varying voltages creating the trapping field. Hexapole, octupole and
+user-supplied electrode layouts are supported as well.
+
+The rod state is stored as arrays (positions of shape (N, 2) and voltages of shape
+(N,)), so field evaluation is a single vectorized sum over rods.
+
+Particles are lost when they leave the trap or hit a rod; ``Trap.detect_losses``
+classifies positions by ``LossReason``.
 """
 
-from quadrupole_field.core.rod import Rod
+from enum import IntEnum
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from quadrupole_field.core.rod import Rod, line_charge_field, line_charge_potential
+
+# Named multipole layouts and their number of rods
+MULTIPOLE_ROD_COUNTS: dict[str, int] = {
+    "quadrupole": 4,
+    "hexapole": 6,
+    "octupole": 8,
+}
+
+# Default rod radius and escape radius as multiples of the rod distance a
+DEFAULT_ROD_RADIUS_FACTOR: float = 0.1
+DEFAULT_ESCAPE_RADIUS_FACTOR: float = 1.0
+
+
+class LossReason(IntEnum):
+    """Why a particle stopped being simulated."""
+
+    NONE = 0  # Still trapped
+    ESCAPED = 1  # Moved beyond the escape radius
+    ROD_COLLISION = 2  # Came closer to a rod center than the rod radius
+
+
+def multipole_layout(
+    a: float, n_rods: int = 4
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Calculate rod positions and RF polarities of a symmetric multipole.
+
+    The rods sit on a circle of radius ``a`` at angles 2πk/N, with alternating
+    polarity. Rods of positive polarity are listed first, which for N = 4 gives the
+    classic ordering (+a, 0), (-a, 0), (0, +a), (0, -a).
+
+    Args:
+        a: Distance from the trap center to each rod (m)
+        n_rods: Number of rods, an even number of at least 4
+
+    Returns:
+        Tuple of (rod positions with shape (N, 2), polarities with shape (N,))
+    """
+    if n_rods < 4 or n_rods % 2:
+        raise ValueError("A multipole trap needs an even number of at least 4 rods.")
+
+    k = np.concatenate([np.arange(0, n_rods, 2), np.arange(1, n_rods, 2)])
+    angles = 2 * np.pi * k / n_rods
+    positions = a * np.column_stack([np.cos(angles), np.sin(angles)])
+    positions[np.abs(positions) < 1e-12 * a] = 0.0  # Exact zeros on the axes
+    polarity = np.where(k % 2 == 0, 1.0, -1.0)
+    return positions, polarity
 
 
 class Trap:
-    """Quadrupole Paul trap implementation.
+    """Multipole Paul trap implementation.
 
-    The trap consists of four rods arranged in a square pattern:
+    By default the trap consists of four rods arranged in a square pattern:
     - Two rods on the x-axis at ±a
     - Two rods on the y-axis at ±a
     where 'a' is the distance from the center to each rod.
+
+    Every rod has a polarity (±1) giving the sign of the RF drive applied to it, so
+    a drive of amplitude V corresponds to voltages ``V * polarity``.
     """
 
-    rods: list[Rod]
+    a: float
+    rod_positions: NDArray[np.float64]  # Rod positions, shape (N, 2)
+    voltages: NDArray[np.float64]  # Rod voltages, shape (N,)
+    polarity: NDArray[np.float64]  # RF polarity of each rod, shape (N,)
+    rod_radius: float  # Physical rod radius (m)
+    escape_radius: float  # Distance from the center beyond which particles are lost
+
+    def __init__(
+        self,
+        a: float,
+        n_rods: int = 4,
+        rod_radius: float | None = None,
+        escape_radius: float | None = None,
+    ) -> None:
+        """Initialize a symmetric multipole trap (a quadrupole by default).
+
+        Args:
+            a: Distance from the trap center to each rod (m)
+            n_rods: Number of rods
+            rod_radius: Rod radius (m), ``DEFAULT_ROD_RADIUS_FACTOR * a`` if omitted
+            escape_radius: Escape radius (m), ``DEFAULT_ESCAPE_RADIUS_FACTOR * a``
+                if omitted
+        """
+        positions, polarity = multipole_layout(a, n_rods)
+        self._set_geometry(a, positions, polarity, rod_radius, escape_radius)
+
+    @classmethod
+    def from_positions(
+        cls,
+        rod_positions: ArrayLike,
+        polarity: ArrayLike | None = None,
+        rod_radius: float | None = None,
+        escape_radius: float | None = None,
+    ) -> "Trap":
+        """Create a trap with a user-supplied electrode layout.
 
-    def __init__(self, a: float) -> None:
-        """Initialize the trap with four rods."""
-        self.rods = [Rod((a, 0)), Rod((-a, 0)), Rod((0, a)), Rod((0, -a))]
+        Args:
+            rod_positions: Rod positions, shape (N, 2)
+            polarity: RF polarity of each rod, shape (N,); all +1 if omitted
+            rod_radius: Rod radius (m), scaled from the trap size if omitted
+            escape_radius: Escape radius (m), scaled from the trap size if omitted
 
-    def set_voltages(self, voltages: list[float]) -> None:
+        Returns:
+            Trap whose size parameter is the largest center-to-rod distance
+        """
+        positions = np.array(rod_positions, dtype=float)
+        if positions.ndim != 2 or positions.shape[1] != 2:
+            raise ValueError("Rod positions must have shape (N, 2).")
+        if polarity is None:
+            polarity = np.ones(len(positions))
+        a = float(np.max(np.hypot(positions[:, 0], positions[:, 1])))
+
+        trap = cls.__new__(cls)
+        trap._set_geometry(
+            a,
+            positions,
+            np.asarray(polarity, dtype=float),
+            rod_radius,
+            escape_radius,
+        )
+        return trap
+
+    def _set_geometry(
+        self,
+        a: float,
+        rod_positions: NDArray[np.float64],
+        polarity: NDArray[np.float64],
+        rod_radius: float | None,
+        escape_radius: float | None,
+    ) -> None:
+        """Store the electrode layout and reset all voltages to zero."""
+        if polarity.shape != (len(rod_positions),):
+            raise ValueError("Exactly one polarity per rod must be provided.")
+        self.a = a
+        self.rod_positions = rod_positions
+        self.polarity = polarity
+        self.voltages = np.zeros(len(rod_positions))
+        self.rod_radius = (
+            DEFAULT_ROD_RADIUS_FACTOR * a if rod_radius is None else rod_radius
+        )
+        self.escape_radius = (
+            DEFAULT_ESCAPE_RADIUS_FACTOR * a if escape_radius is None else escape_radius
+        )
+
+    @property
+    def n_rods(self) -> int:
+        """Number of rods in the trap."""
+        return len(self.rod_positions)
+
+    @property
+    def rods(self) -> list[Rod]:
+        """Snapshot of the rods as individual ``Rod`` objects."""
+        rods = []
+        for position, voltage in zip(self.rod_positions, self.voltages):
+            rod = Rod((position[0], position[1]))
+            rod.set_voltage(float(voltage))
+            rods.append(rod)
+        return rods
+
+    def set_voltages(self, voltages: ArrayLike) -> None:
         """
         Set voltages for all rods.
-        :param voltages: List of 4 voltage values, one for each rod.
-        """
-        if len(voltages) != 4:
-            raise ValueError("Exactly 4 voltages must be provided.")
-        for rod, voltage in zip(self.rods, voltages):
-            rod.set_voltage(voltage)
-
-    def electric_field_at(self, x: float, y: float) -> tuple[float, float]:
-        """
-        Calculate the total electric field at a point (x, y) due to all rods.
-        :param x: X-coordinate of the point.
-        :param y: Y-coordinate of the point.
-        :return: Total electric field vector (Ex, Ey).
-        """
-        Ex, Ey = 0.0, 0.0
-        for rod in self.rods:
-            Ex_rod, Ey_rod = rod.electric_field_at(x, y)
-            Ex += Ex_rod
-            Ey += Ey_rod
-        return Ex, Ey
+        :param voltages: One voltage value for each rod.
+        """
+        voltages = np.asarray(voltages, dtype=float)
+        if voltages.shape != (self.n_rods,):
+            raise ValueError(f"Exactly {self.n_rods} voltages must be provided.")
+        self.voltages[:] = voltages
+
+    def electric_field_at(
+        self, x: ArrayLike, y: ArrayLike
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Calculate the total electric field due to all rods.
+
+        ``x`` and ``y`` may be scalars or arrays of any broadcastable shape, so a
+        whole grid is evaluated in a single call.
+        :param x: X-coordinate(s) of the point(s).
+        :param y: Y-coordinate(s) of the point(s).
+        :return: Total electric field vector (Ex, Ey) with the broadcast shape.
+        """
+        return line_charge_field(x, y, self.rod_positions, self.voltages)
+
+    def electric_field_at_points(
+        self, points: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        """
+        Calculate the total electric field at points given as coordinate vectors.
+        :param points: Point coordinates, shape (..., 2).
+        :return: Electric field vectors, shape (..., 2).
+        """
+        field = np.empty(points.shape)
+        field[..., 0], field[..., 1] = self.electric_field_at(
+            points[..., 0], points[..., 1]
+        )
+        return field
+
+    def electric_potential_at(
+        self, x: ArrayLike, y: ArrayLike, min_distance: float = 1e-9
+    ) -> NDArray[np.float64]:
+        """
+        Calculate the total electric potential due to all rods.
+        :param x: X-coordinate(s) of the point(s).
+        :param y: Y-coordinate(s) of the point(s).
+        :param min_distance: Minimum distance threshold to prevent singularities.
+        :return: Total electric potential with the broadcast shape of x, y.
+        """
+        return line_charge_potential(
+            x, y, self.rod_positions, self.voltages, min_distance
+        )
+
+    def detect_losses(self, points: NDArray[np.float64]) -> NDArray[np.int8]:
+        """
+        Classify particle positions as trapped or lost.
+
+        A rod collision takes precedence over escaping, since a particle inside a
+        rod is also likely to be beyond the escape radius.
+        :param points: Particle positions, shape (..., 2).
+        :return: ``LossReason`` value of each position, shape (...).
+        """
+        reasons = np.where(
+            np.hypot(points[..., 0], points[..., 1]) > self.escape_radius,
+            np.int8(LossReason.ESCAPED),
+            np.int8(LossReason.NONE),
+        )
+        offsets = points[..., np.newaxis, :] - self.rod_positions
+        rod_distance = np.hypot(offsets[..., 0], offsets[..., 1]).min(axis=-1)
+        reasons[rod_distance < self.rod_radius] = LossReason.ROD_COLLISION
+        return reasons
@@ -1,36 +1,296 @@
 """Main simulation runner."""
 
+import copy
+import cProfile
+
 import numpy as np
+from numpy.typing import NDArray
 
+from quadrupole_field.core.integrators import get_integrator, plan_time_step
+from quadrupole_field.core.trap import LossReason
+from quadrupole_field.simulation.base import SimulationBase
+from quadrupole_field.simulation.checkpoint import Checkpointer, load_checkpoint
+from quadrupole_field.simulation.config import (
+    InitialConditionsConfig,
+    OutputConfig,
+    ParticleConfig,
+    SimulationConfig,
+    TrapConfig,
+)
+from quadrupole_field.simulation.dimensionless import (
+    DimensionlessEngine,
+    to_dimensionless,
+)
+from quadrupole_field.simulation.floquet import get_floquet_propagator
+from quadrupole_field.simulation.live import LiveSimulation
+from quadrupole_field.simulation.output import ChunkedTrajectoryWriter
+from quadrupole_field.simulation.schedule import (
+    RFDCSchedule,
+    SineSchedule,
+    VoltageSchedule,
+)
 from quadrupole_field.simulation.simulation import Simulation
+from quadrupole_field.utils.cache import ResultsCache, config_key
 from quadrupole_field.utils.cli import parse_args
+from quadrupole_field.utils.field_analysis import (
+    field_grid_settings,
+    schedule_max_field_magnitude,
+)
 from quadrupole_field.utils.initialization import get_initial_parameters
-from quadrupole_field.visualization.paul_trap_display import PaulTrapVisualizer
+from quadrupole_field.utils.profiling import PROFILER
+from quadrupole_field.utils.stable_orbit_params import StableOrbitParameters
 
 
-def main() -> None:
-    """Run the Paul trap simulation with command line arguments."""
-    # Parse command line arguments
-    sim_config, trap_config, particle_config, output_config, initial_config = (
-        parse_args()
+def run_floquet(
+    sim_config: SimulationConfig,
+    trap_config: TrapConfig,
+    particle_config: ParticleConfig,
+    schedule: VoltageSchedule,
+    params: StableOrbitParameters,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], float]:
+    """Fast-forward the particle with the one-period transfer map.
+
+    Returns stroboscopic samples, one every ``record_stride`` RF periods, together
+    with the simulated time between samples.
+    """
+    if schedule.period is None:
+        raise ValueError("Floquet propagation requires a periodic schedule.")
+    propagator = get_floquet_propagator(
+        trap_config,
+        particle_config,
+        schedule,
+        steps_per_period=max(1, round(schedule.period / sim_config.dt)),
+        integrator=sim_config.integrator,
     )
+    print(f"\nFloquet multipliers: {propagator.floquet_multipliers}")
+    print(f"Stable: {propagator.is_stable}")
+
+    n_periods = int(sim_config.total_time / propagator.period)
+    period_counts = np.arange(0, n_periods + 1, sim_config.record_stride)
+    initial_state = [*params.initial_position, *params.initial_velocity]
+    states = propagator.stroboscopic(initial_state, period_counts)
+    voltages_history = schedule.voltages(period_counts * propagator.period)
+    sample_interval = propagator.period * sim_config.record_stride
+    return states[:, :2], states[:, 2:], voltages_history, sample_interval
+
+
+def stream_to_disk(
+    simulation: SimulationBase,
+    schedule: VoltageSchedule,
+    sim_config: SimulationConfig,
+    output_config: OutputConfig,
+    checkpointer: Checkpointer | None = None,
+) -> None:
+    """Run the simulation, writing the trajectory to disk chunk by chunk.
+
+    A resumed run appends to the trajectory already in the output directory, after
+    dropping the samples written after its checkpoint was saved.
+    """
+    assert output_config.trajectory_dir is not None
+    metadata = {
+        "record_interval": sim_config.record_interval,
+        "schedule": schedule.to_dict(),
+    }
+    resumed = output_config.resume_from is not None
+    with ChunkedTrajectoryWriter(
+        output_config.trajectory_dir, metadata, append=resumed
+    ) as writer:
+        if resumed:
+            writer.truncate(-(-simulation.step_index // sim_config.record_stride))
+        for chunk in simulation.iter_chunks(
+            schedule,
+            sim_config.total_time,
+            sim_config.record_stride,
+            output_config.chunk_size,
+            checkpointer,
+        ):
+            writer.write(chunk)
+    print(f"Trajectory with {writer.n_records} samples written to {writer.directory}")
 
-    # Get initial parameters with optional overrides
-    params = get_initial_parameters(
+
+def run_dimensionless(
+    simulation: Simulation,
+    schedule: RFDCSchedule,
+    sim_config: SimulationConfig,
+    trap_config: TrapConfig,
+    particle_config: ParticleConfig,
+    params: StableOrbitParameters,
+    cache: ResultsCache | None,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], float]:
+    """Run the simulation in Mathieu units and rescale the results to SI.
+
+    Returns the recorded positions, velocities and voltages together with the
+    simulated time between samples.
+    """
+    steps_per_period = max(1, round(schedule.period / sim_config.dt))
+    engine = DimensionlessEngine(steps_per_period, sim_config.integrator, cache)
+    dimensionless_params, scale = to_dimensionless(
         rod_distance=trap_config.rod_distance,
-        particle_charge=particle_config.charge,
-        particle_mass=particle_config.mass,
-        driving_freq=trap_config.driving_frequency,
-        target_q=trap_config.target_q,
-        initial_conditions=initial_config,
+        charge=particle_config.charge,
+        mass=particle_config.mass,
+        rf_amplitude=schedule.rf_amplitude,
+        driving_frequency=schedule.frequency,
+        initial_position=params.initial_position,
+        initial_velocity=params.initial_velocity,
+        dc_offset=schedule.dc_offset,
+        phase=schedule.phase,
+        n_rods=trap_config.n_rods,
+        rod_radius=trap_config.rod_radius,
+        escape_radius=trap_config.escape_radius,
     )
+    n_steps = int(sim_config.total_time / schedule.period * steps_per_period)
+    trajectory = engine.run(dimensionless_params, n_steps, sim_config.record_stride)
+    if trajectory.loss_reason != LossReason.NONE:
+        simulation.loss_time = trajectory.loss_tau * scale.time_unit
+        simulation.loss_reason = LossReason(trajectory.loss_reason)
+
+    times, positions, velocities = trajectory.to_si(scale)
+    sample_interval = sim_config.record_stride * schedule.period / steps_per_period
+    return positions, velocities, schedule.voltages(times), sample_interval
+
+
+def run_with_cache(
+    simulation: Simulation,
+    schedule: VoltageSchedule,
+    sim_config: SimulationConfig,
+    cache: ResultsCache | None,
+    key: str,
+    checkpointer: Checkpointer | None = None,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64], float]:
+    """Run the simulation, or load the results of an identical earlier run.
+
+    Returns the recorded positions, velocities and voltages together with the
+    maximum field magnitude used to normalize the field display.
+    """
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        print("\nLoaded results of an identical earlier run from the cache")
+        if cached["loss_reason"] != LossReason.NONE:
+            simulation.loss_time = float(cached["loss_time"])
+            simulation.loss_reason = LossReason(int(cached["loss_reason"]))
+        return (
+            cached["positions"],
+            cached["velocities"],
+            cached["voltages_history"],
+            float(cached["max_field"]),
+        )
+
+    with PROFILER.timer("simulation"):
+        positions, velocities, voltages_history = simulation.run(
+            schedule, sim_config.total_time, sim_config.record_stride, checkpointer
+        )
+    with PROFILER.timer("max_field"):
+        max_field = schedule_max_field_magnitude(
+            simulation.trap, schedule, simulation.trap.a
+        )
+    if cache is not None:
+        cache.put(
+            key,
+            positions=positions,
+            velocities=velocities,
+            voltages_history=voltages_history,
+            max_field=np.float64(max_field),
+            loss_time=np.float64(
+                np.nan if simulation.loss_time is None else simulation.loss_time
+            ),
+            loss_reason=np.int8(simulation.loss_reason),
+        )
+    return positions, velocities, voltages_history, max_field
+
+
+def run_live(
+    simulation: Simulation,
+    schedule: VoltageSchedule,
+    sim_config: SimulationConfig,
+    trap_config: TrapConfig,
+    output_config: OutputConfig,
+    start_time: float = 0.0,
+) -> None:
+    """Animate the simulation while it runs on a background thread.
+
+    The run is open-ended and stops when the window is closed or the particle is
+    lost. ``start_time`` is the time of the first sample of a resumed run.
+    """
+    from quadrupole_field.visualization.live_display import LiveTrapVisualizer
+
+    live = LiveSimulation(simulation, schedule, sim_config.record_stride)
+    # Started first, so that samples are ready by the time the figure is
+    live.start()
+    try:
+        visualizer = LiveTrapVisualizer(
+            live,
+            a=trap_config.rod_distance,
+            # A copy, since the simulation sets the voltages of its own trap
+            trap=copy.deepcopy(simulation.trap),
+            dt=sim_config.record_interval,
+            schedule=schedule,
+            start_time=start_time,
+            playback_speed=output_config.playback_speed,
+        )
+        visualizer.animate(show=True)
+    finally:
+        live.stop()
+    if live.error is not None:
+        raise live.error
+
+    print(f"\nLive run stopped at t = {simulation.step_index * simulation.dt:.4f} s")
+    if simulation.n_active == 0:
+        print(
+            f"Particle lost at t = {simulation.loss_time:.4f} s "
+            f"({simulation.loss_reason.name.lower()})"
+        )
+
 
-    def voltages_over_time(t: float) -> list[float]:
-        """Calculate oscillating voltages for rods at time t."""
-        voltage = params.voltage_amplitude * np.sin(
-            2 * np.pi * params.driving_frequency * t
+def save_results(
+    filename: str,
+    simulation: Simulation,
+    positions: NDArray[np.float64],
+    velocities: NDArray[np.float64],
+    voltages_history: NDArray[np.float64],
+    start_time: float,
+    sample_interval: float,
+) -> None:
+    """Save the recorded samples and the particle's fate to an ``.npz`` file."""
+    loss_time = simulation.loss_time
+    with open(filename, "wb") as file:
+        np.savez(
+            file,
+            times=start_time + np.arange(len(positions)) * sample_interval,
+            positions=positions,
+            velocities=velocities,
+            voltages=voltages_history,
+            loss_time=np.asarray(np.nan if loss_time is None else loss_time),
+            loss_reason=np.asarray(simulation.loss_reason, dtype=np.int8),
         )
-        return [voltage, voltage, -voltage, -voltage]
+        PROFILER.count("bytes_written", file.tell())
+    print(f"Results written to {filename}")
+
+
+def run_simulation(
+    sim_config: SimulationConfig,
+    trap_config: TrapConfig,
+    particle_config: ParticleConfig,
+    output_config: OutputConfig,
+    initial_config: InitialConditionsConfig,
+) -> None:
+    """Set up, run and visualize the simulation described by the configuration."""
+    with PROFILER.timer("parameter_setup"):
+        # Get initial parameters with optional overrides
+        params = get_initial_parameters(
+            rod_distance=trap_config.rod_distance,
+            particle_charge=particle_config.charge,
+            particle_mass=particle_config.mass,
+            driving_freq=trap_config.driving_frequency,
+            target_q=trap_config.target_q,
+            initial_conditions=initial_config,
+        )
+
+        integrator = get_integrator(sim_config.integrator, sim_config.tolerance)
+        if sim_config.auto_dt:
+            planned_dt = plan_time_step(
+                params.driving_frequency, integrator, sim_config.tolerance
+            )
+            sim_config = sim_config.model_copy(update={"dt": planned_dt})
 
     # Print simulation parameters
     print(f"\nSimulation parameters:")
@@ -45,18 +305,174 @@ def main() -> None:
     print(f"Initial velocity: {params.initial_velocity}")
 
     # Run simulation
-    simulation = Simulation(
-        a=trap_config.rod_distance,
-        charge=particle_config.charge,
-        mass=particle_config.mass,
-        initial_position=params.initial_position,
-        initial_velocity=params.initial_velocity,
-        dt=sim_config.dt,
-    )
+    simulation: Simulation
+    schedule: VoltageSchedule
+    if output_config.resume_from is not None:
+        restored, schedule, _ = load_checkpoint(output_config.resume_from)
+        # Ensemble runs are driven from Python; the command line runs one particle
+        if not isinstance(restored, Simulation):
+            raise ValueError(
+                f"{output_config.resume_from} holds an ensemble run, only "
+                "single-particle checkpoints can be resumed from the command line"
+            )
+        simulation = restored
+        sim_config = sim_config.model_copy(update={"dt": simulation.dt})
+        print(
+            f"\nResuming from {output_config.resume_from} at "
+            f"t = {simulation.step_index * simulation.dt:.4f} s"
+        )
+    else:
+        simulation = Simulation(
+            a=trap_config.rod_distance,
+            charge=particle_config.charge,
+            mass=particle_config.mass,
+            initial_position=params.initial_position,
+            initial_velocity=params.initial_velocity,
+            dt=sim_config.dt,
+            n_rods=trap_config.n_rods,
+            integrator=integrator,
+            rod_radius=trap_config.rod_radius,
+            escape_radius=trap_config.escape_radius,
+        )
+        schedule = SineSchedule(
+            amplitude=params.voltage_amplitude,
+            frequency=params.driving_frequency,
+            polarity=simulation.trap.polarity,
+        )
 
-    positions, velocities, voltages_history = simulation.run(
-        voltages_over_time, sim_config.total_time
-    )
+    # Checked before a Checkpointer installs its signal handler
+    if sim_config.dimensionless and output_config.checkpoint_file is not None:
+        raise ValueError(
+            "--dimensionless runs cannot be checkpointed, drop --checkpoint_file"
+        )
+    if output_config.live:
+        unsupported = [
+            f"--{option}"
+            for option in ("checkpoint_file", "npz_file", "trajectory_dir")
+            if getattr(output_config, option) is not None
+        ]
+        if output_config.save_video:
+            unsupported.append("--save_video")
+        if unsupported:
+            raise ValueError(
+                f"--live runs are only animated, drop {', '.join(unsupported)}"
+            )
+
+    checkpointer = None
+    if output_config.checkpoint_file is not None:
+        checkpointer = Checkpointer(
+            output_config.checkpoint_file,
+            schedule,
+            output_config.checkpoint_interval,
+            metadata={
+                "simulation": sim_config.model_dump(mode="json"),
+                "trap": trap_config.model_dump(mode="json"),
+                "particle": particle_config.model_dump(mode="json"),
+            },
+        )
+
+    try:
+        # Time of the first sample of a (possibly resumed) run
+        start_time = (
+            -(-simulation.step_index // sim_config.record_stride)
+            * sim_config.record_interval
+        )
+
+        max_field = None
+        if sim_config.floquet:
+            with PROFILER.timer("simulation"):
+                positions, velocities, voltages_history, sample_interval = run_floquet(
+                    sim_config, trap_config, particle_config, schedule, params
+                )
+            start_time = 0.0
+        elif output_config.live:
+            if output_config.no_display:
+                raise ValueError(
+                    "--live needs a display, it cannot run with --no_display"
+                )
+            with PROFILER.timer("animation"):
+                run_live(
+                    simulation,
+                    schedule,
+                    sim_config,
+                    trap_config,
+                    output_config,
+                    start_time,
+                )
+            return
+        elif output_config.trajectory_dir is not None:
+            with PROFILER.timer("simulation"):
+                stream_to_disk(
+                    simulation, schedule, sim_config, output_config, checkpointer
+                )
+            return
+        else:
+            # Resumed and checkpointed runs depend on state outside the configuration
+            use_cache = not (
+                output_config.no_cache
+                or output_config.resume_from is not None
+                or checkpointer is not None
+            )
+            cache = (
+                ResultsCache(max_bytes=int(output_config.cache_size_mb * 1024**2))
+                if use_cache
+                else None
+            )
+            # A resumed run continues from its checkpoint state, not from (a, q)
+            if sim_config.dimensionless and output_config.resume_from is None:
+                assert isinstance(schedule, RFDCSchedule)  # Built above for new runs
+                with PROFILER.timer("simulation"):
+                    positions, velocities, voltages_history, sample_interval = (
+                        run_dimensionless(
+                            simulation,
+                            schedule,
+                            sim_config,
+                            trap_config,
+                            particle_config,
+                            params,
+                            cache,
+                        )
+                    )
+            else:
+                key = config_key(
+                    sim_config,
+                    trap_config,
+                    particle_config,
+                    initial_config,
+                    field_grid=field_grid_settings(),
+                )
+                positions, velocities, voltages_history, max_field = run_with_cache(
+                    simulation, schedule, sim_config, cache, key, checkpointer
+                )
+                sample_interval = sim_config.record_interval
+            if simulation.n_active == 0:
+                print(
+                    f"\nParticle lost at t = {simulation.loss_time:.4f} s "
+                    f"({simulation.loss_reason.name.lower()})"
+                )
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+
+    if output_config.npz_file is not None:
+        save_results(
+            output_config.npz_file,
+            simulation,
+            positions,
+            velocities,
+            voltages_history,
+            start_time,
+            sample_interval,
+        )
+    if output_config.no_display and not output_config.save_video:
+        return
+
+    # Plotting code is imported only when rendering, so headless runs never load it
+    if output_config.no_display:
+        import matplotlib
+
+        matplotlib.use("Agg")
+    from quadrupole_field.visualization.paul_trap_display import PaulTrapVisualizer
 
     # Visualize results
     visualizer = PaulTrapVisualizer(
@@ -65,13 +481,45 @@ def main() -> None:
         voltages_history=voltages_history,
         a=trap_config.rod_distance,
         trap=simulation.trap,
-        dt=sim_config.dt,
+        dt=sample_interval,
+        schedule=schedule,
+        start_time=start_time,
+        max_field=max_field,
+        playback_speed=output_config.playback_speed,
     )
 
-    visualizer.animate(
-        save_video=output_config.save_video,
-        filename=output_config.output_file,
-    )
+    with PROFILER.timer("animation"):
+        visualizer.animate(
+            save_video=output_config.save_video,
+            filename=output_config.output_file,
+            show=not output_config.no_display,
+            video_workers=output_config.video_workers,
+        )
+
+
+def main() -> None:
+    """Run the Paul trap simulation with command line arguments."""
+    configs = parse_args()
+    output_config = configs[3]
+
+    if output_config.profile or output_config.profile_json is not None:
+        PROFILER.enable()
+    cprofile_output = output_config.cprofile_output
+    profile = cProfile.Profile() if cprofile_output else None
+    try:
+        if profile is not None:
+            profile.runcall(run_simulation, *configs)
+        else:
+            run_simulation(*configs)
+    finally:
+        if profile is not None and cprofile_output:
+            profile.dump_stats(cprofile_output)
+            print(f"cProfile dump written to {cprofile_output}")
+        if PROFILER.enabled:
+            print(f"\n{PROFILER.report()}")
+            if output_config.profile_json is not None:
+                PROFILER.save(output_config.profile_json)
+                print(f"Profile written to {output_config.profile_json}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+"""Shared time-stepping logic of the single-particle and ensemble simulations."""
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from quadrupole_field.core.integrators import Integrator
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.simulation.output import TrajectoryChunk
+from quadrupole_field.simulation.schedule import (
+    VOLTAGE_BLOCK_SIZE,
+    VoltageSchedule,
+    VoltageSource,
+    evaluate_voltages,
+)
+from quadrupole_field.utils.profiling import PROFILER
+
+if TYPE_CHECKING:
+    from quadrupole_field.simulation.checkpoint import Checkpointer
+
+# Default number of recorded samples per streamed chunk
+DEFAULT_CHUNK_SIZE: int = 4096
+
+ElectricFieldFunction = Callable[[NDArray[np.float64], float], NDArray[np.float64]]
+
+
+class SimulationBase(ABC):
+    """Time-stepping coordinator for particles in a trap.
+
+    Subclasses hold the particle state and advance it by one step; this class drives
+    the voltages, the time loop and the recording of samples.
+    """
+
+    trap: Trap
+    dt: float
+    integrator: Integrator
+    step_index: int  # Number of time steps completed so far
+
+    @property
+    @abstractmethod
+    def positions(self) -> NDArray[np.float64]:
+        """Current position(s), shape (2,) or (N, 2)."""
+
+    @property
+    @abstractmethod
+    def velocities(self) -> NDArray[np.float64]:
+        """Current velocity(ies), same shape as ``positions``."""
+
+    @abstractmethod
+    def advance(self, electric_field_at: ElectricFieldFunction, t: float) -> None:
+        """Advance the particle state from t to t + dt."""
+
+    @property
+    @abstractmethod
+    def n_active(self) -> int:
+        """Number of particles that have not been lost."""
+
+    @abstractmethod
+    def detect_losses(self, time: float) -> int:
+        """Record particles lost at the given time and stop simulating them.
+
+        :param time: Current simulation time, stored as the loss time.
+        :return: Number of particles still active.
+        """
+
+    def iter_chunks(
+        self,
+        voltages_over_time: VoltageSource,
+        total_time: float,
+        record_stride: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        checkpointer: "Checkpointer | None" = None,
+    ) -> Iterator[TrajectoryChunk]:
+        """
+        Run the simulation, yielding the recorded samples in fixed-size chunks.
+
+        Only one chunk is held in memory at a time, so memory use does not depend on
+        ``total_time``, and consumers can process samples while the run continues.
+        The run continues from ``step_index``, so calling this again with a larger
+        ``total_time`` (or on a simulation restored from a checkpoint) extends it.
+        Chunks are aligned to multiples of ``chunk_size`` records. The run ends
+        early, with a shorter last chunk, once every particle has been lost.
+        :param voltages_over_time: Voltage schedule, or function providing
+            voltages at a given time.
+        :param total_time: Simulation time to run until, measured from t = 0.
+        :param record_stride: Number of time steps between recorded samples.
+        :param chunk_size: Number of recorded samples per chunk.
+        :param checkpointer: Optional checkpointer, given the chance to save the
+            state after every chunk has been consumed, and saving it once more at
+            the end of the run. Checkpoints thus never lose recorded samples.
+        :return: Iterator over trajectory chunks.
+        """
+        time_steps: int = int(total_time / self.dt)
+        n_records = -(-time_steps // record_stride)  # Ceiling division
+
+        if isinstance(voltages_over_time, VoltageSchedule):
+            # Substage times fall between the precomputed block times; a scalar
+            # waveform sample scales the polarity pattern without building a block
+            waveform = voltages_over_time.waveform
+            polarity = voltages_over_time.polarity
+            voltages = self.trap.voltages
+
+            def electric_field_at(
+                points: NDArray[np.float64], time: float
+            ) -> NDArray[np.float64]:
+                np.multiply(waveform(time), polarity, out=voltages)
+                return self.trap.electric_field_at_points(points)
+
+        else:
+
+            def electric_field_at(
+                points: NDArray[np.float64], time: float
+            ) -> NDArray[np.float64]:
+                self.trap.set_voltages(voltages_over_time(time))
+                return self.trap.electric_field_at_points(points)
+
+        electric_field_at = PROFILER.counted("field_evaluations", electric_field_at)
+
+        first_step = self.step_index
+        last_step = time_steps if self.n_active else first_step
+        chunk = None
+        for t in range(first_step, last_step):
+            if t == first_step or t % VOLTAGE_BLOCK_SIZE == 0:
+                block_start = t
+                block_stop = min(
+                    t - t % VOLTAGE_BLOCK_SIZE + VOLTAGE_BLOCK_SIZE, time_steps
+                )
+                voltage_block = evaluate_voltages(
+                    voltages_over_time,
+                    self.dt * np.arange(block_start, block_stop, dtype=float),
+                )
+
+            self.advance(electric_field_at, t * self.dt)
+            self.step_index = t + 1
+            n_active = self.detect_losses(self.step_index * self.dt)
+
+            if t % record_stride == 0:
+                record = t // record_stride
+                if chunk is None:
+                    chunk = TrajectoryChunk.empty(
+                        record,
+                        min(chunk_size - record % chunk_size, n_records - record),
+                        self.positions.shape,
+                        self.trap.n_rods,
+                    )
+                row = record - chunk.start_record
+                chunk.times[row] = t * self.dt
+                chunk.positions[row] = self.positions
+                chunk.velocities[row] = self.velocities
+                chunk.voltages[row] = voltage_block[t - block_start]
+                if row == len(chunk) - 1:
+                    yield chunk
+                    chunk = None
+                    if checkpointer is not None and checkpointer.due():
+                        checkpointer.save(self)
+
+            if n_active == 0:
+                break
+
+        PROFILER.count("steps", self.step_index - first_step)
+        if chunk is not None:
+            yield chunk.head(row + 1)
+
+        if checkpointer is not None:
+            checkpointer.save(self)
+
+    def run(
+        self,
+        voltages_over_time: VoltageSource,
+        total_time: float,
+        record_stride: int = 1,
+        checkpointer: "Checkpointer | None" = None,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Run the simulation.
+
+        Every ``record_stride``-th step is written into arrays preallocated from
+        ``total_time / dt``, so recording does not allocate per step. A run that
+        continues from a later ``step_index`` returns only the new samples, and a
+        run in which every particle is lost returns the samples up to the loss.
+        :param voltages_over_time: Voltage schedule, or function providing
+            voltages at a given time.
+        :param total_time: Simulation time to run until, measured from t = 0.
+        :param record_stride: Number of time steps between recorded samples.
+        :param checkpointer: Optional checkpointer saving the state during the run.
+        :return: Tuple of (positions, velocities, voltages) over time. Positions and
+            velocities have shape (records, 2) or (records, N, 2), voltages
+            (records, n_rods).
+        """
+        time_steps: int = int(total_time / self.dt)
+        n_records = -(-time_steps // record_stride)  # Ceiling division
+        first_record = -(-self.step_index // record_stride)
+        n_new_records = max(n_records - first_record, 0)
+        positions = np.empty((n_new_records, *self.positions.shape))
+        velocities = np.empty((n_new_records, *self.velocities.shape))
+        voltages_history = np.empty((n_new_records, self.trap.n_rods))
+
+        n_recorded = 0
+        for chunk in self.iter_chunks(
+            voltages_over_time,
+            total_time,
+            record_stride,
+            checkpointer=checkpointer,
+        ):
+            start = chunk.start_record - first_record
+            n_recorded = start + len(chunk)
+            records = slice(start, n_recorded)
+            positions[records] = chunk.positions
+            velocities[records] = chunk.velocities
+            voltages_history[records] = chunk.voltages
+
+        return (
+            positions[:n_recorded],
+            velocities[:n_recorded],
+            voltages_history[:n_recorded],
+        )
@@ -0,0 +1,272 @@
+"""Checkpointing and resuming of simulations.
+
+A checkpoint is a single ``.npz`` file holding everything needed to continue a run
+exactly where it stopped: particle state and losses, the index of the next time
+step, trap geometry and voltages, the voltage schedule, the integrator and its
+internal state, and arbitrary JSON metadata such as the run's configuration.
+Continuing from a checkpoint gives results bit-identical to an uninterrupted run,
+because every time is computed from the step index rather than accumulated.
+"""
+
+import json
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from quadrupole_field.core.integrators import (
+    AdaptiveRungeKuttaIntegrator,
+    get_integrator,
+)
+from quadrupole_field.core.trap import LossReason
+from quadrupole_field.simulation.base import SimulationBase
+from quadrupole_field.simulation.ensemble import EnsembleSimulation
+from quadrupole_field.simulation.schedule import (
+    VoltageSchedule,
+    VoltageSource,
+    schedule_from_dict,
+)
+from quadrupole_field.simulation.simulation import Simulation
+from quadrupole_field.utils.profiling import PROFILER
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(
+    path: str | Path,
+    simulation: SimulationBase,
+    schedule: VoltageSource,
+    metadata: dict[str, Any] | None = None,
+) -> None:
+    """Write the full state of a simulation to a checkpoint file.
+
+    The file is written to a temporary name first and then renamed, so an
+    interrupted write never corrupts an existing checkpoint.
+
+    Args:
+        path: Checkpoint file path
+        simulation: Single-particle or ensemble simulation
+        schedule: Voltage schedule driving the run; plain callables cannot be saved
+        metadata: JSON-compatible extra information, e.g. the run configuration
+    """
+    if not isinstance(schedule, VoltageSchedule):
+        raise ValueError("Only runs driven by a VoltageSchedule can be checkpointed.")
+
+    if isinstance(simulation, Simulation):
+        kind = "single"
+        charges = np.atleast_1d(simulation.particle.q)
+        masses = np.atleast_1d(simulation.particle.m)
+        positions = simulation.particle.position
+        velocities = simulation.particle.velocity
+        losses = {
+            "loss_time": np.atleast_1d(simulation.loss_time or np.nan),
+            "loss_reason": np.atleast_1d(np.int8(simulation.loss_reason)),
+        }
+    elif isinstance(simulation, EnsembleSimulation):
+        kind = "ensemble"
+        # Only the active particles are stored in full, as in the simulation
+        charges = simulation.ensemble.q
+        masses = simulation.ensemble.m
+        positions = simulation.ensemble.positions
+        velocities = simulation.ensemble.velocities
+        losses = {
+            "active": simulation.active,
+            "loss_time": simulation.loss_time,
+            "loss_reason": simulation.loss_reason,
+        }
+    else:
+        raise TypeError(f"Cannot checkpoint {type(simulation).__name__}.")
+
+    integrator = simulation.integrator
+    header = {
+        "version": CHECKPOINT_VERSION,
+        "kind": kind,
+        "a": simulation.trap.a,
+        "n_rods": simulation.trap.n_rods,
+        "rod_radius": simulation.trap.rod_radius,
+        "escape_radius": simulation.trap.escape_radius,
+        "dt": simulation.dt,
+        "step_index": simulation.step_index,
+        "integrator": integrator.name,
+        "tolerance": (
+            integrator.rtol
+            if isinstance(integrator, AdaptiveRungeKuttaIntegrator)
+            else None
+        ),
+        "schedule": schedule.to_dict(),
+        "metadata": metadata or {},
+        "rng_state": None,  # The simulation is deterministic
+    }
+    integrator_state = {
+        f"integrator_{key}": value for key, value in integrator.state_dict().items()
+    }
+
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    arrays: dict[str, Any] = {
+        "header": json.dumps(header),
+        "positions": positions,
+        "velocities": velocities,
+        "charges": charges,
+        "masses": masses,
+        "rod_positions": simulation.trap.rod_positions,
+        "voltages": simulation.trap.voltages,
+        **losses,
+        **integrator_state,
+    }
+    with open(temporary, "wb") as file:
+        np.savez(file, **arrays)
+        PROFILER.count("bytes_written", file.tell())
+    temporary.replace(path)
+
+
+def load_checkpoint(
+    path: str | Path,
+) -> tuple[SimulationBase, VoltageSchedule, dict[str, Any]]:
+    """Restore a simulation from a checkpoint file.
+
+    Args:
+        path: Checkpoint file path
+
+    Returns:
+        Tuple of (simulation, voltage schedule, metadata). Calling ``run`` or
+        ``iter_chunks`` on the simulation with the schedule continues the run.
+    """
+    with np.load(path) as data:
+        header = json.loads(str(data["header"]))
+        if header["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {header['version']}.")
+
+        integrator = get_integrator(header["integrator"], header["tolerance"] or 1e-6)
+        integrator.load_state_dict(
+            {
+                key.removeprefix("integrator_"): (
+                    data[key] if data[key].ndim else data[key].item()
+                )
+                for key in data.files
+                if key.startswith("integrator_")
+            }
+        )
+
+        common = dict(
+            a=header["a"],
+            dt=header["dt"],
+            n_rods=header["n_rods"],
+            integrator=integrator,
+            rod_radius=header["rod_radius"],
+            escape_radius=header["escape_radius"],
+        )
+        simulation: SimulationBase
+        if header["kind"] == "single":
+            single = Simulation(
+                charge=float(data["charges"][0]),
+                mass=float(data["masses"][0]),
+                initial_position=data["positions"],
+                initial_velocity=data["velocities"],
+                **common,
+            )
+            if data["loss_reason"][0] != LossReason.NONE:
+                single.loss_time = float(data["loss_time"][0])
+                single.loss_reason = LossReason(int(data["loss_reason"][0]))
+            simulation = single
+        else:
+            simulation = EnsembleSimulation(
+                charges=data["charges"],
+                masses=data["masses"],
+                initial_positions=data["positions"].reshape(-1, 2),
+                initial_velocities=data["velocities"].reshape(-1, 2),
+                **common,
+            )
+            simulation.n_particles = len(data["loss_reason"])
+            simulation.active = data["active"]
+            simulation.loss_time = data["loss_time"]
+            simulation.loss_reason = data["loss_reason"]
+
+        if not np.array_equal(simulation.trap.rod_positions, data["rod_positions"]):
+            raise ValueError("Checkpoint rod layout does not match the trap.")
+        simulation.trap.set_voltages(data["voltages"])
+        simulation.step_index = header["step_index"]
+
+    return simulation, schedule_from_dict(header["schedule"]), header["metadata"]
+
+
+class Checkpointer:
+    """Decides when to save checkpoints during a run and writes them.
+
+    Checkpoints are saved every ``interval`` seconds of wall-clock time, whenever
+    one of ``signals`` is received (SIGUSR1 by default, on platforms that have it),
+    and at the end of a run. Signal handlers only set a flag; the checkpoint itself
+    is written once the current trajectory chunk has been consumed, so that a
+    resumed run continues exactly after the last delivered sample.
+
+    Signal handlers can only be installed from the main thread; a checkpointer
+    created on another thread, e.g. in a worker, saves periodically only. The
+    previous handlers are restored by ``close``, or on leaving a ``with`` block.
+    """
+
+    path: Path
+    schedule: VoltageSchedule
+    interval: float | None
+    metadata: dict[str, Any]
+
+    def __init__(
+        self,
+        path: str | Path,
+        schedule: VoltageSchedule,
+        interval: float | None = None,
+        metadata: dict[str, Any] | None = None,
+        signals: tuple[int, ...] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.schedule = schedule
+        self.interval = interval
+        self.metadata = metadata or {}
+        self._requested = False
+        self._last_save = time.monotonic()
+        self._previous_handlers: dict[int, Any] = {}
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if signals is None:
+            # Looked up here, since SIGUSR1 does not exist on every platform
+            sigusr1 = getattr(signal, "SIGUSR1", None)
+            signals = () if sigusr1 is None else (sigusr1,)
+        for signum in signals:
+            self._previous_handlers[signum] = signal.signal(signum, self._request)
+
+    def close(self) -> None:
+        """Restore the signal handlers replaced by this checkpointer."""
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers = {}
+
+    def __enter__(self) -> "Checkpointer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _request(self, signum: int, frame: Any) -> None:
+        """Signal handler asking for a checkpoint at the next chunk boundary."""
+        self._requested = True
+
+    def due(self) -> bool:
+        """Whether a checkpoint should be written now."""
+        if self._requested:
+            return True
+        return (
+            self.interval is not None
+            and time.monotonic() - self._last_save >= self.interval
+        )
+
+    def save(self, simulation: SimulationBase) -> None:
+        """Write a checkpoint of the simulation's current state."""
+        save_checkpoint(self.path, simulation, self.schedule, self.metadata)
+        self._requested = False
+        self._last_save = time.monotonic()
+        print(
+            f"Checkpoint at step {simulation.step_index} written to {self.path}",
+            flush=True,
+        )
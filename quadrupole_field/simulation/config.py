@@ -3,7 +3,9 @@ This module contains all configurable parameters for the simulation, organized i
 logical groups. Each parameter can be adjusted to explore different trap behaviors.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from quadrupole_field.core.integrators import INTEGRATORS
 
 
 class SimulationConfig(BaseModel):
@@ -17,6 +19,53 @@ class SimulationConfig(BaseModel):
     total_time: float = Field(
         default=5.0, description="Total simulation duration in seconds", gt=0
     )
+    record_stride: int = Field(
+        default=1,
+        description="Number of time steps between recorded trajectory samples",
+        ge=1,
+    )
+    integrator: str = Field(
+        default="verlet",
+        description=f"Integration scheme, one of {', '.join(INTEGRATORS)}",
+        json_schema_extra={"choices": list(INTEGRATORS)},
+    )
+    tolerance: float = Field(
+        default=1e-6,
+        description="Target relative accuracy per RF period (adaptive integrators "
+        "and automatic dt)",
+        gt=0,
+    )
+    auto_dt: bool = Field(
+        default=False,
+        description="Choose dt from the driving frequency, integrator and tolerance",
+        json_schema_extra={"action": "store_true"},
+    )
+    floquet: bool = Field(
+        default=False,
+        description="Fast-forward with the one-period transfer map, sampling once "
+        "every record_stride RF periods",
+        json_schema_extra={"action": "store_true"},
+    )
+    dimensionless: bool = Field(
+        default=False,
+        description="Integrate in Mathieu units, reusing cached results of runs "
+        "with the same (a, q) and scaled initial conditions; dt is rounded to a "
+        "whole number of steps per RF period",
+        json_schema_extra={"action": "store_true"},
+    )
+
+    @field_validator("integrator")
+    @classmethod
+    def check_integrator(cls, value: str) -> str:
+        """Reject unknown integration schemes."""
+        if value not in INTEGRATORS:
+            raise ValueError(f"Integrator must be one of {INTEGRATORS}")
+        return value
+
+    @property
+    def record_interval(self) -> float:
+        """Simulated time between two recorded samples in seconds."""
+        return self.dt * self.record_stride
 
 
 class TrapConfig(BaseModel):
@@ -33,6 +82,24 @@ class TrapConfig(BaseModel):
     driving_frequency: float = Field(
         default=5.0, description="RF frequency in Hz", gt=0
     )
+    n_rods: int = Field(
+        default=4,
+        description="Number of rods (4 = quadrupole, 6 = hexapole, 8 = octupole)",
+        ge=4,
+        multiple_of=2,
+    )
+    rod_radius_factor: float = Field(
+        default=0.1,
+        description="Rod radius as a fraction of rod_distance; particles closer to "
+        "a rod center are lost",
+        gt=0,
+    )
+    escape_radius_factor: float = Field(
+        default=1.0,
+        description="Escape radius as a multiple of rod_distance; particles "
+        "farther from the center are lost",
+        gt=0,
+    )
     target_q: float = Field(
         default=0.4,
         description="Target stability parameter (0 < q < 0.908)",
@@ -40,6 +107,16 @@ class TrapConfig(BaseModel):
         lt=0.908,
     )
 
+    @property
+    def rod_radius(self) -> float:
+        """Rod radius in meters."""
+        return self.rod_radius_factor * self.rod_distance
+
+    @property
+    def escape_radius(self) -> float:
+        """Escape radius in meters."""
+        return self.escape_radius_factor * self.rod_distance
+
 
 class ParticleConfig(BaseModel):
     """Configuration of the simulated particle.
@@ -60,6 +137,86 @@ class OutputConfig(BaseModel):
     output_file: str = Field(
         default="paul_trap_simulation.mp4", description="Output video filename"
     )
+    live: bool = Field(
+        default=False,
+        description="Animate while the simulation runs in the background, "
+        "open-ended until the window is closed (ignores --total_time)",
+        json_schema_extra={"action": "store_true"},
+    )
+    video_workers: int | None = Field(
+        default=None,
+        description="Processes rendering and encoding video segments in parallel "
+        "(default: all cores)",
+        ge=1,
+    )
+    playback_speed: float = Field(
+        default=1.0,
+        description="Simulated seconds shown per second of animation",
+        gt=0,
+    )
+    no_display: bool = Field(
+        default=False,
+        description="Run headless: never open a window or import plotting code "
+        "(unless --save_video is given, which renders off-screen)",
+        json_schema_extra={"action": "store_true"},
+    )
+    npz_file: str | None = Field(
+        default=None,
+        description="Save the recorded times, positions, velocities and voltages "
+        "to this .npz file",
+    )
+    trajectory_dir: str | None = Field(
+        default=None,
+        description="Stream the trajectory in chunks to this directory instead of "
+        "keeping it in memory (skips the animation)",
+    )
+    chunk_size: int = Field(
+        default=4096, description="Number of recorded samples per chunk", ge=1
+    )
+    checkpoint_file: str | None = Field(
+        default=None,
+        description="Save the simulation state to this file at the end of the run, "
+        "every checkpoint_interval seconds and on SIGUSR1",
+    )
+    checkpoint_interval: float | None = Field(
+        default=None,
+        description="Wall-clock seconds between periodic checkpoints",
+        gt=0,
+    )
+    resume_from: str | None = Field(
+        default=None,
+        description="Continue the run stored in this checkpoint file up to "
+        "total_time",
+    )
+    no_cache: bool = Field(
+        default=False,
+        description="Always re-run the simulation instead of loading results of "
+        "an identical earlier run from the results cache",
+        json_schema_extra={"action": "store_true"},
+    )
+    cache_size_mb: float = Field(
+        default=512.0,
+        description="Size cap of the results cache in megabytes; least recently "
+        "used results are evicted beyond it",
+        gt=0,
+    )
+    profile: bool = Field(
+        default=False,
+        description="Print a breakdown of the time spent in setup, simulation and "
+        "rendering, with counts of steps, field evaluations, frames and bytes "
+        "written",
+        json_schema_extra={"action": "store_true"},
+    )
+    profile_json: str | None = Field(
+        default=None,
+        description="Write the profile breakdown to this JSON file (implies "
+        "--profile)",
+    )
+    cprofile_output: str | None = Field(
+        default=None,
+        description="Write a cProfile dump of the whole run to this file, for "
+        "inspection with pstats or snakeviz",
+    )
 
 
 class InitialConditionsConfig(BaseModel):
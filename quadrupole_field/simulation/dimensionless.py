@@ -0,0 +1,300 @@
+"""Simulation in dimensionless Mathieu units.
+
+With lengths measured in units of the rod distance r0 and time as τ = Ωt/2, the
+equation of motion in the line-charge trap driven by U + V sin(Ωt + φ) becomes
+
+    d²X/dτ² = Σ_i p_i (a/4 + (q/2) sin(2τ + φ)) (X - X_i) / |X - X_i|²,
+
+with the Mathieu parameters a and q of ``utils.stability.mathieu_parameters``. The
+charge, mass, voltages, frequency and rod distance only enter through (a, q), so
+every physical configuration with the same (a, q), phase and scaled initial
+conditions shares one trajectory. ``DimensionlessEngine`` integrates that
+trajectory once, caches it, and rescales it to SI units on demand.
+
+The dimensionless problem is itself an SI simulation of a trap with r0 = 1 m,
+Q/m = 1 C/kg, Ω = 2 rad/s and voltages a/4 + (q/2) sin(2τ + φ), so it runs on the
+regular ``Simulation``. Results agree with SI runs of the same discretization up
+to rounding, except for the tiny regularization distance of the rod field, which
+is fixed in meters rather than in units of the rod distance.
+"""
+
+from dataclasses import asdict, dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from quadrupole_field.core.integrators import get_integrator
+from quadrupole_field.core.trap import (
+    DEFAULT_ESCAPE_RADIUS_FACTOR,
+    DEFAULT_ROD_RADIUS_FACTOR,
+)
+from quadrupole_field.simulation.schedule import RFDCSchedule
+from quadrupole_field.simulation.simulation import Simulation
+from quadrupole_field.utils.cache import ResultsCache, config_key
+from quadrupole_field.utils.stability import mathieu_parameters
+
+# Significant digits kept in dimensionless parameters, so that configurations
+# differing only by floating-point rounding share cached results
+SIGNIFICANT_DIGITS: int = 12
+
+
+def _round(value: float) -> float:
+    return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+
+
+@dataclass(frozen=True)
+class DimensionlessParameters:
+    """Complete description of a run in Mathieu units."""
+
+    a: float
+    q: float
+    phase: float  # RF phase φ at τ = 0
+    initial_position: tuple[float, float]  # In units of the rod distance
+    initial_velocity: tuple[float, float]  # dX/dτ
+    n_rods: int = 4
+    # Rod and escape radius in units of the rod distance
+    rod_radius: float = DEFAULT_ROD_RADIUS_FACTOR
+    escape_radius: float = DEFAULT_ESCAPE_RADIUS_FACTOR
+
+
+@dataclass
+class PhysicalScale:
+    """Conversion between Mathieu units and SI units."""
+
+    rod_distance: float  # Length unit (m)
+    driving_frequency: float  # RF frequency f (Hz); τ = πft
+
+    @property
+    def time_unit(self) -> float:
+        """SI time of a unit of τ, 2/Ω (s)."""
+        return 1 / (np.pi * self.driving_frequency)
+
+    @property
+    def velocity_unit(self) -> float:
+        """SI velocity of a unit of dX/dτ, r0 Ω/2 (m/s)."""
+        return self.rod_distance / self.time_unit
+
+
+def to_dimensionless(
+    rod_distance: float,
+    charge: float,
+    mass: float,
+    rf_amplitude: float,
+    driving_frequency: float,
+    initial_position: tuple[float, float],
+    initial_velocity: tuple[float, float],
+    dc_offset: float = 0.0,
+    phase: float = 0.0,
+    n_rods: int = 4,
+    rod_radius: float | None = None,
+    escape_radius: float | None = None,
+) -> tuple[DimensionlessParameters, PhysicalScale]:
+    """Convert a physical configuration to Mathieu units.
+
+    Args:
+        rod_distance: Distance from trap center to rods (m)
+        charge: Particle charge (C)
+        mass: Particle mass (kg)
+        rf_amplitude: RF voltage amplitude V (V)
+        driving_frequency: RF frequency (Hz)
+        initial_position: Initial position (m)
+        initial_velocity: Initial velocity (m/s)
+        dc_offset: DC voltage U (V)
+        phase: RF phase at t = 0
+        n_rods: Number of rods
+        rod_radius: Rod radius (m), trap default if omitted
+        escape_radius: Escape radius (m), trap default if omitted
+
+    Returns:
+        Tuple of (dimensionless parameters, scale converting results back to SI)
+    """
+    scale = PhysicalScale(rod_distance, driving_frequency)
+    a, q = mathieu_parameters(
+        rf_amplitude, dc_offset, charge / mass, driving_frequency, rod_distance
+    )
+    params = DimensionlessParameters(
+        a=_round(float(a)),
+        q=_round(float(q)),
+        phase=_round(phase),
+        initial_position=(
+            _round(initial_position[0] / rod_distance),
+            _round(initial_position[1] / rod_distance),
+        ),
+        initial_velocity=(
+            _round(initial_velocity[0] / scale.velocity_unit),
+            _round(initial_velocity[1] / scale.velocity_unit),
+        ),
+        n_rods=n_rods,
+        rod_radius=(
+            DEFAULT_ROD_RADIUS_FACTOR
+            if rod_radius is None
+            else _round(rod_radius / rod_distance)
+        ),
+        escape_radius=(
+            DEFAULT_ESCAPE_RADIUS_FACTOR
+            if escape_radius is None
+            else _round(escape_radius / rod_distance)
+        ),
+    )
+    return params, scale
+
+
+@dataclass
+class DimensionlessTrajectory:
+    """Recorded samples of a dimensionless run, possibly ended early by a loss."""
+
+    tau: NDArray[np.float64]  # Sample times τ, shape (k,)
+    positions: NDArray[np.float64]  # Shape (k, 2), in units of the rod distance
+    velocities: NDArray[np.float64]  # dX/dτ, shape (k, 2)
+    loss_tau: float  # τ at which the particle was lost, NaN if it survived
+    loss_reason: int  # LossReason of the particle
+
+    def to_si(
+        self, scale: PhysicalScale
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """Rescale to SI units.
+
+        Returns:
+            Tuple of (times, positions, velocities) in s, m and m/s
+        """
+        return (
+            self.tau * scale.time_unit,
+            self.positions * scale.rod_distance,
+            self.velocities * scale.velocity_unit,
+        )
+
+
+class DimensionlessEngine:
+    """Runs simulations in Mathieu units, reusing results across physical units.
+
+    Runs are identified by their dimensionless parameters and discretization, and
+    stored in a ``ResultsCache``, so every later run mapping to the same (a, q) and
+    scaled initial conditions is a cache lookup.
+    """
+
+    steps_per_period: int
+    integrator: str
+    cache: ResultsCache | None
+
+    def __init__(
+        self,
+        steps_per_period: int = 200,
+        integrator: str = "yoshida4",
+        cache: ResultsCache | None = None,
+    ) -> None:
+        """
+        :param steps_per_period: Integration steps per RF period.
+        :param integrator: Integration scheme, one of ``INTEGRATORS``.
+        :param cache: Results cache; results are not stored if omitted.
+        """
+        self.steps_per_period = steps_per_period
+        self.integrator = integrator
+        self.cache = cache
+
+    def run(
+        self,
+        params: DimensionlessParameters,
+        n_steps: int,
+        record_stride: int = 1,
+    ) -> DimensionlessTrajectory:
+        """Integrate a dimensionless configuration, or load it from the cache.
+
+        Args:
+            params: Dimensionless configuration
+            n_steps: Number of integration steps
+            record_stride: Number of steps between recorded samples
+
+        Returns:
+            Recorded trajectory in Mathieu units
+        """
+        key = config_key(
+            run=asdict(params),
+            n_steps=n_steps,
+            record_stride=record_stride,
+            steps_per_period=self.steps_per_period,
+            integrator=self.integrator,
+        )
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return DimensionlessTrajectory(
+                tau=cached["tau"],
+                positions=cached["positions"],
+                velocities=cached["velocities"],
+                loss_tau=float(cached["loss_tau"]),
+                loss_reason=int(cached["loss_reason"]),
+            )
+
+        trajectory = self._integrate(params, n_steps, record_stride)
+        if self.cache is not None:
+            self.cache.put(
+                key,
+                tau=trajectory.tau,
+                positions=trajectory.positions,
+                velocities=trajectory.velocities,
+                loss_tau=np.float64(trajectory.loss_tau),
+                loss_reason=np.int8(trajectory.loss_reason),
+            )
+        return trajectory
+
+    def _integrate(
+        self,
+        params: DimensionlessParameters,
+        n_steps: int,
+        record_stride: int,
+    ) -> DimensionlessTrajectory:
+        """Integrate as an SI trap with r0 = 1, Q/m = 1 and Ω = 2."""
+        d_tau = np.pi / self.steps_per_period
+        simulation = Simulation(
+            a=1.0,
+            charge=1.0,
+            mass=1.0,
+            initial_position=params.initial_position,
+            initial_velocity=params.initial_velocity,
+            dt=d_tau,
+            n_rods=params.n_rods,
+            integrator=get_integrator(self.integrator),
+            rod_radius=params.rod_radius,
+            escape_radius=params.escape_radius,
+        )
+        schedule = RFDCSchedule(
+            rf_amplitude=params.q / 2,
+            frequency=1 / np.pi,
+            polarity=simulation.trap.polarity,
+            dc_offset=params.a / 4,
+            phase=params.phase,
+        )
+        # Half a step of margin, so that rounding cannot drop the last step
+        positions, velocities, _ = simulation.run(
+            schedule, (n_steps + 0.5) * d_tau, record_stride
+        )
+        return DimensionlessTrajectory(
+            tau=np.arange(len(positions), dtype=float) * record_stride * d_tau,
+            positions=positions,
+            velocities=velocities,
+            loss_tau=np.nan if simulation.loss_time is None else simulation.loss_time,
+            loss_reason=int(simulation.loss_reason),
+        )
+
+    def run_si(
+        self,
+        params: DimensionlessParameters,
+        scale: PhysicalScale,
+        total_time: float,
+        record_stride: int = 1,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """Run a configuration given by ``to_dimensionless`` and rescale to SI.
+
+        Args:
+            params: Dimensionless configuration
+            scale: Physical scale of the configuration
+            total_time: Simulation duration (s)
+            record_stride: Number of steps between recorded samples
+
+        Returns:
+            Tuple of (times, positions, velocities) in SI units; the time step is
+            one RF period divided by ``steps_per_period``
+        """
+        n_steps = int(
+            round(total_time * scale.driving_frequency * self.steps_per_period, 9)
+        )
+        return self.run(params, n_steps, record_stride).to_si(scale)
@@ -0,0 +1,91 @@
+"""Vectorized simulation of many independent particles in one trap."""
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from quadrupole_field.core.ensemble import ParticleEnsemble
+from quadrupole_field.core.integrators import Integrator, VelocityVerletIntegrator
+from quadrupole_field.core.trap import LossReason, Trap
+from quadrupole_field.simulation.base import ElectricFieldFunction, SimulationBase
+
+
+class EnsembleSimulation(SimulationBase):
+    """Simulation coordinator for an ensemble of particles.
+
+    All particles share the trap and its voltages, so every field evaluation of the
+    integrator covers the whole ensemble in a single vectorized call. Lost particles
+    are removed from ``ensemble``, which only holds the active particles, so later
+    steps only pay for the survivors. Positions and velocities of lost particles
+    are reported as NaN.
+    """
+
+    trap: Trap
+    ensemble: ParticleEnsemble  # Active particles only
+    dt: float
+    integrator: Integrator
+    step_index: int
+    n_particles: int  # Number of particles, including lost ones
+    active: NDArray[np.intp]  # Indices of the active particles, shape (n_active,)
+    loss_time: NDArray[np.float64]  # Time each particle was lost, NaN if active
+    loss_reason: NDArray[np.int8]  # LossReason of each particle, shape (N,)
+
+    def __init__(
+        self,
+        a: float,
+        charges: ArrayLike,
+        masses: ArrayLike,
+        initial_positions: ArrayLike,
+        initial_velocities: ArrayLike,
+        dt: float,
+        n_rods: int = 4,
+        integrator: Integrator | None = None,
+        rod_radius: float | None = None,
+        escape_radius: float | None = None,
+    ) -> None:
+        """Initialize the simulation with the trap and particle ensemble."""
+        self.trap = Trap(a, n_rods, rod_radius, escape_radius)
+        self.ensemble = ParticleEnsemble(
+            charges, masses, initial_positions, initial_velocities
+        )
+        self.dt = dt
+        self.integrator = (
+            integrator if integrator is not None else VelocityVerletIntegrator()
+        )
+        self.step_index = 0
+        self.n_particles = len(self.ensemble)
+        self.active = np.arange(self.n_particles)
+        self.loss_time = np.full(self.n_particles, np.nan)
+        self.loss_reason = np.zeros(self.n_particles, dtype=np.int8)
+
+    @property
+    def positions(self) -> NDArray[np.float64]:
+        return self._scatter(self.ensemble.positions)
+
+    @property
+    def velocities(self) -> NDArray[np.float64]:
+        return self._scatter(self.ensemble.velocities)
+
+    def _scatter(self, active_values: NDArray[np.float64]) -> NDArray[np.float64]:
+        """Expand values of the active particles to all particles, NaN if lost."""
+        if len(self.active) == self.n_particles:
+            return active_values
+        values = np.full((self.n_particles, 2), np.nan)
+        values[self.active] = active_values
+        return values
+
+    @property
+    def n_active(self) -> int:
+        return len(self.active)
+
+    def detect_losses(self, time: float) -> int:
+        reasons = self.trap.detect_losses(self.ensemble.positions)
+        lost = reasons != LossReason.NONE
+        if lost.any():
+            self.loss_time[self.active[lost]] = time
+            self.loss_reason[self.active[lost]] = reasons[lost]
+            self.active = self.active[~lost]
+            self.ensemble.compact(~lost)
+        return self.n_active
+
+    def advance(self, electric_field_at: ElectricFieldFunction, t: float) -> None:
+        self.ensemble.advance(self.integrator, electric_field_at, t, self.dt)
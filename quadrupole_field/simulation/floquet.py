@@ -0,0 +1,206 @@
+"""Floquet fast-forward propagation for periodic drives.
+
+With a periodic RF drive the particle motion over one RF period is a fixed map of the
+phase-space state (x, y, vx, vy). For the ideal quadrupole the field is linear in the
+position, so this map is a 4x4 matrix, the monodromy matrix M. Once M is known, the
+stroboscopic state after n periods is simply M^n applied to the initial state, which
+replaces stepping through n periods with the integrator.
+
+For the line-charge rod model the monodromy matrix is the linearization of the
+one-period map around the trap center, built by integrating one period for a set of
+small perturbations. It is exact for the ideal quadrupole and accurate for small
+orbits in the rod model.
+"""
+
+import json
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from quadrupole_field.core.ensemble import ParticleEnsemble
+from quadrupole_field.core.integrators import Integrator, get_integrator
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.simulation.config import ParticleConfig, TrapConfig
+from quadrupole_field.simulation.schedule import VoltageSchedule
+
+# Relative size of the phase-space perturbations used to build the monodromy matrix
+PERTURBATION_SCALE: float = 1e-6
+
+# Condition number above which the eigenbasis is not used for matrix powers
+MAX_EIGENBASIS_CONDITION: float = 1e8
+
+
+class FloquetPropagator:
+    """Stroboscopic propagation by the one-period transfer map of a periodic drive.
+
+    States are arrays (x, y, vx, vy), sampled at the drive phase of ``start_time``.
+    """
+
+    period: float
+    start_time: float
+    monodromy: NDArray[np.float64]  # One-period transfer matrix, shape (4, 4)
+
+    def __init__(
+        self,
+        trap: Trap,
+        schedule: VoltageSchedule,
+        charge: float,
+        mass: float,
+        steps_per_period: int = 256,
+        integrator: Integrator | None = None,
+        start_time: float = 0.0,
+    ) -> None:
+        """Build the monodromy matrix by integrating one RF period.
+
+        Args:
+            trap: Trap providing the field
+            schedule: Periodic voltage schedule driving the trap
+            charge: Particle charge (C)
+            mass: Particle mass (kg)
+            steps_per_period: Number of integration steps over the period
+            integrator: Integration scheme, Yoshida 4th order by default
+            start_time: Time whose drive phase the stroboscopic samples are taken at
+        """
+        if schedule.period is None:
+            raise ValueError("Floquet propagation requires a periodic schedule.")
+        self.period = schedule.period
+        self.start_time = start_time
+        self.monodromy = self._build_monodromy(
+            trap,
+            schedule,
+            charge,
+            mass,
+            steps_per_period,
+            integrator if integrator is not None else get_integrator("yoshida4"),
+        )
+
+    def _build_monodromy(
+        self,
+        trap: Trap,
+        schedule: VoltageSchedule,
+        charge: float,
+        mass: float,
+        steps_per_period: int,
+        integrator: Integrator,
+    ) -> NDArray[np.float64]:
+        """Calculate the one-period map by central differences around the center.
+
+        The 8 perturbed states (± a step along each phase-space axis) are integrated
+        together as one ensemble.
+        """
+        position_step = PERTURBATION_SCALE * trap.a
+        velocity_step = position_step / self.period
+        steps = np.array([position_step, position_step, velocity_step, velocity_step])
+        perturbations = np.concatenate([np.diag(steps), -np.diag(steps)])
+
+        ensemble = ParticleEnsemble(
+            charge, mass, perturbations[:, :2], perturbations[:, 2:]
+        )
+
+        def electric_field_at(
+            points: NDArray[np.float64], time: float
+        ) -> NDArray[np.float64]:
+            trap.set_voltages(schedule.voltages(time))
+            return trap.electric_field_at_points(points)
+
+        dt = self.period / steps_per_period
+        for step in range(steps_per_period):
+            ensemble.advance(
+                integrator, electric_field_at, self.start_time + step * dt, dt
+            )
+
+        final_states = np.hstack([ensemble.positions, ensemble.velocities])
+        plus, minus = final_states[:4], final_states[4:]
+        return ((plus - minus) / (2 * steps[:, np.newaxis])).T
+
+    @property
+    def floquet_multipliers(self) -> NDArray[np.complex128]:
+        """Eigenvalues of the monodromy matrix.
+
+        The motion is stable when all multipliers lie on the unit circle.
+        """
+        return np.linalg.eigvals(self.monodromy).astype(complex)
+
+    @property
+    def is_stable(self) -> bool:
+        """Whether no Floquet multiplier lies outside the unit circle."""
+        return bool(np.all(np.abs(self.floquet_multipliers) <= 1 + 1e-9))
+
+    def transfer_matrix(self, n_periods: int) -> NDArray[np.float64]:
+        """Transfer matrix over n periods, M^n, by repeated squaring."""
+        return np.linalg.matrix_power(self.monodromy, n_periods)
+
+    def propagate(self, state: ArrayLike, n_periods: int) -> NDArray[np.float64]:
+        """Propagate a state (x, y, vx, vy) forward by n periods.
+
+        Args:
+            state: Initial state(s), shape (4,) or (N, 4)
+            n_periods: Number of RF periods
+
+        Returns:
+            State(s) after n periods, same shape as the input
+        """
+        return np.asarray(state, dtype=float) @ self.transfer_matrix(n_periods).T
+
+    def stroboscopic(
+        self, state: ArrayLike, n_periods: ArrayLike
+    ) -> NDArray[np.float64]:
+        """Calculate the state after each of many period counts at once.
+
+        Uses the eigendecomposition M = V Λ V⁻¹, so M^n = V Λ^n V⁻¹ is evaluated for
+        all n in one vectorized operation.
+
+        Args:
+            state: Initial state (x, y, vx, vy), shape (4,)
+            n_periods: Period counts, shape (K,)
+
+        Returns:
+            States after each period count, shape (K, 4)
+        """
+        state = np.asarray(state, dtype=float)
+        n_periods = np.asarray(n_periods)
+        eigenvalues, eigenvectors = np.linalg.eig(self.monodromy)
+        if np.linalg.cond(eigenvectors) > MAX_EIGENBASIS_CONDITION:
+            return np.array([self.propagate(state, int(n)) for n in n_periods])
+
+        modal_state = np.linalg.solve(eigenvectors, state.astype(complex))
+        modal_evolution = np.power.outer(eigenvalues, n_periods).T * modal_state
+        return np.real(modal_evolution @ eigenvectors.T)
+
+
+_PROPAGATOR_CACHE: dict[str, FloquetPropagator] = {}
+
+
+def get_floquet_propagator(
+    trap_config: TrapConfig,
+    particle_config: ParticleConfig,
+    schedule: VoltageSchedule,
+    steps_per_period: int = 256,
+    integrator: str = "yoshida4",
+) -> FloquetPropagator:
+    """Return the Floquet propagator for a configuration, building it once.
+
+    Propagators are cached per combination of trap, particle, schedule and
+    integration settings, so repeated runs with the same configuration reuse the
+    monodromy matrix.
+    """
+    key = json.dumps(
+        [
+            trap_config.model_dump(mode="json"),
+            particle_config.model_dump(mode="json"),
+            schedule.to_dict(),
+            steps_per_period,
+            integrator,
+        ],
+        sort_keys=True,
+    )
+    if key not in _PROPAGATOR_CACHE:
+        _PROPAGATOR_CACHE[key] = FloquetPropagator(
+            Trap(trap_config.rod_distance, trap_config.n_rods),
+            schedule,
+            particle_config.charge,
+            particle_config.mass,
+            steps_per_period,
+            get_integrator(integrator),
+        )
+    return _PROPAGATOR_CACHE[key]
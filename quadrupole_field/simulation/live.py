@@ -0,0 +1,238 @@
+"""Simulation running in the background while its results are consumed.
+
+``LiveSimulation`` integrates on a background thread and streams the recorded
+samples into a ``SampleRing``, a fixed-size ring buffer that a consumer, such as
+the live animation, reads while the run continues. The consumer releases samples it
+no longer needs; once the ring is full of unreleased samples, the producer blocks
+until space is released, so a slow consumer throttles the simulation instead of
+letting memory grow. Runs may be open-ended, lasting until they are stopped.
+"""
+
+import threading
+from typing import Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from quadrupole_field.simulation.base import SimulationBase
+from quadrupole_field.simulation.output import TrajectoryChunk
+from quadrupole_field.simulation.schedule import VoltageSource
+
+# Default number of samples held by a SampleRing
+DEFAULT_RING_SIZE: int = 8192
+
+# Samples per chunk pushed by LiveSimulation; small, so that the first samples
+# arrive after a few steps
+LIVE_CHUNK_SIZE: int = 32
+
+
+class SampleRing:
+    """Fixed-size ring buffer of recorded samples, shared between two threads.
+
+    Samples are addressed by their record index within the whole run. A sample
+    stays readable until the consumer releases it, and the producer never
+    overwrites unreleased samples, so reading needs no lock.
+    """
+
+    capacity: int
+    times: NDArray[np.float64]  # Shape (capacity,)
+    positions: NDArray[np.float64]  # Shape (capacity, 2)
+    velocities: NDArray[np.float64]  # Shape (capacity, 2)
+    voltages: NDArray[np.float64]  # Shape (capacity, n_rods)
+    written: int  # Number of samples written so far
+    released: int  # Samples before this record index may be overwritten
+    closed: bool  # No more samples will be written
+    _condition: threading.Condition
+
+    def __init__(self, n_rods: int, capacity: int = DEFAULT_RING_SIZE) -> None:
+        """
+        :param n_rods: Number of rod voltages per sample.
+        :param capacity: Maximum number of unreleased samples.
+        """
+        self.capacity = capacity
+        self.times = np.empty(capacity)
+        self.positions = np.empty((capacity, 2))
+        self.velocities = np.empty((capacity, 2))
+        self.voltages = np.empty((capacity, n_rods))
+        self.written = 0
+        self.released = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        """Number of samples written so far."""
+        return self.written
+
+    def put(self, chunk: TrajectoryChunk) -> bool:
+        """
+        Append the samples of a chunk, waiting for space as needed.
+        :param chunk: Samples continuing the ring, with ``start_record == written``.
+        :return: False if the ring was closed, and the samples were dropped.
+        """
+        start = 0
+        while start < len(chunk):
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self.closed or self.written - self.released < self.capacity
+                )
+                if self.closed:
+                    return False
+                free = self.capacity - (self.written - self.released)
+            # Only the producer writes, and never into unreleased samples
+            stop = min(len(chunk), start + free)
+            slots = np.arange(self.written, self.written + stop - start) % self.capacity
+            self.times[slots] = chunk.times[start:stop]
+            self.positions[slots] = chunk.positions[start:stop]
+            self.velocities[slots] = chunk.velocities[start:stop]
+            self.voltages[slots] = chunk.voltages[start:stop]
+            with self._condition:
+                self.written += stop - start
+                self._condition.notify_all()
+            start = stop
+        return True
+
+    def wait(self, count: int, timeout: float | None = None) -> int:
+        """
+        Wait until at least ``count`` samples have been written or the ring closed.
+        :param count: Number of samples to wait for.
+        :param timeout: Maximum time to wait in seconds, unlimited if None.
+        :return: Number of samples written.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.closed or self.written >= count, timeout
+            )
+            return self.written
+
+    def release(self, record: int) -> None:
+        """Allow the samples before ``record`` to be overwritten."""
+        with self._condition:
+            if record > self.released:
+                self.released = min(record, self.written)
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        """Mark the end of the samples, waking up all waiting threads."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def view(self, array: NDArray[np.float64]) -> "RingView":
+        """Array-like access by record index to one of the sample arrays."""
+        return RingView(self, array)
+
+
+class RingView:
+    """Read access by record index to a sample array of a ``SampleRing``.
+
+    Indexing with a record index or a slice of record indices returns the samples
+    like an array of the whole run would, for records not yet released.
+    """
+
+    ring: SampleRing
+    array: NDArray[np.float64]
+
+    def __init__(self, ring: SampleRing, array: NDArray[np.float64]) -> None:
+        self.ring = ring
+        self.array = array
+
+    def __len__(self) -> int:
+        return self.ring.written
+
+    def __getitem__(self, index: int | slice) -> NDArray[np.float64]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.ring.written)
+            return self.array[np.arange(start, stop, step) % self.ring.capacity]
+        if index < 0:
+            index += self.ring.written
+        return self.array[index % self.ring.capacity]
+
+
+class LiveSimulation:
+    """Runs a simulation on a background thread, streaming into a ``SampleRing``."""
+
+    simulation: SimulationBase
+    voltages_over_time: VoltageSource
+    record_stride: int
+    total_time: float | None  # None for an open-ended run
+    chunk_size: int
+    ring: SampleRing
+    error: BaseException | None  # Exception that ended the run, if any
+    _stopped: threading.Event
+    _thread: threading.Thread
+
+    def __init__(
+        self,
+        simulation: SimulationBase,
+        voltages_over_time: VoltageSource,
+        record_stride: int = 1,
+        total_time: float | None = None,
+        chunk_size: int = LIVE_CHUNK_SIZE,
+        capacity: int = DEFAULT_RING_SIZE,
+    ) -> None:
+        """
+        :param simulation: Single-particle simulation to run.
+        :param voltages_over_time: Voltage schedule, or function providing
+            voltages at a given time.
+        :param record_stride: Number of time steps between recorded samples.
+        :param total_time: Simulation time to run until, or None to run until the
+            particle is lost or ``stop`` is called.
+        :param chunk_size: Number of samples integrated before they are pushed.
+        :param capacity: Number of samples the ring buffer holds.
+        """
+        self.simulation = simulation
+        self.voltages_over_time = voltages_over_time
+        self.record_stride = record_stride
+        self.total_time = total_time
+        self.chunk_size = min(chunk_size, capacity)
+        self.ring = SampleRing(simulation.trap.n_rods, capacity)
+        self.error = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="live-simulation", daemon=True
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is still integrating."""
+        return self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start integrating on the background thread."""
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop the run after the current chunk and wait for the thread to end.
+        :param timeout: Maximum time to wait for the thread in seconds.
+        """
+        self._stopped.set()
+        self.ring.close()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _segments(self) -> Iterator[TrajectoryChunk]:
+        """Chunks of the run, integrated one chunk at a time."""
+        dt = self.simulation.dt
+        last_step = None if self.total_time is None else int(self.total_time / dt)
+        while not self._stopped.is_set() and self.simulation.n_active:
+            step = self.simulation.step_index
+            if last_step is not None and step >= last_step:
+                return
+            # Half a step of margin, so that rounding cannot drop the last step
+            end_time = (step + self.chunk_size * self.record_stride + 0.5) * dt
+            if self.total_time is not None:
+                end_time = min(end_time, self.total_time)
+            yield from self.simulation.iter_chunks(
+                self.voltages_over_time, end_time, self.record_stride, self.chunk_size
+            )
+
+    def _run(self) -> None:
+        try:
+            for chunk in self._segments():
+                if not self.ring.put(chunk):
+                    break
+        except BaseException as error:
+            self.error = error
+        finally:
+            self.ring.close()
@@ -0,0 +1,226 @@
+"""Chunked trajectory output.
+
+Long runs are streamed as ``TrajectoryChunk`` objects holding a fixed number of
+recorded samples. ``ChunkedTrajectoryWriter`` appends chunks to a directory of
+``.npz`` files plus a JSON manifest, which is rewritten after every chunk so that
+readers can start processing a trajectory while it is still being written.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from quadrupole_field.utils.profiling import PROFILER
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+@dataclass
+class TrajectoryChunk:
+    """A contiguous block of recorded simulation samples."""
+
+    start_record: int  # Index of the first sample within the whole run
+    times: NDArray[np.float64]  # Sample times, shape (k,)
+    positions: NDArray[np.float64]  # Shape (k, 2) or (k, N, 2)
+    velocities: NDArray[np.float64]  # Same shape as positions
+    voltages: NDArray[np.float64]  # Rod voltages, shape (k, n_rods)
+
+    @classmethod
+    def empty(
+        cls,
+        start_record: int,
+        length: int,
+        state_shape: tuple[int, ...],
+        n_rods: int,
+    ) -> "TrajectoryChunk":
+        """Allocate an uninitialized chunk for ``length`` samples."""
+        return cls(
+            start_record=start_record,
+            times=np.empty(length),
+            positions=np.empty((length, *state_shape)),
+            velocities=np.empty((length, *state_shape)),
+            voltages=np.empty((length, n_rods)),
+        )
+
+    def __len__(self) -> int:
+        """Number of samples in the chunk."""
+        return len(self.times)
+
+    def head(self, length: int) -> "TrajectoryChunk":
+        """View of the first ``length`` samples, for a run that ended early."""
+        return TrajectoryChunk(
+            start_record=self.start_record,
+            times=self.times[:length],
+            positions=self.positions[:length],
+            velocities=self.velocities[:length],
+            voltages=self.voltages[:length],
+        )
+
+
+class ChunkedTrajectoryWriter:
+    """Append trajectory chunks to an on-disk directory.
+
+    Each chunk is stored as ``chunk_<index>.npz``; ``manifest.json`` lists the
+    completed chunks together with user-supplied metadata.
+    """
+
+    directory: Path
+    metadata: dict[str, Any]
+    chunk_files: list[str]
+    n_records: int
+
+    def __init__(
+        self,
+        directory: str | Path,
+        metadata: dict[str, Any] | None = None,
+        append: bool = False,
+    ) -> None:
+        """Create the output directory.
+
+        Args:
+            directory: Output directory
+            metadata: JSON-compatible information stored in the manifest
+            append: Continue the trajectory already in the directory, e.g. for a
+                run resumed from a checkpoint, instead of removing its chunks
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if append and (self.directory / MANIFEST_FILENAME).exists():
+            manifest = read_manifest(self.directory)
+            self.metadata = {**manifest["metadata"], **(metadata or {})}
+            self.chunk_files = manifest["chunks"]
+            self.n_records = manifest["n_records"]
+        else:
+            for old_chunk in self.directory.glob("chunk_*.npz"):
+                old_chunk.unlink()
+            self.metadata = metadata or {}
+            self.chunk_files = []
+            self.n_records = 0
+        self._write_manifest(complete=False)
+
+    def write(self, chunk: TrajectoryChunk) -> None:
+        """Append a chunk and update the manifest."""
+        filename = f"chunk_{len(self.chunk_files):06d}.npz"
+        self._save_chunk(filename, chunk)
+        self.chunk_files.append(filename)
+        self.n_records += len(chunk)
+        self._write_manifest(complete=False)
+
+    def truncate(self, n_records: int) -> None:
+        """Drop the samples from record index ``n_records`` on.
+
+        A run resumed from a checkpoint continues after the last sample delivered
+        before the checkpoint was saved, while the interrupted run may have written
+        more chunks before it stopped. Those samples are recorded again, so they are
+        removed first: later chunks are deleted and a chunk that straddles
+        ``n_records`` is rewritten with its head only.
+
+        Args:
+            n_records: Number of samples to keep
+        """
+        if n_records > self.n_records:
+            raise ValueError(
+                f"Cannot continue at sample {n_records}: the trajectory in "
+                f"{self.directory} only has {self.n_records} samples."
+            )
+        kept_files = []
+        for filename in self.chunk_files:
+            with np.load(self.directory / filename) as data:
+                start_record = int(data["start_record"])
+                length = len(data["times"])
+            if start_record >= n_records:
+                (self.directory / filename).unlink()
+                continue
+            if start_record + length > n_records:
+                chunk = load_chunk(self.directory / filename)
+                self._save_chunk(filename, chunk.head(n_records - start_record))
+            kept_files.append(filename)
+        self.chunk_files = kept_files
+        self.n_records = n_records
+        self._write_manifest(complete=False)
+
+    def close(self) -> None:
+        """Mark the trajectory as complete."""
+        self._write_manifest(complete=True)
+
+    def __enter__(self) -> "ChunkedTrajectoryWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        # An interrupted run leaves the manifest incomplete, ready to be appended to
+        if exc_type is None:
+            self.close()
+
+    def _save_chunk(self, filename: str, chunk: TrajectoryChunk) -> None:
+        """Atomically write a chunk file, replacing any earlier version."""
+        temporary = self.directory / f"{filename}.tmp"
+        with open(temporary, "wb") as file:
+            np.savez(
+                file,
+                start_record=chunk.start_record,
+                times=chunk.times,
+                positions=chunk.positions,
+                velocities=chunk.velocities,
+                voltages=chunk.voltages,
+            )
+            PROFILER.count("bytes_written", file.tell())
+        temporary.replace(self.directory / filename)
+
+    def _write_manifest(self, complete: bool) -> None:
+        """Atomically replace the manifest, so readers never see a partial file."""
+        manifest = {
+            "metadata": self.metadata,
+            "chunks": self.chunk_files,
+            "n_records": self.n_records,
+            "complete": complete,
+        }
+        temporary = self.directory / f"{MANIFEST_FILENAME}.tmp"
+        temporary.write_text(json.dumps(manifest, indent=2))
+        temporary.replace(self.directory / MANIFEST_FILENAME)
+
+
+def read_manifest(directory: str | Path) -> dict[str, Any]:
+    """Read the manifest of a chunked trajectory directory."""
+    return json.loads((Path(directory) / MANIFEST_FILENAME).read_text())
+
+
+def load_chunk(path: str | Path) -> TrajectoryChunk:
+    """Read a chunk file written by ``ChunkedTrajectoryWriter``."""
+    with np.load(path) as data:
+        return TrajectoryChunk(
+            start_record=int(data["start_record"]),
+            times=data["times"],
+            positions=data["positions"],
+            velocities=data["velocities"],
+            voltages=data["voltages"],
+        )
+
+
+def read_trajectory_chunks(directory: str | Path) -> Iterator[TrajectoryChunk]:
+    """Iterate over the chunks written so far to a trajectory directory."""
+    directory = Path(directory)
+    for filename in read_manifest(directory)["chunks"]:
+        yield load_chunk(directory / filename)
+
+
+def load_trajectory(
+    directory: str | Path,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Load a whole chunked trajectory into memory.
+
+    Returns:
+        Tuple of (positions, velocities, voltages), as returned by
+        ``Simulation.run``
+    """
+    chunks = list(read_trajectory_chunks(directory))
+    if not chunks:
+        raise ValueError(f"No trajectory chunks found in {directory}.")
+    return (
+        np.concatenate([chunk.positions for chunk in chunks]),
+        np.concatenate([chunk.velocities for chunk in chunks]),
+        np.concatenate([chunk.voltages for chunk in chunks]),
+    )
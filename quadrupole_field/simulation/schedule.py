@@ -0,0 +1,279 @@
+"""Voltage schedules driving the trap rods.
+
+A schedule describes the rod voltages as a scalar waveform multiplied by a fixed
+per-rod polarity pattern (see ``Trap.polarity``). Waveforms are evaluated on whole
+time arrays at once, so the integrator can precompute voltages in blocks instead of
+calling a Python function on every step.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Union
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# Number of time steps whose voltages are precomputed in one vectorized call
+VOLTAGE_BLOCK_SIZE: int = 4096
+
+
+class VoltageSchedule(ABC):
+    """Time-dependent rod voltages of the form ``waveform(t) * polarity``."""
+
+    polarity: NDArray[np.float64]  # Sign of the drive on each rod, shape (n_rods,)
+
+    def __init__(self, polarity: ArrayLike) -> None:
+        self.polarity = np.array(polarity, dtype=float)
+
+    @abstractmethod
+    def waveform(self, t: ArrayLike) -> NDArray[np.float64]:
+        """Calculate the scalar drive voltage at time(s) t.
+
+        Args:
+            t: Time(s) in seconds, scalar or array
+
+        Returns:
+            Drive voltage with the shape of t
+        """
+
+    @property
+    @abstractmethod
+    def period(self) -> float | None:
+        """Period of the waveform in seconds, or None if it is not periodic."""
+
+    @property
+    @abstractmethod
+    def amplitude(self) -> float:
+        """Peak absolute drive voltage over all times."""
+
+    @abstractmethod
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the schedule parameters to a JSON-compatible dictionary."""
+
+    def voltages(self, t: ArrayLike) -> NDArray[np.float64]:
+        """Calculate the voltage of every rod at time(s) t.
+
+        Args:
+            t: Time(s) in seconds, scalar or array
+
+        Returns:
+            Rod voltages with shape ``np.shape(t) + (n_rods,)``
+        """
+        return np.multiply.outer(self.waveform(t), self.polarity)
+
+    def __call__(self, t: float) -> NDArray[np.float64]:
+        """Rod voltages at a single time, so a schedule works as a plain callable."""
+        return self.voltages(t)
+
+
+class RFDCSchedule(VoltageSchedule):
+    """Sinusoidal RF drive on top of a constant DC offset: U + V sin(2πft + φ)."""
+
+    rf_amplitude: float
+    dc_offset: float
+    frequency: float
+    phase: float
+
+    def __init__(
+        self,
+        rf_amplitude: float,
+        frequency: float,
+        polarity: ArrayLike,
+        dc_offset: float = 0.0,
+        phase: float = 0.0,
+    ) -> None:
+        super().__init__(polarity)
+        self.rf_amplitude = rf_amplitude
+        self.dc_offset = dc_offset
+        self.frequency = frequency
+        self.phase = phase
+
+    def waveform(self, t: ArrayLike) -> NDArray[np.float64]:
+        return self.dc_offset + self.rf_amplitude * np.sin(
+            2 * np.pi * self.frequency * np.asarray(t, dtype=float) + self.phase
+        )
+
+    @property
+    def period(self) -> float:
+        return 1 / self.frequency
+
+    @property
+    def amplitude(self) -> float:
+        return abs(self.dc_offset) + abs(self.rf_amplitude)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": "rf_dc",
+            "rf_amplitude": self.rf_amplitude,
+            "frequency": self.frequency,
+            "polarity": self.polarity.tolist(),
+            "dc_offset": self.dc_offset,
+            "phase": self.phase,
+        }
+
+
+class SineSchedule(RFDCSchedule):
+    """Pure sinusoidal RF drive: V sin(2πft + φ)."""
+
+    def __init__(
+        self,
+        amplitude: float,
+        frequency: float,
+        polarity: ArrayLike,
+        phase: float = 0.0,
+    ) -> None:
+        super().__init__(amplitude, frequency, polarity, phase=phase)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": "sine",
+            "amplitude": self.rf_amplitude,
+            "frequency": self.frequency,
+            "polarity": self.polarity.tolist(),
+            "phase": self.phase,
+        }
+
+
+class SquareWaveSchedule(VoltageSchedule):
+    """Rectangular drive switching between U + V and U - V.
+
+    The high level is held for ``duty_cycle`` of every period, starting at t = 0.
+    """
+
+    rf_amplitude: float
+    dc_offset: float
+    frequency: float
+    duty_cycle: float
+
+    def __init__(
+        self,
+        rf_amplitude: float,
+        frequency: float,
+        polarity: ArrayLike,
+        duty_cycle: float = 0.5,
+        dc_offset: float = 0.0,
+    ) -> None:
+        super().__init__(polarity)
+        if not 0 < duty_cycle < 1:
+            raise ValueError("Duty cycle must be between 0 and 1.")
+        self.rf_amplitude = rf_amplitude
+        self.dc_offset = dc_offset
+        self.frequency = frequency
+        self.duty_cycle = duty_cycle
+
+    def waveform(self, t: ArrayLike) -> NDArray[np.float64]:
+        cycle_fraction = np.mod(self.frequency * np.asarray(t, dtype=float), 1.0)
+        level = np.where(cycle_fraction < self.duty_cycle, 1.0, -1.0)
+        return self.dc_offset + self.rf_amplitude * level
+
+    @property
+    def period(self) -> float:
+        return 1 / self.frequency
+
+    @property
+    def amplitude(self) -> float:
+        return abs(self.dc_offset) + abs(self.rf_amplitude)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": "square",
+            "rf_amplitude": self.rf_amplitude,
+            "frequency": self.frequency,
+            "polarity": self.polarity.tolist(),
+            "duty_cycle": self.duty_cycle,
+            "dc_offset": self.dc_offset,
+        }
+
+
+class PiecewiseSchedule(VoltageSchedule):
+    """Arbitrary waveform given by samples, linearly interpolated in between.
+
+    Outside the sampled range the waveform holds its first/last value, unless it is
+    periodic, in which case the samples are repeated with period
+    ``times[-1] - times[0]``.
+    """
+
+    times: NDArray[np.float64]
+    values: NDArray[np.float64]
+    periodic: bool
+
+    def __init__(
+        self,
+        times: ArrayLike,
+        values: ArrayLike,
+        polarity: ArrayLike,
+        periodic: bool = False,
+    ) -> None:
+        super().__init__(polarity)
+        self.times = np.array(times, dtype=float)
+        self.values = np.array(values, dtype=float)
+        if self.times.ndim != 1 or self.times.shape != self.values.shape:
+            raise ValueError("Times and values must be 1D arrays of equal length.")
+        if len(self.times) < 2 or np.any(np.diff(self.times) <= 0):
+            raise ValueError("Times must be strictly increasing with 2+ samples.")
+        self.periodic = periodic
+
+    def waveform(self, t: ArrayLike) -> NDArray[np.float64]:
+        times = np.asarray(t, dtype=float)
+        if self.periodic:
+            period = self.times[-1] - self.times[0]
+            times = self.times[0] + np.mod(times - self.times[0], period)
+        return np.interp(times, self.times, self.values)
+
+    @property
+    def period(self) -> float | None:
+        if not self.periodic:
+            return None
+        return float(self.times[-1] - self.times[0])
+
+    @property
+    def amplitude(self) -> float:
+        return float(np.max(np.abs(self.values)))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": "piecewise",
+            "times": self.times.tolist(),
+            "values": self.values.tolist(),
+            "polarity": self.polarity.tolist(),
+            "periodic": self.periodic,
+        }
+
+
+SCHEDULE_TYPES: dict[str, type[VoltageSchedule]] = {
+    "rf_dc": RFDCSchedule,
+    "sine": SineSchedule,
+    "square": SquareWaveSchedule,
+    "piecewise": PiecewiseSchedule,
+}
+
+
+def schedule_from_dict(data: dict[str, Any]) -> VoltageSchedule:
+    """Recreate a schedule from the output of ``VoltageSchedule.to_dict``."""
+    parameters = dict(data)
+    schedule_type = parameters.pop("type")
+    if schedule_type not in SCHEDULE_TYPES:
+        raise ValueError(f"Unknown voltage schedule type {schedule_type!r}.")
+    return SCHEDULE_TYPES[schedule_type](**parameters)
+
+
+VoltageSource = Union[VoltageSchedule, Callable[[float], ArrayLike]]
+
+
+def evaluate_voltages(
+    voltages_over_time: VoltageSource, times: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Evaluate rod voltages for a block of times.
+
+    Schedules are evaluated in one vectorized call; plain callables fall back to one
+    call per time.
+
+    Args:
+        voltages_over_time: Voltage schedule or function providing voltages at a time
+        times: Times in seconds, shape (T,)
+
+    Returns:
+        Rod voltages, shape (T, n_rods)
+    """
+    if isinstance(voltages_over_time, VoltageSchedule):
+        return voltages_over_time.voltages(times)
+    return np.array([voltages_over_time(t) for t in times], dtype=float)
@@ -1,20 +1,24 @@
 """Main simulation logic."""
 
-from typing import Callable
-
 import numpy as np
 from numpy.typing import NDArray
 
+from quadrupole_field.core.integrators import Integrator, VelocityVerletIntegrator
 from quadrupole_field.core.particle import Particle
-from quadrupole_field.core.trap import Trap
+from quadrupole_field.core.trap import LossReason, Trap
+from quadrupole_field.simulation.base import ElectricFieldFunction, SimulationBase
 
 
-class Simulation:
+class Simulation(SimulationBase):
     """Main simulation coordinator."""
 
     trap: Trap
     particle: Particle
     dt: float
+    integrator: Integrator
+    step_index: int
+    loss_time: float | None  # Time at which the particle was lost
+    loss_reason: LossReason
 
     def __init__(
         self,
@@ -24,38 +28,40 @@ class Simulation:
         initial_position: tuple[float, float],
         initial_velocity: tuple[float, float],
         dt: float,
+        n_rods: int = 4,
+        integrator: Integrator | None = None,
+        rod_radius: float | None = None,
+        escape_radius: float | None = None,
     ) -> None:
         """Initialize the simulation with the trap and particle."""
-        self.trap = Trap(a)
+        self.trap = Trap(a, n_rods, rod_radius, escape_radius)
         self.particle = Particle(charge, mass, initial_position, initial_velocity)
         self.dt = dt
+        self.integrator = (
+            integrator if integrator is not None else VelocityVerletIntegrator()
+        )
+        self.step_index = 0
+        self.loss_time = None
+        self.loss_reason = LossReason.NONE
+
+    @property
+    def positions(self) -> NDArray[np.float64]:
+        return self.particle.position
+
+    @property
+    def velocities(self) -> NDArray[np.float64]:
+        return self.particle.velocity
+
+    def advance(self, electric_field_at: ElectricFieldFunction, t: float) -> None:
+        self.particle.advance(self.integrator, electric_field_at, t, self.dt)
+
+    @property
+    def n_active(self) -> int:
+        return int(self.loss_reason == LossReason.NONE)
 
-    def run(
-        self, voltages_over_time: Callable[[float], list[float]], total_time: float
-    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
-        """
-        Run the simulation.
-        :param voltages_over_time: Function providing voltages at a given time.
-        :param total_time: Total simulation time.
-        :return: Tuple of (positions, velocities, voltages) over time.
-        """
-        positions: list[NDArray[np.float64]] = []
-        velocities: list[NDArray[np.float64]] = []
-        voltages_history: list[list[float]] = []
-        time_steps: int = int(total_time / self.dt)
-
-        for t in range(time_steps):
-            t_actual = t * self.dt
-            voltages = voltages_over_time(t_actual)
-            self.trap.set_voltages(voltages)
-
-            electric_field = self.trap.electric_field_at(
-                self.particle.position[0], self.particle.position[1]
-            )
-            self.particle.update(electric_field, self.dt)
-
-            positions.append(self.particle.position.copy())
-            velocities.append(self.particle.velocity.copy())
-            voltages_history.append(voltages.copy())
-
-        return np.array(positions), np.array(velocities), np.array(voltages_history)
+    def detect_losses(self, time: float) -> int:
+        reason = int(self.trap.detect_losses(self.particle.position))
+        if reason != LossReason.NONE:
+            self.loss_time = time
+            self.loss_reason = LossReason(reason)
+        return self.n_active
@@ -0,0 +1,286 @@
+"""Parallel stability-diagram sweeps.
+
+A sweep runs the trap over a grid of RF amplitudes, DC offsets, driving frequencies
+and charge-to-mass ratios and classifies every grid point as stable (the particle
+survives the whole run) or unstable (it escapes or hits a rod), together with its
+survival time.
+
+The force on a particle is its charge-to-mass ratio times the waveform U + V sin(Ωt)
+times the field of the fixed polarity pattern, so grid points that share a driving
+frequency differ only in per-particle scale factors of that field. The points of
+each frequency are therefore split into a few large blocks, whatever the shape of
+the grid, and each block runs as one vectorized ensemble with per-particle RF and
+DC voltages. Blocks are independent and are distributed over a process pool, so
+the sweep scales with the number of cores.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from quadrupole_field.core.integrators import get_integrator
+from quadrupole_field.core.trap import LossReason
+from quadrupole_field.simulation.base import ElectricFieldFunction
+from quadrupole_field.simulation.ensemble import EnsembleSimulation
+from quadrupole_field.simulation.schedule import RFDCSchedule
+from quadrupole_field.utils.mathieu import is_stable
+from quadrupole_field.utils.stability import mathieu_parameters
+
+
+@dataclass
+class SweepSettings:
+    """Settings shared by every grid point of a sweep."""
+
+    rod_distance: float = 1.0  # Distance from center to rods (m)
+    n_rods: int = 4
+    n_periods: int = 100  # Run duration in RF periods
+    steps_per_period: int = 64
+    initial_offset: float = 0.05  # Initial displacement as a fraction of rod_distance
+    integrator: str = "yoshida4"
+    rod_radius: float | None = None  # Trap default if None
+    escape_radius: float | None = None  # Trap default if None
+
+
+@dataclass
+class SweepResult:
+    """Stability map of a sweep.
+
+    Arrays have shape (n_rf_amplitudes, n_dc_offsets, n_frequencies,
+    n_charge_to_mass), indexed like the grid axes.
+    """
+
+    rf_amplitudes: NDArray[np.float64]
+    dc_offsets: NDArray[np.float64]
+    frequencies: NDArray[np.float64]
+    charge_to_mass: NDArray[np.float64]
+    settings: SweepSettings
+    survival_time: NDArray[np.float64]  # Time until loss, run duration if stable
+    loss_reason: NDArray[np.int8]  # LossReason of each grid point
+
+    @property
+    def stable(self) -> NDArray[np.bool_]:
+        """Stability map: whether the particle survived the whole run."""
+        return self.loss_reason == LossReason.NONE
+
+    @property
+    def mathieu_parameters(self) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Mathieu parameters (a, q) of every grid point."""
+        rf, dc, frequency, charge_to_mass = np.meshgrid(
+            self.rf_amplitudes,
+            self.dc_offsets,
+            self.frequencies,
+            self.charge_to_mass,
+            indexing="ij",
+        )
+        return mathieu_parameters(
+            rf, dc, charge_to_mass, frequency, self.settings.rod_distance
+        )
+
+    @property
+    def predicted_stable(self) -> NDArray[np.bool_]:
+        """Stability map predicted from the Mathieu equation, without integration.
+
+        Only meaningful for quadrupole traps, where it should match ``stable``
+        except for particles lost to large initial amplitudes or micromotion.
+        """
+        return is_stable(*self.mathieu_parameters)
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the sweep: point counts per outcome and the stable (a, q) range."""
+        a, q = self.mathieu_parameters
+        stable = self.stable
+        summary: dict[str, Any] = {
+            "n_points": int(stable.size),
+            "n_stable": int(stable.sum()),
+            "stable_fraction": float(stable.mean()),
+        }
+        for reason in LossReason:
+            if reason != LossReason.NONE:
+                summary[f"n_{reason.name.lower()}"] = int(
+                    np.sum(self.loss_reason == reason)
+                )
+        if stable.any():
+            summary["stable_q_range"] = (float(q[stable].min()), float(q[stable].max()))
+            summary["stable_a_range"] = (float(a[stable].min()), float(a[stable].max()))
+        return summary
+
+    def save(self, filename: str) -> None:
+        """Save the stability map and its grid axes to an ``.npz`` file."""
+        np.savez(
+            filename,
+            rf_amplitudes=self.rf_amplitudes,
+            dc_offsets=self.dc_offsets,
+            frequencies=self.frequencies,
+            charge_to_mass=self.charge_to_mass,
+            survival_time=self.survival_time,
+            loss_reason=self.loss_reason,
+        )
+
+
+class _ScaledVoltageEnsemble(EnsembleSimulation):
+    """Ensemble whose particles each see their own RF amplitude and DC offset.
+
+    The trap is driven by a unit DC schedule, so that ``electric_field_at`` gives
+    the field of the polarity pattern, and each particle scales it by its own
+    waveform U + V sin(2πft).
+    """
+
+    rf_amplitudes: NDArray[np.float64]  # Per particle, shape (N,)
+    dc_offsets: NDArray[np.float64]  # Per particle, shape (N,)
+    angular_frequency: float
+
+    def __init__(
+        self,
+        rf_amplitudes: NDArray[np.float64],
+        dc_offsets: NDArray[np.float64],
+        frequency: float,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.rf_amplitudes = rf_amplitudes
+        self.dc_offsets = dc_offsets
+        self.angular_frequency = 2 * np.pi * frequency
+
+    def advance(self, electric_field_at: ElectricFieldFunction, t: float) -> None:
+        rf_amplitudes = self.rf_amplitudes[self.active, np.newaxis]
+        dc_offsets = self.dc_offsets[self.active, np.newaxis]
+
+        def scaled_field_at(
+            points: NDArray[np.float64], time: float
+        ) -> NDArray[np.float64]:
+            waveform = dc_offsets + rf_amplitudes * np.sin(
+                self.angular_frequency * time
+            )
+            return waveform * electric_field_at(points, time)
+
+        super().advance(scaled_field_at, t)
+
+
+def _run_sweep_task(
+    task: tuple[
+        float,
+        NDArray[np.float64],
+        NDArray[np.float64],
+        NDArray[np.float64],
+        SweepSettings,
+    ],
+) -> tuple[NDArray[np.float64], NDArray[np.int8]]:
+    """Run a block of grid points sharing a driving frequency as one ensemble.
+
+    Module-level so that it can be pickled to worker processes.
+
+    Returns:
+        Tuple of (survival times, loss reasons), each of shape (n_points,)
+    """
+    frequency, rf_amplitudes, dc_offsets, charge_to_mass, settings = task
+    n_particles = len(charge_to_mass)
+    offset = settings.initial_offset * settings.rod_distance / np.sqrt(2)
+
+    dt = 1 / (frequency * settings.steps_per_period)
+    time_steps = settings.n_periods * settings.steps_per_period
+    simulation = _ScaledVoltageEnsemble(
+        rf_amplitudes,
+        dc_offsets,
+        frequency,
+        a=settings.rod_distance,
+        charges=charge_to_mass,
+        masses=1.0,
+        initial_positions=np.full((n_particles, 2), offset),
+        initial_velocities=np.zeros((n_particles, 2)),
+        dt=dt,
+        n_rods=settings.n_rods,
+        integrator=get_integrator(settings.integrator),
+        rod_radius=settings.rod_radius,
+        escape_radius=settings.escape_radius,
+    )
+    # Unit pattern voltages; the particles scale the field by their own waveform
+    schedule = RFDCSchedule(0.0, frequency, simulation.trap.polarity, dc_offset=1.0)
+
+    # Half a step of margin, so that rounding cannot drop the last step
+    total_time = (time_steps + 0.5) * dt
+    for _ in simulation.iter_chunks(schedule, total_time, record_stride=time_steps):
+        pass
+
+    survival_time = np.where(
+        simulation.loss_reason == LossReason.NONE,
+        time_steps * dt,
+        simulation.loss_time,
+    )
+    return survival_time, simulation.loss_reason
+
+
+def run_stability_sweep(
+    rf_amplitudes: ArrayLike,
+    dc_offsets: ArrayLike = (0.0,),
+    frequencies: ArrayLike = (5.0,),
+    charge_to_mass: ArrayLike = (1.0,),
+    settings: SweepSettings | None = None,
+    max_workers: int | None = None,
+) -> SweepResult:
+    """Map the stability of the trap over a grid of drive and particle parameters.
+
+    Args:
+        rf_amplitudes: RF voltage amplitudes (V)
+        dc_offsets: DC offsets (V)
+        frequencies: RF driving frequencies (Hz)
+        charge_to_mass: Charge-to-mass ratios (C/kg)
+        settings: Trap and run settings, defaults if omitted
+        max_workers: Number of worker processes, all cores if omitted; 1 runs the
+            sweep in the current process
+
+    Returns:
+        Stability map over the grid
+    """
+    rf_amplitudes = np.atleast_1d(np.asarray(rf_amplitudes, dtype=float))
+    dc_offsets = np.atleast_1d(np.asarray(dc_offsets, dtype=float))
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+    charge_to_mass = np.atleast_1d(np.asarray(charge_to_mass, dtype=float))
+    settings = settings if settings is not None else SweepSettings()
+    max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+
+    grid_shape = (
+        len(rf_amplitudes),
+        len(dc_offsets),
+        len(frequencies),
+        len(charge_to_mass),
+    )
+    # Grid points of each frequency, flattened, shape (n_frequencies, n_points)
+    rf, dc, _, charge = (
+        np.moveaxis(grid, 2, 0).reshape(len(frequencies), -1)
+        for grid in np.meshgrid(
+            rf_amplitudes, dc_offsets, frequencies, charge_to_mass, indexing="ij"
+        )
+    )
+    # A few blocks per worker keeps workers busy until the end, while every block
+    # stays one large ensemble
+    n_points = rf.shape[1]
+    n_blocks = 1 if max_workers == 1 else -(-4 * max_workers // len(frequencies))
+    blocks = np.array_split(np.arange(n_points), min(n_blocks, n_points))
+    tasks = [
+        (float(frequency), rf[f, block], dc[f, block], charge[f, block], settings)
+        for f, frequency in enumerate(frequencies)
+        for block in blocks
+    ]
+    if max_workers == 1:
+        results = list(map(_run_sweep_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(_run_sweep_task, tasks))
+
+    survival_times, loss_reasons = (
+        np.concatenate(values).reshape(len(frequencies), *grid_shape[:2], -1)
+        for values in zip(*results)
+    )
+    return SweepResult(
+        rf_amplitudes=rf_amplitudes,
+        dc_offsets=dc_offsets,
+        frequencies=frequencies,
+        charge_to_mass=charge_to_mass,
+        settings=settings,
+        survival_time=np.moveaxis(survival_times, 0, 2),
+        loss_reason=np.moveaxis(loss_reasons, 0, 2).astype(np.int8),
+    )
@@ -0,0 +1,140 @@
+"""On-disk caches.
+
+``ResultsCache`` stores simulation results as ``.npz`` files named by a hash of the
+configuration that produced them and of the simulation source code, so a changed
+configuration or code version never returns stale results. The cache has a size
+cap; when it is exceeded the least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+from pydantic import BaseModel
+
+from quadrupole_field.utils.profiling import PROFILER
+
+# Environment variable overriding the cache directory
+CACHE_DIR_VARIABLE = "QUADRUPOLE_FIELD_CACHE_DIR"
+
+# Default size cap of the results cache in bytes
+DEFAULT_RESULTS_CACHE_BYTES: int = 512 * 1024**2
+
+# Packages whose source code determines simulation results
+_SOURCE_PACKAGES = ("core", "simulation", "utils")
+
+
+def get_cache_dir() -> Path:
+    """Directory for cached data, ``~/.cache/quadrupole_field`` by default."""
+    directory = os.environ.get(CACHE_DIR_VARIABLE)
+    if directory is not None:
+        return Path(directory)
+    return Path.home() / ".cache" / "quadrupole_field"
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of the source code of the simulation packages."""
+    root = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha256()
+    for package in _SOURCE_PACKAGES:
+        for source in sorted((root / package).rglob("*.py")):
+            digest.update(source.relative_to(root).as_posix().encode())
+            digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def config_key(*configs: BaseModel | None, **extra: Any) -> str:
+    """Stable hash of configuration models, extra JSON values and the code version."""
+    description = {
+        "configs": [
+            None if config is None else config.model_dump(mode="json")
+            for config in configs
+        ],
+        "extra": extra,
+        "code_version": code_version(),
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class ResultsCache:
+    """Content-addressed cache of arrays, with LRU eviction beyond a size cap."""
+
+    directory: Path
+    max_bytes: int
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = DEFAULT_RESULTS_CACHE_BYTES,
+    ) -> None:
+        """
+        :param directory: Cache directory, ``results`` in ``get_cache_dir()`` if
+            omitted.
+        :param max_bytes: Total size above which old entries are evicted.
+        """
+        self.directory = (
+            Path(directory) if directory is not None else get_cache_dir() / "results"
+        )
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def get(self, key: str) -> dict[str, NDArray[Any]] | None:
+        """
+        Load the arrays stored under a key.
+        :param key: Entry key, e.g. from ``config_key``.
+        :return: Dictionary of arrays, or None if the entry does not exist.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+        os.utime(path)  # Mark as recently used
+        return arrays
+
+    def put(self, key: str, **arrays: ArrayLike) -> None:
+        """
+        Store arrays under a key, then evict entries beyond the size cap.
+        :param key: Entry key, e.g. from ``config_key``.
+        :param arrays: Arrays or scalars to store, by name.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        contents: dict[str, Any] = dict(arrays)
+        with open(temporary, "wb") as file:
+            np.savez(file, **contents)
+            PROFILER.count("bytes_written", file.tell())
+        temporary.replace(path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size cap."""
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                status = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by a concurrent process
+            entries.append((status.st_mtime, status.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for path in self.directory.glob("*.npz"):
+            path.unlink(missing_ok=True)
@@ -1,57 +1,263 @@
 """Utilities for analyzing electric fields."""
 
+from functools import lru_cache
+
 import numpy as np
 from numpy.typing import NDArray
 
+from quadrupole_field.core.field_basis import FieldBasis
 from quadrupole_field.core.trap import Trap
+from quadrupole_field.simulation.schedule import VoltageSchedule
 from quadrupole_field.visualization.config import PLOT_CONFIG
 
+# Number of time steps whose fields are evaluated at once by
+# calculate_max_field_magnitude
+MAX_FIELD_BLOCK_SIZE: int = 1024
 
-def calculate_max_field_magnitude(
-    trap: Trap,
-    voltages_history: NDArray[np.float64],
-    a: float,
-) -> float:
-    """Calculate the maximum field magnitude across all time steps.
+
+def field_grid(
+    a: float, resolution: int | None = None
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Grid of the field display, covering the trap of size ``a``.
 
     Args:
-        trap: Trap instance for field calculations
-        voltages_history: History of voltages for animation
-        a: Trap size parameter
+        a: Trap size parameter setting the grid extent
+        resolution: Number of points in each direction,
+            ``PLOT_CONFIG.field_resolution`` if omitted
 
     Returns:
-        Maximum field magnitude encountered
+        Tuple of (X, Y) coordinate arrays
     """
-    max_magnitude = 0
-
-    # Create grid using the same parameters as FieldVisualizer
+    if resolution is None:
+        resolution = PLOT_CONFIG.field_resolution
     x = np.linspace(
         -a * PLOT_CONFIG.field_extent_factor,
         a * PLOT_CONFIG.field_extent_factor,
-        PLOT_CONFIG.field_resolution,
+        resolution,
     )
     y = np.linspace(
         -a * PLOT_CONFIG.field_extent_factor,
         a * PLOT_CONFIG.field_extent_factor,
-        PLOT_CONFIG.field_resolution,
+        resolution,
+    )
+    return np.meshgrid(x, y)
+
+
+def field_grid_settings() -> dict[str, float]:
+    """Settings of the field display grid, which the field maxima depend on.
+
+    Results cached together with a maximum field magnitude include these in their
+    key, since changing the grid changes the maximum.
+    """
+    return {
+        "resolution": PLOT_CONFIG.field_resolution,
+        "extent_factor": PLOT_CONFIG.field_extent_factor,
+        "min_distance": PLOT_CONFIG.min_distance_threshold,
+    }
+
+
+@lru_cache(maxsize=8)
+def _cached_field_basis(
+    rod_positions: tuple[tuple[float, float], ...],
+    polarity: tuple[float, ...],
+    a: float,
+    resolution: int,
+    extent_factor: float,
+    min_distance: float,
+) -> FieldBasis:
+    X, Y = field_grid(a, resolution)
+    return FieldBasis(X, Y, rod_positions, polarity, min_distance)
+
+
+def get_field_basis(trap: Trap, a: float, resolution: int | None = None) -> FieldBasis:
+    """Per-rod unit fields of a trap on the field display grid.
+
+    The basis uses the trap polarity as its fixed voltage pattern, and is cached, so
+    every user of the same trap layout and grid shares one precomputation.
+
+    Args:
+        trap: Trap whose rod layout to use
+        a: Trap size parameter setting the grid extent
+        resolution: Number of grid points in each direction,
+            ``PLOT_CONFIG.field_resolution`` if omitted
+
+    Returns:
+        Field basis on the grid of ``field_grid(a, resolution)``
+    """
+    if resolution is None:
+        resolution = PLOT_CONFIG.field_resolution
+    return _cached_field_basis(
+        tuple(map(tuple, trap.rod_positions.tolist())),
+        tuple(trap.polarity.tolist()),
+        a,
+        resolution,
+        PLOT_CONFIG.field_extent_factor,
+        PLOT_CONFIG.min_distance_threshold,
     )
-    X, Y = np.meshgrid(x, y)
 
-    # Sample time points
-    sample_indices = np.linspace(
-        0, len(voltages_history) - 1, PLOT_CONFIG.field_sampling_points, dtype=int
+
+def get_potential_basis(trap: Trap, a: float) -> FieldBasis:
+    """Per-rod unit fields of a trap on the finer grid of the potential map."""
+    return get_field_basis(trap, a, PLOT_CONFIG.potential_resolution)
+
+
+def outside_rods(
+    trap: Trap, x: NDArray[np.float64], y: NDArray[np.float64]
+) -> NDArray[np.bool_]:
+    """Mask of the points that lie outside every rod of the trap.
+
+    Args:
+        trap: Trap whose rods to exclude
+        x: X-coordinates of the points
+        y: Y-coordinates of the points, same shape as x
+
+    Returns:
+        Boolean array with the shape of the points
+    """
+    distance = np.hypot(
+        x[..., np.newaxis] - trap.rod_positions[:, 0],
+        y[..., np.newaxis] - trap.rod_positions[:, 1],
     )
+    return np.all(distance >= trap.rod_radius, axis=-1)
+
+
+def _pattern_extremes(voltages_history: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Reduce a voltage history to its extreme steps when it follows one pattern.
+
+    If every step is a multiple of the step with the largest voltage, as for all
+    schedules, the two extreme multiples are returned, since a convex function of
+    the voltages takes its maximum at one of them. Any other history is returned
+    unchanged.
+    """
+    if len(voltages_history) > 2:
+        pattern = voltages_history[np.argmax(np.abs(voltages_history).max(axis=1))]
+        if np.any(pattern):
+            scales = voltages_history @ pattern / (pattern @ pattern)
+            residual = np.abs(voltages_history - np.outer(scales, pattern)).max()
+            if residual <= 1e-12 * np.abs(pattern).max():
+                return np.outer([scales.min(), scales.max()], pattern)
+    return voltages_history
+
+
+def calculate_max_field_magnitude(
+    trap: Trap,
+    voltages_history: NDArray[np.float64],
+    a: float,
+) -> float:
+    """Calculate the exact maximum field magnitude over all time steps.
+
+    The field is linear in the voltages, so the fields of all time steps on the
+    whole display grid are one matrix product of the voltage history with the
+    per-rod unit fields, evaluated in blocks of time steps to bound memory use.
+    The squared magnitude is moreover convex in the voltages, so when every step
+    is a multiple of one voltage pattern, as for all schedules, only the two
+    extreme multiples need to be evaluated.
+
+    Args:
+        trap: Trap instance for field calculations
+        voltages_history: History of voltages for animation, shape (T, n_rods)
+        a: Trap size parameter
+
+    Returns:
+        Maximum field magnitude encountered
+    """
+    basis = get_field_basis(trap, a)
+    unit_Ex = basis.Ex.reshape(basis.n_rods, -1)
+    unit_Ey = basis.Ey.reshape(basis.n_rods, -1)
+
+    voltages_history = _pattern_extremes(np.asarray(voltages_history, dtype=float))
+
+    max_squared = 0.0
+    for start in range(0, len(voltages_history), MAX_FIELD_BLOCK_SIZE):
+        voltages = voltages_history[start : start + MAX_FIELD_BLOCK_SIZE]
+        squared = (voltages @ unit_Ex) ** 2 + (voltages @ unit_Ey) ** 2
+        block_max = squared.max()
+        if not np.isfinite(block_max):
+            finite = squared[np.isfinite(squared)]
+            block_max = finite.max() if finite.size else 0.0
+        max_squared = max(max_squared, float(block_max))
+
+    return float(np.sqrt(max_squared))
+
+
+def schedule_max_field_magnitude(
+    trap: Trap, schedule: VoltageSchedule, a: float
+) -> float:
+    """Calculate the maximum field magnitude of a schedule over all times.
+
+    Schedule voltages are a scalar waveform times a fixed polarity pattern, so the
+    field is the pattern field scaled by the waveform, and its maximum is the
+    schedule amplitude times the largest pattern field on the grid. No voltage
+    history is needed.
+
+    Args:
+        trap: Trap instance for field calculations
+        schedule: Voltage schedule driving the trap
+        a: Trap size parameter
 
-    for t_idx in sample_indices:
-        # Set voltages for this time step
-        trap.set_voltages(voltages_history[t_idx])
+    Returns:
+        Maximum field magnitude over all times
+    """
+    Ex, Ey = get_field_basis(trap, a).field(schedule.polarity)
+    magnitude = np.hypot(Ex, Ey)
+    finite = magnitude[np.isfinite(magnitude)]
+    return schedule.amplitude * float(finite.max()) if finite.size else 0.0
+
+
+def _max_potential(trap: Trap, voltages: NDArray[np.float64], a: float) -> float:
+    """Largest potential magnitude outside the rods on the potential map grid."""
+    basis = get_potential_basis(trap, a)
+    potential = np.abs(basis.potential_at(voltages))
+    potential = potential[outside_rods(trap, basis.x, basis.y)]
+    finite = potential[np.isfinite(potential)]
+    return float(finite.max()) if finite.size else 0.0
+
+
+def calculate_max_potential(
+    trap: Trap, voltages_history: NDArray[np.float64], a: float
+) -> float:
+    """Calculate the exact largest potential magnitude outside the rods.
+
+    As for ``calculate_max_field_magnitude``, the potentials of all time steps are
+    matrix products of the voltage history with the per-rod unit potentials,
+    evaluated in blocks of time steps. The potential magnitude is convex in the
+    voltages, so when every step is a multiple of one voltage pattern only the two
+    extreme multiples need to be evaluated.
+
+    Args:
+        trap: Trap instance for potential calculations
+        voltages_history: History of voltages for animation, shape (T, n_rods)
+        a: Trap size parameter
 
-        # Calculate field at each point
-        for i in range(len(X)):
-            for j in range(len(Y)):
-                Ex, Ey = trap.electric_field_at(X[i, j], Y[i, j])
-                magnitude = np.sqrt(Ex**2 + Ey**2)
-                if np.isfinite(magnitude):
-                    max_magnitude = max(max_magnitude, magnitude)
+    Returns:
+        Maximum potential magnitude on the potential map grid
+    """
+    basis = get_potential_basis(trap, a)
+    unit_potential = basis.potential.reshape(basis.n_rods, -1)[
+        :, outside_rods(trap, basis.x, basis.y).ravel()
+    ]
+    voltages_history = _pattern_extremes(np.asarray(voltages_history, dtype=float))
+
+    max_potential = 0.0
+    for start in range(0, len(voltages_history), MAX_FIELD_BLOCK_SIZE):
+        voltages = voltages_history[start : start + MAX_FIELD_BLOCK_SIZE]
+        potential = np.abs(voltages @ unit_potential)
+        finite = potential[np.isfinite(potential)]
+        if finite.size:
+            max_potential = max(max_potential, float(finite.max()))
+
+    return max_potential
+
+
+def schedule_max_potential(trap: Trap, schedule: VoltageSchedule, a: float) -> float:
+    """Calculate the largest potential magnitude outside the rods over all times.
 
-    return max_magnitude
+    Args:
+        trap: Trap instance for potential calculations
+        schedule: Voltage schedule driving the trap
+        a: Trap size parameter
+
+    Returns:
+        Maximum potential magnitude on the potential map grid
+    """
+    return schedule.amplitude * _max_potential(trap, schedule.polarity, a)
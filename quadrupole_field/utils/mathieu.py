@@ -0,0 +1,271 @@
+"""Characteristic exponent of the Mathieu equation.
+
+The motion of a particle in an ideal quadrupole trap obeys the Mathieu equation
+
+    d²x/dτ² + (a - 2q cos 2τ) x = 0,    τ = Ωt/2,
+
+whose solutions are bounded exactly when the characteristic exponent β(a, q) is
+real. β follows from Hill's infinite determinant Δ(0) (Whittaker & Watson §19.42):
+
+    cos(πβ) = 1 - Δ(0) (1 - cos(π√a)).
+
+The right-hand side is a smooth function of (a, q), so it is tabulated once on a
+grid covering the first stability region and interpolated bicubically in NumPy.
+The table is cached on disk, which makes stability checks and secular frequencies
+O(1) lookups that vectorize over arrays of (a, q), even for a single point. Points
+outside the table are evaluated from the determinant directly.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from quadrupole_field.utils.cache import get_cache_dir
+
+# Number of terms kept on each side of the Hill determinant. The truncation error
+# falls off only as 1/N³, so many terms are needed for ~1e-10 accuracy.
+HILL_TERMS: int = 400
+
+# Interpolation table grid: (start, stop, number of points) for a and q
+TABLE_A_GRID: tuple[float, float, int] = (-1.0, 1.0, 401)
+TABLE_Q_GRID: tuple[float, float, int] = (0.0, 1.5, 301)
+
+
+def _one_minus_cos_pi_sqrt_over(a: NDArray[np.float64]) -> NDArray[np.float64]:
+    """(1 - cos(π√a)) / a, continued smoothly through a = 0 and to a < 0."""
+    root = np.sqrt(np.abs(a))
+    half_angle = np.pi * root / 2
+    safe_angle = np.where(half_angle == 0, 1.0, half_angle)
+    ratio = np.where(
+        a >= 0, np.sin(safe_angle) / safe_angle, np.sinh(safe_angle) / safe_angle
+    )
+    return np.where(half_angle == 0, 1.0, ratio) ** 2 * np.pi**2 / 2
+
+
+def hill_cos_pi_beta(a: ArrayLike, q: ArrayLike) -> NDArray[np.float64]:
+    """
+    Calculate cos(πβ) of the Mathieu equation from Hill's determinant.
+
+    The determinant is tridiagonal with unit diagonal and off-diagonal elements
+    ξ_n = q / ((2n)² - a) in row n. Expanding it around the middle row, with H and
+    H' the determinants of rows 1..N and 2..N, gives
+
+        cos(πβ) = 1 - a s H² - 2 q s ξ₁ H H',    s = (1 - cos(π√a)) / a,
+
+    which stays finite at a = 0.
+    :param a: Mathieu parameter a.
+    :param q: Mathieu parameter q.
+    :return: cos(πβ) with the broadcast shape of a and q.
+    """
+    a, q = np.broadcast_arrays(
+        np.asarray(a, dtype=float), np.abs(np.asarray(q, dtype=float))
+    )
+
+    def xi(n: int) -> NDArray[np.float64]:
+        denominator = (2 * n) ** 2 - a
+        # Nudge off the poles at a = (2n)², where cos(πβ) itself is finite
+        return q / np.where(denominator == 0, 1e-12, denominator)
+
+    # Backward continuant recursion for the determinants of rows n..N
+    after_next = np.ones_like(a)
+    following = np.ones_like(a)
+    xi_next = xi(HILL_TERMS + 1)
+    for n in range(HILL_TERMS, 0, -1):
+        xi_n = xi(n)
+        after_next, following = following, following - xi_n * xi_next * after_next
+        xi_next = xi_n
+    rows_from_1, rows_from_2, xi_1 = following, after_next, xi_next
+
+    s = _one_minus_cos_pi_sqrt_over(a)
+    return 1 - s * (a * rows_from_1**2 + 2 * q * xi_1 * rows_from_1 * rows_from_2)
+
+
+def _table_axes() -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Grid axes of the interpolation table."""
+    return np.linspace(*TABLE_A_GRID), np.linspace(*TABLE_Q_GRID)
+
+
+def _load_table() -> NDArray[np.float64]:
+    """cos(πβ) on the table grid, loaded from the disk cache or computed once."""
+    key = hashlib.sha256(
+        repr((HILL_TERMS, TABLE_A_GRID, TABLE_Q_GRID)).encode()
+    ).hexdigest()[:16]
+    cache_file = get_cache_dir() / f"mathieu_table_{key}.npy"
+
+    try:
+        return np.load(cache_file)
+    except (OSError, ValueError):
+        pass
+
+    a_axis, q_axis = _table_axes()
+    table = hill_cos_pi_beta(a_axis[:, np.newaxis], q_axis[np.newaxis, :])
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temporary = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as file:
+            np.save(file, table)
+        temporary.replace(cache_file)
+    except OSError:
+        pass  # An unwritable cache only costs rebuilding the table next time
+    return table
+
+
+def _spline_derivative_operator(n: int) -> NDArray[np.float64]:
+    """Matrix mapping n equally spaced samples to the knot slopes of their spline.
+
+    The slopes d of a cubic spline with unit knot spacing satisfy
+    d[i-1] + 4 d[i] + d[i+1] = 3 (f[i+1] - f[i-1]) at the interior knots. The end
+    slopes are clamped to 4th-order one-sided differences. Hermite interpolation
+    with these slopes reproduces the spline, so it keeps its O(h⁴) accuracy.
+    """
+    system = np.zeros((n, n))
+    differences = np.zeros((n, n))
+    interior = np.arange(1, n - 1)
+    system[interior, interior - 1] = 1
+    system[interior, interior] = 4
+    system[interior, interior + 1] = 1
+    differences[interior, interior - 1] = -3
+    differences[interior, interior + 1] = 3
+    end_stencil = np.array([-25, 48, -36, 16, -3]) / 12
+    system[0, 0] = system[-1, -1] = 1
+    differences[0, :5] = end_stencil
+    differences[-1, -5:] = -end_stencil[::-1]
+    return np.linalg.solve(system, differences).astype(np.float64, copy=False)
+
+
+@lru_cache(maxsize=1)
+def _bicubic_coefficients() -> NDArray[np.float64]:
+    """Hermite data of the table: values and their a, q and mixed derivatives.
+
+    :return: Array of shape (4, n_a, n_q) holding f, ∂f/∂a, ∂f/∂q and ∂²f/∂a∂q, with
+        the derivatives in units of the grid steps.
+    """
+    table = _load_table()
+    d_a = _spline_derivative_operator(TABLE_A_GRID[2]) @ table
+    q_operator = _spline_derivative_operator(TABLE_Q_GRID[2]).T
+    return np.stack([table, d_a, table @ q_operator, d_a @ q_operator])
+
+
+def _hermite_basis(t: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Cubic Hermite basis for (f0, f1, f0', f1') at fractional positions t."""
+    t2 = t * t
+    t3 = t2 * t
+    return np.stack([2 * t3 - 3 * t2 + 1, -2 * t3 + 3 * t2, t3 - 2 * t2 + t, t3 - t2])
+
+
+def _interpolate_table(
+    a: NDArray[np.float64], q: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """Bicubic Hermite interpolation of the cos(πβ) table at points inside it."""
+    f, f_a, f_q, f_aq = _bicubic_coefficients()
+    a_start, a_stop, n_a = TABLE_A_GRID
+    q_start, q_stop, n_q = TABLE_Q_GRID
+    a_pos = (a - a_start) / (a_stop - a_start) * (n_a - 1)
+    q_pos = (q - q_start) / (q_stop - q_start) * (n_q - 1)
+    i = np.clip(np.floor(a_pos).astype(int), 0, n_a - 2)
+    j = np.clip(np.floor(q_pos).astype(int), 0, n_q - 2)
+    basis_a = _hermite_basis(a_pos - i)
+    basis_q = _hermite_basis(q_pos - j)
+
+    # Corner values and a-derivatives, paired with the a basis functions
+    a_terms = (
+        (f, f_q, i, 0),
+        (f, f_q, i + 1, 1),
+        (f_a, f_aq, i, 2),
+        (f_a, f_aq, i + 1, 3),
+    )
+    result = np.zeros_like(a_pos)
+    for values, q_derivatives, rows, k in a_terms:
+        along_q = (
+            basis_q[0] * values[rows, j]
+            + basis_q[1] * values[rows, j + 1]
+            + basis_q[2] * q_derivatives[rows, j]
+            + basis_q[3] * q_derivatives[rows, j + 1]
+        )
+        result += basis_a[k] * along_q
+    return result
+
+
+def cos_pi_beta(a: ArrayLike, q: ArrayLike) -> NDArray[np.float64]:
+    """
+    Look up cos(πβ) of the Mathieu equation.
+
+    Interpolates the cached table inside its range and evaluates the Hill
+    determinant outside of it.
+    :param a: Mathieu parameter a.
+    :param q: Mathieu parameter q (the sign of q does not matter).
+    :return: cos(πβ) with the broadcast shape of a and q.
+    """
+    a, q = np.broadcast_arrays(
+        np.asarray(a, dtype=float), np.abs(np.asarray(q, dtype=float))
+    )
+    in_table = (
+        (a >= TABLE_A_GRID[0])
+        & (a <= TABLE_A_GRID[1])
+        & (q >= TABLE_Q_GRID[0])
+        & (q <= TABLE_Q_GRID[1])
+    )
+    if in_table.all():
+        return _interpolate_table(a, q)
+    if not in_table.any():
+        return hill_cos_pi_beta(a, q)
+
+    # Mixed inputs have at least one dimension, so they can be filled by mask
+    result = np.empty(a.shape)
+    result[in_table] = _interpolate_table(a[in_table], q[in_table])
+    result[~in_table] = hill_cos_pi_beta(a[~in_table], q[~in_table])
+    return result
+
+
+def characteristic_exponent(a: ArrayLike, q: ArrayLike) -> NDArray[np.float64]:
+    """
+    Calculate the characteristic exponent β(a, q).
+
+    β is reduced to [0, 1], which is its actual value in the first stability region.
+    :param a: Mathieu parameter a.
+    :param q: Mathieu parameter q.
+    :return: β for stable points, NaN for unstable ones.
+    """
+    c = cos_pi_beta(a, q)
+    return np.where(np.abs(c) <= 1, np.arccos(np.clip(c, -1, 1)) / np.pi, np.nan)
+
+
+def mathieu_is_stable(a: ArrayLike, q: ArrayLike) -> NDArray[np.bool_]:
+    """Whether solutions of the Mathieu equation with (a, q) are bounded."""
+    return np.abs(cos_pi_beta(a, q)) <= 1
+
+
+def is_stable(a: ArrayLike, q: ArrayLike) -> NDArray[np.bool_]:
+    """
+    Whether a quadrupole trap operating at (a, q) confines particles.
+
+    The x motion has parameters (a, q) and the y motion (-a, -q); both must be
+    stable.
+    :param a: Mathieu parameter a of the x motion.
+    :param q: Mathieu parameter q of the x motion.
+    :return: Stability with the broadcast shape of a and q.
+    """
+    a = np.asarray(a, dtype=float)
+    return mathieu_is_stable(a, q) & mathieu_is_stable(-a, q)
+
+
+def secular_frequencies(
+    a: ArrayLike, q: ArrayLike, driving_freq: ArrayLike
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Calculate the exact secular frequencies β f / 2 of the x and y motion.
+
+    :param a: Mathieu parameter a of the x motion.
+    :param q: Mathieu parameter q of the x motion.
+    :param driving_freq: RF driving frequency (Hz).
+    :return: Tuple of (x, y) secular frequencies in Hz, NaN where unstable.
+    """
+    a = np.asarray(a, dtype=float)
+    half_freq = np.asarray(driving_freq, dtype=float) / 2
+    return (
+        characteristic_exponent(a, q) * half_freq,
+        characteristic_exponent(-a, q) * half_freq,
+    )
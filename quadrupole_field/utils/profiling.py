@@ -0,0 +1,138 @@
+"""Lightweight instrumentation of where a run spends its time.
+
+``PROFILER`` collects wall-clock timers of named sections and event counters
+(field evaluations, integration steps, rendered frames, bytes written). It is
+disabled by default: ``timer`` then returns a shared no-op context manager and
+``count`` returns after one attribute check, and per-call instrumentation of hot
+functions is only installed when profiling is enabled, so uninstrumented runs pay
+essentially nothing.
+"""
+
+import json
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from functools import wraps
+from pathlib import Path
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Profiler:
+    """Collects section timings and event counts while enabled."""
+
+    enabled: bool
+    start: float  # perf_counter() when the profiler was enabled
+    total_time: dict[str, float]  # Accumulated seconds per section
+    calls: dict[str, int]  # Number of times each section was entered
+    counters: dict[str, int]
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard all collected timings and counts."""
+        self.start = time.perf_counter()
+        self.total_time = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def enable(self) -> None:
+        """Start collecting, from a clean state."""
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop collecting; collected data is kept for reporting."""
+        self.enabled = False
+
+    def timer(self, name: str) -> AbstractContextManager[None]:
+        """
+        Time a section of code.
+        :param name: Section name; repeated sections accumulate.
+        :return: Context manager timing its body, a no-op while disabled.
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.total_time[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Increment an event counter.
+        :param name: Counter name.
+        :param n: Number of events.
+        """
+        if self.enabled:
+            self.counters[name] += n
+
+    def counted(self, name: str, func: F) -> F:
+        """
+        Instrument a function to count its calls.
+
+        The check happens once, here, rather than on every call: ``func`` is
+        returned unchanged while the profiler is disabled.
+        :param name: Counter incremented on each call.
+        :param func: Function to instrument.
+        :return: Counting wrapper, or ``func`` itself while disabled.
+        """
+        if not self.enabled:
+            return func
+        counters = self.counters
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            counters[name] += 1
+            return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Collected data as JSON-compatible dictionary."""
+        return {
+            "wall_time": time.perf_counter() - self.start,
+            "sections": {
+                name: {"total_time": total, "calls": self.calls[name]}
+                for name, total in self.total_time.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def report(self) -> str:
+        """Human-readable breakdown of section times and counters."""
+        data = self.to_dict()
+        wall_time = data["wall_time"]
+        lines = [f"Profile ({wall_time:.3f} s wall time):"]
+        for name, section in sorted(
+            data["sections"].items(), key=lambda item: -item[1]["total_time"]
+        ):
+            total, calls = section["total_time"], section["calls"]
+            lines.append(
+                f"  {name:<28} {total:>10.4f} s {total / wall_time:>7.1%} "
+                f"{calls:>8d} calls {total / calls * 1e3:>10.3f} ms/call"
+            )
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"  {name:<28} {value:>12d}")
+        return "\n".join(lines)
+
+    def save(self, filename: str | Path) -> None:
+        """Write the collected data as JSON."""
+        with open(filename, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+
+# Process-wide profiler used by the instrumented code
+PROFILER = Profiler()
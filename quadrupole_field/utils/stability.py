@@ -1,13 +1,62 @@
 """Calculate stable orbit parameters for the Paul trap."""
 
 import numpy as np
+from numpy.typing import ArrayLike, NDArray
 
+from quadrupole_field.utils.mathieu import secular_frequencies
 from quadrupole_field.utils.stable_orbit_params import StableOrbitParameters
 
+# Near the center, four line-charge rods with voltages ±V at distance r0 create the
+# quadrupole potential QUADRUPOLE_POTENTIAL_FACTOR * V (x² - y²) / r0²
+QUADRUPOLE_POTENTIAL_FACTOR: float = 2.0
 
-def calculate_secular_frequency(q: float, driving_freq: float) -> float:
-    """Calculate the secular frequency of the trap."""
-    return q * driving_freq / (2 * np.sqrt(2))
+
+def calculate_secular_frequency(q: float, driving_freq: float, a: float = 0.0) -> float:
+    """Calculate the secular frequency β f / 2 of the x motion of the trap.
+
+    Uses the exact Mathieu characteristic exponent β rather than the lowest-order
+    approximation β ≈ q / √2.
+    """
+    x_frequency, _ = secular_frequencies(a, q, driving_freq)
+    return float(x_frequency)
+
+
+def mathieu_parameters(
+    rf_amplitude: ArrayLike,
+    dc_offset: ArrayLike,
+    charge_to_mass: ArrayLike,
+    driving_freq: ArrayLike,
+    rod_distance: float,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Calculate the Mathieu stability parameters of an RF + DC drive.
+
+    The parameters of the x motion in the line-charge quadrupole, whose potential
+    near the center is 2U (x² - y²) / r0² for a voltage U on the x rods, are
+    q = 8QV / (mΩ²r0²) and a = 16QU / (mΩ²r0²). Traps with more than four rods are
+    not described by the Mathieu equation. All arguments except the rod distance
+    broadcast against each other.
+
+    Args:
+        rf_amplitude: RF voltage amplitude V (V)
+        dc_offset: DC voltage U (V)
+        charge_to_mass: Charge-to-mass ratio Q/m (C/kg)
+        driving_freq: RF driving frequency (Hz)
+        rod_distance: Distance from trap center to rods r0 (m)
+
+    Returns:
+        Tuple of (a, q) with the broadcast shape of the arguments
+    """
+    omega = 2 * np.pi * np.asarray(driving_freq, dtype=float)
+    scale = (
+        4
+        * QUADRUPOLE_POTENTIAL_FACTOR
+        * np.asarray(charge_to_mass, dtype=float)
+        / (omega**2 * rod_distance**2)
+    )
+    q = scale * np.asarray(rf_amplitude, dtype=float)
+    a = 2 * scale * np.asarray(dc_offset, dtype=float)
+    return a, q
 
 
 def estimate_diamond_orbit_parameters(
@@ -39,9 +88,10 @@ def estimate_diamond_orbit_parameters(
     """
     omega = 2 * np.pi * driving_freq
 
-    # Calculate required voltage for stable operation
+    # Calculate required voltage for stable operation, inverting q of
+    # mathieu_parameters
     voltage = (target_q * particle_mass * omega**2 * rod_distance**2) / (
-        4 * particle_charge
+        4 * QUADRUPOLE_POTENTIAL_FACTOR * particle_charge
     )
 
     secular_freq = calculate_secular_frequency(target_q, driving_freq)
@@ -1,17 +1,26 @@
 """Electric field visualization component."""
 
 import numpy as np
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
 from matplotlib.colors import Normalize
 from matplotlib.quiver import Quiver
 from numpy.typing import NDArray
 
+from quadrupole_field.core.field_basis import FieldBasis
 from quadrupole_field.core.trap import Trap
+from quadrupole_field.utils.field_analysis import get_field_basis
 from quadrupole_field.visualization.config import COLOR_CONFIG, PLOT_CONFIG
 
 
 class FieldVisualizer:
-    """Electric field visualization component."""
+    """Electric field visualization component.
+
+    The field and potential of every frame are composed from the cached per-rod
+    unit fields of ``get_field_basis`` rather than evaluated from the rods. Arrows
+    are colored by the potential if a normalization is given, and otherwise drawn
+    in a single color, e.g. over a ``PotentialVisualizer`` map.
+    """
 
     ax: Axes
     trap: Trap
@@ -21,32 +30,30 @@ class FieldVisualizer:
     Ex: NDArray[np.float64]
     Ey: NDArray[np.float64]
     max_magnitude: float
+    basis: FieldBasis
     quiver: Quiver
-    norm: Normalize
+    norm: Normalize | None  # Potential colors of the arrows, None for one color
 
     def __init__(
-        self, ax: Axes, trap: Trap, a: float, max_field_magnitude: float
+        self,
+        ax: Axes,
+        trap: Trap,
+        a: float,
+        max_field_magnitude: float,
+        norm: Normalize | None = None,
     ) -> None:
         self.ax = ax
         self.trap = trap
         self.a = a
         self.max_magnitude = max_field_magnitude
+        self.norm = norm
         self.setup_field_grid()
         self.setup_field_plot()
 
     def setup_field_grid(self) -> None:
         """Set up the grid for electric field visualization."""
-        x = np.linspace(
-            -self.a * PLOT_CONFIG.field_extent_factor,
-            self.a * PLOT_CONFIG.field_extent_factor,
-            PLOT_CONFIG.field_resolution,
-        )
-        y = np.linspace(
-            -self.a * PLOT_CONFIG.field_extent_factor,
-            self.a * PLOT_CONFIG.field_extent_factor,
-            PLOT_CONFIG.field_resolution,
-        )
-        self.X, self.Y = np.meshgrid(x, y)
+        self.basis = get_field_basis(self.trap, self.a)
+        self.X, self.Y = self.basis.x, self.basis.y
         self.Ex = np.zeros_like(self.X)
         self.Ey = np.zeros_like(self.Y)
 
@@ -61,32 +68,30 @@ class FieldVisualizer:
 
     def calculate_field_colors(self) -> NDArray[np.float64]:
         """Calculate the electric potential at each point in the field grid."""
-        colors = np.zeros_like(self.Ex)
-        for i in range(len(self.X)):
-            for j in range(len(self.Y)):
-                colors[i, j] = sum(
-                    rod.electric_potential_at(
-                        self.X[i, j], self.Y[i, j], PLOT_CONFIG.min_distance_threshold
-                    )
-                    for rod in self.trap.rods
-                )
-        return colors
+        return self.basis.potential_at(self.trap.voltages)
 
     def setup_field_plot(self) -> None:
         """Initialize the electric field quiver plot."""
         # Calculate initial field
-        for i in range(len(self.X)):
-            for j in range(len(self.Y)):
-                self.Ex[i, j], self.Ey[i, j] = self.trap.electric_field_at(
-                    self.X[i, j], self.Y[i, j]
-                )
+        self.Ex, self.Ey = self.basis.field(self.trap.voltages)
 
         # Normalize field vectors using the dedicated method
         Ex_norm, Ey_norm = self.scale_field(self.Ex, self.Ey)
 
+        if self.norm is None:
+            self.quiver = self.ax.quiver(
+                self.X,
+                self.Y,
+                Ex_norm,
+                Ey_norm,
+                color=COLOR_CONFIG.field_arrow_color,
+                alpha=PLOT_CONFIG.quiver_alpha,
+                scale=PLOT_CONFIG.quiver_scale,
+            )
+            return
+
         # Calculate colors based on potential
         colors = self.calculate_field_colors()
-        self.norm = Normalize(vmin=-np.max(np.abs(colors)), vmax=np.max(np.abs(colors)))
 
         self.quiver = self.ax.quiver(
             self.X,
@@ -106,17 +111,22 @@ class FieldVisualizer:
     def update(self) -> None:
         """Update the electric field visualization."""
         # Calculate current field
-        for i in range(len(self.X)):
-            for j in range(len(self.Y)):
-                self.Ex[i, j], self.Ey[i, j] = self.trap.electric_field_at(
-                    self.X[i, j], self.Y[i, j]
-                )
+        self.Ex, self.Ey = self.basis.field(self.trap.voltages)
 
         # Normalize field vectors using the dedicated method
         Ex_norm, Ey_norm = self.scale_field(self.Ex, self.Ey)
 
+        if self.norm is None:
+            self.quiver.set_UVC(Ex_norm, Ey_norm)
+            return
+
         # Update colors
         colors = self.calculate_field_colors()
 
         # Update quiver
         self.quiver.set_UVC(Ex_norm, Ey_norm, colors.flatten())
+
+    @property
+    def artists(self) -> list[Artist]:
+        """Artists changed by ``update``."""
+        return [self.quiver]
@@ -3,6 +3,7 @@
 from typing import Any
 
 import numpy as np
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
 from matplotlib.lines import Line2D
 from matplotlib.quiver import Quiver
@@ -70,31 +71,31 @@ class ParticleVisualizer:
 
     def update(
         self,
-        frame: int,
-        positions: NDArray[np.float64],
-        velocities: NDArray[np.float64],
-        a: float,
+        position: NDArray[np.float64],
+        velocity: NDArray[np.float64],
+        trail: NDArray[np.float64],
     ) -> None:
-        """Update particle visualization for the current frame."""
-        if frame == 0:
-            self.particle_dot.set_data([positions[0, 0]], [positions[0, 1]])
-            self.trajectory_line.set_data([], [])
-            return
-
-        x_traj, y_traj = positions[:frame, 0], positions[:frame, 1]
-        current_pos = positions[frame]
-        current_vel = velocities[frame]
-
-        self.particle_dot.set_data([current_pos[0]], [current_pos[1]])
-        self.trajectory_line.set_data(x_traj, y_traj)
+        """
+        Update particle visualization for the current frame.
+        :param position: Current particle position, shape (2,).
+        :param velocity: Current particle velocity, shape (2,).
+        :param trail: Trajectory drawn behind the particle, shape (k, 2).
+        """
+        self.particle_dot.set_data([position[0]], [position[1]])
+        self.trajectory_line.set_data(trail[:, 0], trail[:, 1])
 
         # Update velocity vector and text
-        velocity = np.linalg.norm(current_vel)
-        self.velocity_text.set_text(f"Speed: {velocity:.2f} m/s")
+        speed = np.linalg.norm(velocity)
+        self.velocity_text.set_text(f"Speed: {speed:.2f} m/s")
 
-        # if velocity > 0:
+        # if speed > 0:
         #     normalized_vel = (
-        #         current_vel / velocity * PLOT_CONFIG.velocity_arrow_size * a
+        #         velocity / speed * PLOT_CONFIG.velocity_arrow_size * a
         #     )
-        #     self.velocity_arrow.set_offsets([current_pos[0], current_pos[1]])
+        #     self.velocity_arrow.set_offsets([position[0], position[1]])
         #     self.velocity_arrow.set_UVC(normalized_vel[0], normalized_vel[1])
+
+    @property
+    def artists(self) -> list[Artist]:
+        """Artists changed by ``update``."""
+        return [self.particle_dot, self.trajectory_line, self.velocity_text]
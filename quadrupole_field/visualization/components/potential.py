@@ -0,0 +1,86 @@
+"""Electric potential map visualization component."""
+
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from matplotlib.image import AxesImage
+
+from quadrupole_field.core.field_basis import FieldBasis
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.utils.field_analysis import get_potential_basis, outside_rods
+from quadrupole_field.visualization.config import COLOR_CONFIG, PLOT_CONFIG
+
+
+class PotentialVisualizer:
+    """Electric potential map visualization component.
+
+    The potential is drawn as an image at ``PLOT_CONFIG.potential_resolution``
+    pixels per axis, composed from the cached per-rod unit potentials of
+    ``get_potential_basis``. Every frame writes it in place into the image data,
+    without allocating a new map. Points inside the rods are masked.
+    """
+
+    ax: Axes
+    trap: Trap
+    basis: FieldBasis
+    norm: Normalize
+    image: AxesImage
+    values: np.ma.MaskedArray  # Data of the image, updated in place
+
+    def __init__(self, ax: Axes, trap: Trap, a: float, norm: Normalize) -> None:
+        """
+        :param ax: Axes to draw into.
+        :param trap: Trap whose voltages to show.
+        :param a: Trap size parameter setting the map extent.
+        :param norm: Normalization of the potential to the colormap.
+        """
+        self.ax = ax
+        self.trap = trap
+        self.norm = norm
+        self.basis = get_potential_basis(trap, a)
+        self.setup_potential_map()
+
+    def setup_potential_map(self) -> None:
+        """Initialize the potential image."""
+        x, y = self.basis.x[0], self.basis.y[:, 0]
+        # Pixels are centered on the grid points
+        dx, dy = (x[1] - x[0]) / 2, (y[1] - y[0]) / 2
+        potential = np.ma.masked_array(
+            self.basis.potential_at(self.trap.voltages),
+            mask=~outside_rods(self.trap, self.basis.x, self.basis.y),
+        )
+        self.image = self.ax.imshow(
+            potential,
+            origin="lower",
+            extent=(x[0] - dx, x[-1] + dx, y[0] - dy, y[-1] + dy),
+            cmap=COLOR_CONFIG.colormap,
+            norm=self.norm,
+            interpolation=PLOT_CONFIG.potential_interpolation,
+            # Colormapping after resampling to screen pixels; the default colormaps
+            # the whole map first when it has nearly as many pixels as the screen,
+            # which took twice as long per frame for the same picture
+            interpolation_stage="data",
+            zorder=0,
+        )
+        values = self.image.get_array()
+        assert isinstance(values, np.ma.MaskedArray)
+        self.values = values
+        # Attached to a separate mappable, so that updating the image does not
+        # redraw the colorbar every frame
+        self.ax.figure.colorbar(
+            ScalarMappable(self.norm, COLOR_CONFIG.colormap),
+            ax=self.ax,
+            label="Electric Potential",
+        )
+
+    def update(self) -> None:
+        """Update the potential map for the current trap voltages."""
+        self.basis.potential_at(self.trap.voltages, out=self.values.data)
+        self.image.changed()
+
+    @property
+    def artists(self) -> list[Artist]:
+        """Artists changed by ``update``."""
+        return [self.image]
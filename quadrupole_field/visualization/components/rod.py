@@ -3,6 +3,7 @@
 from typing import Any
 
 import numpy as np
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
 from matplotlib.collections import PathCollection
 from matplotlib.colors import Normalize
@@ -27,11 +28,11 @@ class RodVisualizer:
 
     def setup_rods(self) -> None:
         """Initialize rod visualization."""
-        rod_positions = np.array([rod.position for rod in self.trap.rods])
+        rod_positions = self.trap.rod_positions
         self.rod_dots = self.ax.scatter(
             rod_positions[:, 0],
             rod_positions[:, 1],
-            c=[0, 0, 0, 0],  # Initial colors
+            c=np.zeros(self.trap.n_rods),  # Initial colors
             cmap=COLOR_CONFIG.colormap,
             norm=Normalize(
                 vmin=COLOR_CONFIG.voltage_range[0], vmax=COLOR_CONFIG.voltage_range[1]
@@ -43,3 +44,8 @@ class RodVisualizer:
     def update_colors(self, voltages: NDArray[np.float64]) -> None:
         """Update rod colors based on voltages."""
         self.rod_dots.set_array(voltages)
+
+    @property
+    def artists(self) -> list[Artist]:
+        """Artists changed by ``update_colors``."""
+        return [self.rod_dots]
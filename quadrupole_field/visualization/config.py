@@ -1,13 +1,21 @@
-"""Plot configuration settings."""
+"""Plot configuration settings.
 
-from dataclasses import dataclass, field
-from typing import Tuple
+Importing this module does not import matplotlib, so that headless runs can read
+the grid settings without loading any plotting code.
+"""
 
-from matplotlib.colors import LinearSegmentedColormap
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Tuple
 
+if TYPE_CHECKING:
+    from matplotlib.colors import LinearSegmentedColormap
 
-def create_electric_colormap() -> LinearSegmentedColormap:
+
+def create_electric_colormap() -> "LinearSegmentedColormap":
     """Create a blue-white-red colormap for electric potential visualization."""
+    from matplotlib.colors import LinearSegmentedColormap
+
     return LinearSegmentedColormap.from_list(
         "electric_potential",
         ["#2166AC", "white", "#B2182B"],  # Blue to White to Red
@@ -21,7 +29,6 @@ class PlotConfig:
     # Grid and Resolution
     field_resolution: int = 20  # Number of points in each direction for field grid
     field_extent_factor: float = 1.5  # Factor for field grid extent beyond rod distance
-    field_sampling_points: int = 20  # Number of time points to sample for max field
     min_distance_threshold: float = 1e-9  # Minimum distance to avoid singularities
     grid_density: int = 10  # Number of grid lines in each direction
 
@@ -35,8 +42,18 @@ class PlotConfig:
 
     # Trajectory Appearance
     trajectory_line_width: int = 1  # Width of the particle trajectory line
+    # Simulated seconds of trajectory trailing the particle, None for all of it.
+    # A bounded trail keeps the drawing cost of every frame the same.
+    trail_duration: float | None = 2.0
     particle_marker_size: int = 8  # Size of the particle marker
 
+    # Potential Map Appearance
+    show_potential_map: bool = True  # Draw the potential as an image behind arrows
+    # Number of pixels in each direction of the map. Drawing the map costs about the
+    # same at any resolution, as it is resampled to the screen pixels of the axes.
+    potential_resolution: int = 400
+    potential_interpolation: str = "nearest"  # Image interpolation of the map
+
     # Field Arrow Appearance
     quiver_alpha: float = 0.6  # Transparency of field arrows
     quiver_scale: int = 15  # Scaling factor for field arrow size
@@ -51,15 +68,20 @@ class PlotConfig:
     velocity_arrow_size: float = 0.2  # Size of velocity arrow relative to plot
 
     # Animation Settings
-    animation_interval: int = 20  # Milliseconds between frames
-    animation_fps: int = 30  # Frames per second for saved video
+    animation_blit: bool = True  # Redraw only the changing artists on screen
+    animation_fps: int = 30  # Frames per second, on screen and in saved video
     animation_bitrate: int = 2000  # Bitrate for video encoding
     animation_metadata_artist: str = "Paul Trap Simulation"  # Artist metadata for video
+    video_codec: str = "h264"  # ffmpeg video codec for saved video
+    video_segment_frames: int = 300  # Minimum frames per parallel video segment
 
     # Text Display
     velocity_text_x: float = 0.02  # X position of velocity text (figure coordinates)
     velocity_text_y: float = 0.98  # Y position of velocity text (figure coordinates)
     velocity_text_size: int = 10  # Font size for velocity text
+    time_text_x: float = 0.98  # X position of time text (axes coordinates)
+    time_text_y: float = 0.98  # Y position of time text (axes coordinates)
+    time_text_size: int = 10  # Font size for time text
 
 
 @dataclass
@@ -67,13 +89,13 @@ class ColorConfig:
     """Configuration for plot colors and color ranges."""
 
     # Color Maps
-    colormap: LinearSegmentedColormap = field(default_factory=create_electric_colormap)
     voltage_range: Tuple[float, float] = (-10, 10)  # Min/max voltage for color scaling
 
     # Element Colors
     particle_color: str = "black"  # Color of the particle marker
     trajectory_color: str = "black"  # Color of the trajectory line
     velocity_arrow_color: str = "black"  # Color of the velocity arrow
+    field_arrow_color: str = "black"  # Color of field arrows over the potential map
     grid_color: str = "gray"  # Color of the background grid
 
     # Text Colors
@@ -81,6 +103,11 @@ class ColorConfig:
     velocity_text_box_color: str = "white"  # Color of text background box
     velocity_text_box_alpha: float = 0.7  # Transparency of text background box
 
+    @cached_property
+    def colormap(self) -> "LinearSegmentedColormap":
+        """Colormap of the electric potential, created on first use."""
+        return create_electric_colormap()
+
 
 # Create instances
 PLOT_CONFIG = PlotConfig()
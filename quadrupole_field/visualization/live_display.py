@@ -0,0 +1,103 @@
+"""Animation of a simulation while it runs."""
+
+import math
+from typing import List
+
+from matplotlib.artist import Artist
+
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.simulation.live import LiveSimulation
+from quadrupole_field.simulation.schedule import VoltageSchedule
+from quadrupole_field.visualization.config import PLOT_CONFIG
+from quadrupole_field.visualization.paul_trap_display import PaulTrapVisualizer
+
+
+class LiveTrapVisualizer(PaulTrapVisualizer):
+    """Animates a ``LiveSimulation`` from its ring buffer while it runs.
+
+    Every frame advances the playback by ``playback_speed / animation_fps``
+    simulated seconds, but never beyond the latest sample: if the simulation falls
+    behind, playback waits for it rather than skipping ahead. Samples that have
+    left the trail are released to the simulation, which waits when the buffer is
+    full, so it never runs further ahead than the buffer holds. The animation has
+    no fixed end; closing its window stops the simulation.
+    """
+
+    live: LiveSimulation
+    trail_length: int  # Bounded, to leave room in the buffer for samples ahead
+    playback_time: float  # Simulation time of the current frame
+    current_frame: int | None  # Frame whose playback time is current
+
+    def __init__(
+        self,
+        live: LiveSimulation,
+        a: float,
+        trap: Trap,
+        dt: float,
+        schedule: VoltageSchedule,
+        start_time: float = 0.0,
+        max_field: float | None = None,
+        playback_speed: float = 1.0,
+    ) -> None:
+        """Initialize the visualizer on the ring buffer of a live simulation.
+
+        ``trap`` must not be the trap of the running simulation, since both set its
+        voltages. The field display is normalized from the schedule, since the
+        voltage history is not known in advance.
+        """
+        self.live = live
+        self.playback_time = start_time
+        self.current_frame = None
+        ring = live.ring
+        super().__init__(
+            positions=ring.view(ring.positions),
+            velocities=ring.view(ring.velocities),
+            voltages_history=ring.view(ring.voltages),
+            a=a,
+            trap=trap,
+            dt=dt,
+            schedule=schedule,
+            start_time=start_time,
+            max_field=max_field,
+            playback_speed=playback_speed,
+        )
+        # The trail must leave room in the buffer for the samples ahead of it
+        if self.trail_length is None or self.trail_length > ring.capacity // 2:
+            self.trail_length = ring.capacity // 2
+        self.fig.canvas.mpl_connect("close_event", lambda event: live.stop())
+
+    @property
+    def n_frames(self) -> int | None:
+        """Live animations run until their window is closed."""
+        return None
+
+    def time_at(self, frame: int) -> float:
+        """Simulation time of the current frame.
+
+        Live playback depends on how far the simulation has run, so the time is
+        only known for the frame being drawn.
+        """
+        return self.playback_time
+
+    def advance(self, frame: int) -> None:
+        """Move the playback to the given frame and release the samples behind it."""
+        ring = self.live.ring
+        if frame > 0:
+            latest = self.start_time + (len(ring) - 1) * self.dt
+            step = self.playback_speed / PLOT_CONFIG.animation_fps
+            self.playback_time = min(self.playback_time + step, latest)
+        index = math.floor(round((self.playback_time - self.start_time) / self.dt, 9))
+        ring.release(max(0, index - self.trail_length))
+
+    def update_frame(self, frame: int) -> List[Artist]:
+        """Update animation frame once the simulation has produced samples."""
+        # The first samples arrive after a chunk of steps. This runs on the GUI
+        # thread, so it waits for at most one frame and otherwise redraws unchanged.
+        if not len(self.live.ring) and not self.live.ring.wait(
+            1, timeout=1 / PLOT_CONFIG.animation_fps
+        ):
+            return self.artists
+        if frame != self.current_frame:
+            self.current_frame = frame
+            self.advance(frame)
+        return super().update_frame(frame)
@@ -1,63 +1,115 @@
 """Main visualization coordinator for the Paul trap simulation."""
 
-from typing import Any, List
+import math
+from typing import List, Protocol
 
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.animation import FFMpegWriter, FuncAnimation
+from matplotlib.animation import FuncAnimation
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
+from matplotlib.colors import Normalize
 from matplotlib.figure import Figure
+from matplotlib.text import Text
 from numpy.typing import NDArray
 
 from quadrupole_field.core.trap import Trap
-from quadrupole_field.utils.field_analysis import calculate_max_field_magnitude
+from quadrupole_field.simulation.schedule import VoltageSchedule
+from quadrupole_field.utils.field_analysis import (
+    calculate_max_field_magnitude,
+    calculate_max_potential,
+    schedule_max_field_magnitude,
+    schedule_max_potential,
+)
+from quadrupole_field.utils.profiling import PROFILER
 from quadrupole_field.visualization.components.field import FieldVisualizer
 from quadrupole_field.visualization.components.particle import ParticleVisualizer
+from quadrupole_field.visualization.components.potential import PotentialVisualizer
 from quadrupole_field.visualization.components.rod import RodVisualizer
 from quadrupole_field.visualization.config import COLOR_CONFIG, PLOT_CONFIG
 
 
+class SampleArray(Protocol):
+    """Recorded samples indexed by record, e.g. an array or a live ``RingView``."""
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int | slice) -> NDArray[np.float64]: ...
+
+
 class PaulTrapVisualizer:
     """Main visualization coordinator for the Paul trap simulation."""
 
     # Data arrays
-    positions: NDArray[np.float64]
-    velocities: NDArray[np.float64]
-    voltages_history: NDArray[np.float64]
+    positions: SampleArray
+    velocities: SampleArray
+    voltages_history: SampleArray
 
     # Physical parameters
     a: float
-    dt: float
+    dt: float  # Simulation time between samples
+    start_time: float
+    playback_speed: float  # Simulation seconds shown per second of animation
+    max_field: float  # Field magnitude at full arrow length
+    max_potential: float  # Potential magnitude at the ends of the colormap
     trap: Trap
+    schedule: VoltageSchedule | None
+    trail_length: int | None  # Number of past samples in the trail, None for all
 
     # Matplotlib objects
     fig: Figure
     ax: Axes
+    time_text: Text
 
     # Visualization components
+    potential_vis: PotentialVisualizer | None  # None without a potential map
+    overlay: List[Artist]  # Static artists redrawn over the potential map
     field_vis: FieldVisualizer
     particle_vis: ParticleVisualizer
     rod_vis: RodVisualizer
 
     def __init__(
         self,
-        positions: NDArray[np.float64],
-        velocities: NDArray[np.float64],
-        voltages_history: NDArray[np.float64],
+        positions: SampleArray,
+        velocities: SampleArray,
+        voltages_history: SampleArray,
         a: float,
         trap: Trap,
         dt: float,
+        schedule: VoltageSchedule | None = None,
+        start_time: float = 0.0,
+        max_field: float | None = None,
+        playback_speed: float = 1.0,
+        max_potential: float | None = None,
     ) -> None:
-        """Initialize the visualizer with simulation data."""
+        """Initialize the visualizer with simulation data.
+
+        If a voltage schedule is given, rod voltages are evaluated from it
+        analytically rather than read back from ``voltages_history``.
+        ``start_time`` is the simulation time of the first sample, which is
+        non-zero for runs resumed from a checkpoint. ``max_field`` and
+        ``max_potential`` normalize the field arrows and the potential colors;
+        they are calculated from the schedule amplitude, or else from
+        ``voltages_history``, if omitted.
+
+        The animation runs at ``PLOT_CONFIG.animation_fps`` and shows
+        ``playback_speed`` seconds of simulation time per second, independently of
+        the sample interval ``dt``: frames fall between samples, where the particle
+        state is interpolated.
+        """
         self.positions = positions
         self.velocities = velocities
         self.voltages_history = voltages_history
         self.a = a
         self.trap = trap
         self.dt = dt
+        self.start_time = start_time
+        self.schedule = schedule
+        self.playback_speed = playback_speed
 
-        self.setup_figure()
-        self.setup_visualizers()
+        with PROFILER.timer("figure_setup"):
+            self.setup_figure()
+            self.setup_visualizers(max_field, max_potential)
 
     def setup_figure(self) -> None:
         """Setup the plot."""
@@ -71,60 +123,234 @@ class PaulTrapVisualizer:
         self.ax.set_ylim(-limit, limit)
         self.ax.set_xlabel("x (m)")
         self.ax.set_ylabel("y (m)")
-        self.ax.set_title("Paul Trap Simulation (t = 0.00 s)")
+        self.ax.set_title("Paul Trap Simulation")
 
-    def setup_visualizers(self) -> None:
-        """Setup the visualization components."""
-        # Calculate maximum field magnitude for normalization
-        max_field = calculate_max_field_magnitude(
-            self.trap, self.voltages_history, self.a
+        # The time is drawn inside the axes, so that blitting can update it
+        self.time_text = self.ax.text(
+            PLOT_CONFIG.time_text_x,
+            PLOT_CONFIG.time_text_y,
+            f"t = {self.start_time:.2f} s",
+            transform=self.ax.transAxes,
+            horizontalalignment="right",
+            verticalalignment="top",
+            fontsize=PLOT_CONFIG.time_text_size,
         )
 
+    def setup_visualizers(
+        self, max_field: float | None = None, max_potential: float | None = None
+    ) -> None:
+        """Setup the visualization components."""
+        # Calculate maximum field magnitude and potential for normalization
+        with PROFILER.timer("max_field"):
+            if max_field is None:
+                if self.schedule is not None:
+                    max_field = schedule_max_field_magnitude(
+                        self.trap, self.schedule, self.a
+                    )
+                else:
+                    max_field = calculate_max_field_magnitude(
+                        self.trap, self.voltages_history[:], self.a
+                    )
+            if max_potential is None:
+                if self.schedule is not None:
+                    max_potential = schedule_max_potential(
+                        self.trap, self.schedule, self.a
+                    )
+                else:
+                    max_potential = calculate_max_potential(
+                        self.trap, self.voltages_history[:], self.a
+                    )
+
+        self.max_field = max_field
+        self.max_potential = max_potential
+        limit = max_potential if max_potential > 0 else 1.0
+        norm = Normalize(vmin=-limit, vmax=limit)
+
         # Initialize visualization components
-        self.field_vis = FieldVisualizer(self.ax, self.trap, self.a, max_field)
+        if PLOT_CONFIG.show_potential_map:
+            # The map shows the potential, so the arrows only show the field
+            self.potential_vis = PotentialVisualizer(self.ax, self.trap, self.a, norm)
+            self.field_vis = FieldVisualizer(self.ax, self.trap, self.a, max_field)
+            # The map fills the axes, so a blitted frame would paint it over the
+            # grid and the axes frame of the cached background
+            self.overlay = [
+                *self.ax.get_xgridlines(),
+                *self.ax.get_ygridlines(),
+                *self.ax.spines.values(),
+            ]
+        else:
+            self.potential_vis = None
+            self.overlay = []
+            self.field_vis = FieldVisualizer(
+                self.ax, self.trap, self.a, max_field, norm
+            )
+        self.trail_length = (
+            None
+            if PLOT_CONFIG.trail_duration is None
+            else math.ceil(PLOT_CONFIG.trail_duration / self.dt)
+        )
         self.particle_vis = ParticleVisualizer(self.ax)
         self.rod_vis = RodVisualizer(self.ax, self.trap)
 
-    def update_frame(self, frame: int) -> List[Any]:
-        """Update animation frame."""
-        # Update rod voltages first
-        voltages = self.voltages_history[frame]
-        self.trap.set_voltages(voltages)
+    @property
+    def n_frames(self) -> int | None:
+        """Number of animation frames needed to play back all samples.
 
-        # Update field (now with new voltages)
-        self.field_vis.update()
+        None for an animation without a fixed end, which runs until its window is
+        closed.
+        """
+        duration = (len(self.positions) - 1) * self.dt
+        # Rounded first, so that an exact multiple of the frame time is not lost
+        frames = round(duration * PLOT_CONFIG.animation_fps / self.playback_speed, 9)
+        return math.floor(frames) + 1
 
-        # Update particle and trajectory
-        self.particle_vis.update(frame, self.positions, self.velocities, self.a)
+    def time_at(self, frame: int) -> float:
+        """Simulation time of the given animation frame."""
+        return self.start_time + frame * self.playback_speed / PLOT_CONFIG.animation_fps
 
-        # Update rod colors
-        self.rod_vis.update_colors(voltages)
+    def sample_at(self, frame: int) -> tuple[int, float]:
+        """
+        Locate an animation frame between the recorded samples.
+        :param frame: Animation frame.
+        :return: Index of the sample at or before the frame, and the fraction of
+            the sample interval from it to the frame, in [0, 1).
+        """
+        position = (self.time_at(frame) - self.start_time) / self.dt
+        position = min(round(position, 9), len(self.positions) - 1)
+        index = math.floor(position)
+        return index, position - index
 
-        # Update title with current time
-        self.ax.set_title(f"Paul Trap Simulation (t = {frame * self.dt:.2f} s)")
+    def state_at(self, frame: int) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Particle position and velocity at an animation frame.
 
-        return []
+        Between samples, the position is the cubic Hermite interpolation of the
+        neighbouring positions and velocities, and the velocity its derivative, so
+        the interpolated path is smooth and matches the samples exactly.
+        """
+        index, s = self.sample_at(frame)
+        if s == 0:
+            return self.positions[index], self.velocities[index]
+        p0, p1 = self.positions[index], self.positions[index + 1]
+        v0, v1 = self.velocities[index] * self.dt, self.velocities[index + 1] * self.dt
+        position = (
+            (2 * s**3 - 3 * s**2 + 1) * p0
+            + (s**3 - 2 * s**2 + s) * v0
+            + (3 * s**2 - 2 * s**3) * p1
+            + (s**3 - s**2) * v1
+        )
+        velocity = (
+            (6 * s**2 - 6 * s) * (p0 - p1)
+            + (3 * s**2 - 4 * s + 1) * v0
+            + (3 * s**2 - 2 * s) * v1
+        ) / self.dt
+        return position, velocity
 
-    def animate(
-        self, save_video: bool = False, filename: str = "animation.mp4"
-    ) -> None:
-        """Create and display the animation."""
-        # Create animation
-        anim = FuncAnimation(
+    def trail_at(
+        self, frame: int, position: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        """Trajectory drawn behind the particle: past samples up to ``position``."""
+        index, _ = self.sample_at(frame)
+        start = 0 if self.trail_length is None else max(0, index - self.trail_length)
+        return np.vstack((self.positions[start : index + 1], position))
+
+    def voltages_at(self, frame: int) -> NDArray[np.float64]:
+        """Rod voltages for the given animation frame."""
+        if self.schedule is not None:
+            return self.schedule.voltages(self.time_at(frame))
+        index, s = self.sample_at(frame)
+        if s == 0:
+            return self.voltages_history[index]
+        v0, v1 = self.voltages_history[index], self.voltages_history[index + 1]
+        return (1 - s) * v0 + s * v1
+
+    @property
+    def artists(self) -> List[Artist]:
+        """Artists redrawn every frame, in drawing order; everything else is static.
+
+        These are the artists that change from frame to frame, plus the static
+        ``overlay`` that the potential map would otherwise cover.
+        """
+        artists = [
+            *(self.potential_vis.artists if self.potential_vis is not None else []),
+            *self.overlay,
+            *self.field_vis.artists,
+            *self.particle_vis.artists,
+            *self.rod_vis.artists,
+            self.time_text,
+        ]
+        # Blitting draws the artists in the given order
+        return sorted(artists, key=lambda artist: artist.get_zorder())
+
+    def init_frame(self) -> List[Artist]:
+        """Return the changing artists, which are left out of the cached background."""
+        return self.artists
+
+    def update_frame(self, frame: int) -> List[Artist]:
+        """Update animation frame and return the artists to redraw."""
+        with PROFILER.timer("frame_update"):
+            # Update rod voltages first
+            voltages = self.voltages_at(frame)
+            self.trap.set_voltages(voltages)
+
+            # Update potential and field (now with new voltages)
+            if self.potential_vis is not None:
+                self.potential_vis.update()
+            self.field_vis.update()
+
+            # Update particle and trajectory
+            position, velocity = self.state_at(frame)
+            self.particle_vis.update(position, velocity, self.trail_at(frame, position))
+
+            # Update rod colors
+            self.rod_vis.update_colors(voltages)
+
+            # Update current time
+            self.time_text.set_text(f"t = {self.time_at(frame):.2f} s")
+
+        PROFILER.count("frames")
+        return self.artists
+
+    def create_animation(self) -> FuncAnimation:
+        """Create the animation.
+
+        With ``PLOT_CONFIG.animation_blit``, the static background (grid, colorbar,
+        labels) is drawn once and cached, and each frame only redraws ``artists``
+        on top of it, so the cost per frame does not depend on the static content.
+        Only the frames needed for the playback speed are rendered, so the cost of
+        the animation depends on its duration rather than on the number of samples.
+        """
+        return FuncAnimation(
             self.fig,
             self.update_frame,
-            frames=len(self.positions),
-            interval=PLOT_CONFIG.animation_interval,
-            blit=False,
+            frames=self.n_frames,
+            init_func=self.init_frame,
+            interval=1000 / PLOT_CONFIG.animation_fps,
+            blit=PLOT_CONFIG.animation_blit,
+            # Frames are drawn from their index alone, there is no data to keep
+            cache_frame_data=False,
         )
 
+    def animate(
+        self,
+        save_video: bool = False,
+        filename: str = "animation.mp4",
+        show: bool = True,
+        video_workers: int | None = None,
+    ) -> None:
+        """Save the animation if requested and display it if ``show``.
+
+        Videos are rendered off-screen and encoded by ``video.save_video``, in
+        parallel segments on ``video_workers`` processes, all cores if omitted.
+        """
         if save_video:
-            writer = FFMpegWriter(
-                fps=PLOT_CONFIG.animation_fps,
-                metadata=dict(artist=PLOT_CONFIG.animation_metadata_artist),
-                bitrate=PLOT_CONFIG.animation_bitrate,
-            )
-            anim.save(filename, writer=writer)
+            # Imported here, since the video module builds on this one
+            from quadrupole_field.visualization.video import save_video as save
+
+            save(self, filename, video_workers)
             print(f"Video saved as {filename}")
 
-        plt.show()
+        if show:
+            # Kept referenced while shown, or the animation is garbage collected
+            anim = self.create_animation()
+            plt.show()
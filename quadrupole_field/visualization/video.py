@@ -0,0 +1,271 @@
+"""Video export by piping rendered frames to ffmpeg.
+
+Frames are rendered off-screen with Agg and their RGBA buffers are written
+straight to the standard input of an ffmpeg process, without intermediate image
+files. The static background (grid, colorbar, labels) is rendered once, and each
+frame only redraws the changing artists on top of it.
+
+Every frame of a ``PaulTrapVisualizer`` depends only on its index, so a long video
+is split into segments of consecutive frames that worker processes render and
+encode in parallel. The segments are independent streams with identical settings,
+which ffmpeg's concat demuxer joins without re-encoding.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from collections.abc import Generator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from quadrupole_field.utils.profiling import PROFILER
+from quadrupole_field.visualization.config import PLOT_CONFIG
+from quadrupole_field.visualization.paul_trap_display import PaulTrapVisualizer
+
+
+def ffmpeg_executable() -> str:
+    """
+    Locate ffmpeg, as configured by matplotlib's ``animation.ffmpeg_path``.
+    :raises RuntimeError: If ffmpeg cannot be found.
+    """
+    path = shutil.which(matplotlib.rcParams["animation.ffmpeg_path"])
+    if path is None:
+        raise RuntimeError(
+            "Saving video requires ffmpeg; install it or set matplotlib's "
+            "animation.ffmpeg_path"
+        )
+    return path
+
+
+def ffmpeg_command(filename: str | Path, width: int, height: int) -> list[str]:
+    """Command encoding raw RGBA frames from standard input into ``filename``."""
+    command = [
+        ffmpeg_executable(),
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgba",
+        "-s",
+        f"{width}x{height}",
+        "-r",
+        str(PLOT_CONFIG.animation_fps),
+        "-i",
+        "-",
+        "-vcodec",
+        PLOT_CONFIG.video_codec,
+        "-pix_fmt",
+        "yuv420p",
+        "-b:v",
+        f"{PLOT_CONFIG.animation_bitrate}k",
+        "-metadata",
+        f"artist={PLOT_CONFIG.animation_metadata_artist}",
+    ]
+    if width % 2 or height % 2:
+        # yuv420p needs even dimensions
+        command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+    return command + [str(filename)]
+
+
+def render_frames(
+    visualizer: PaulTrapVisualizer, frames: range
+) -> Generator[memoryview, None, None]:
+    """
+    Render animation frames off-screen.
+
+    The yielded buffer is reused: it is only valid until the next frame is
+    rendered.
+    :param visualizer: Visualizer whose frames to render.
+    :param frames: Animation frames to render.
+    :return: Iterator over the RGBA pixel buffer of each frame.
+    """
+    fig = visualizer.fig
+    canvas = fig.canvas
+    if not isinstance(canvas, FigureCanvasAgg):
+        canvas = FigureCanvasAgg(fig)
+    # Drawn in z-order, as by a figure draw
+    artists = sorted(visualizer.artists, key=lambda artist: artist.get_zorder())
+    animated = [artist.get_animated() for artist in artists]
+    try:
+        # Render the background without the changing artists, once
+        for artist in artists:
+            artist.set_animated(True)
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+        for frame in frames:
+            visualizer.update_frame(frame)
+            canvas.restore_region(background)
+            for artist in artists:
+                fig.draw_artist(artist)
+            yield canvas.buffer_rgba()
+    finally:
+        for artist, was_animated in zip(artists, animated):
+            artist.set_animated(was_animated)
+
+
+def encode(visualizer: PaulTrapVisualizer, frames: range, filename: str | Path) -> None:
+    """
+    Render frames and encode them into a video file with a single ffmpeg process.
+    :param visualizer: Visualizer whose frames to render.
+    :param frames: Animation frames to encode.
+    :param filename: Output video file.
+    :raises ValueError: If there are no frames, as ffmpeg would write no file.
+    :raises RuntimeError: If ffmpeg fails.
+    """
+    if not frames:
+        raise ValueError("A video needs at least one frame.")
+    buffers = render_frames(visualizer, frames)
+    first = next(buffers)
+    height, width = np.asarray(first).shape[:2]
+    process = subprocess.Popen(
+        ffmpeg_command(filename, width, height),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    assert process.stdin is not None
+    try:
+        process.stdin.write(first)
+        for buffer in buffers:
+            process.stdin.write(buffer)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its error is reported below
+    finally:
+        buffers.close()
+    _, errors = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed with exit code {process.returncode}:\n"
+            f"{errors.decode(errors='replace')}"
+        )
+
+
+def _scene(visualizer: PaulTrapVisualizer) -> dict[str, Any]:
+    """Arguments rebuilding ``visualizer`` in another process."""
+    return dict(
+        positions=visualizer.positions,
+        velocities=visualizer.velocities,
+        voltages_history=visualizer.voltages_history,
+        a=visualizer.a,
+        trap=visualizer.trap,
+        dt=visualizer.dt,
+        schedule=visualizer.schedule,
+        start_time=visualizer.start_time,
+        max_field=visualizer.max_field,
+        max_potential=visualizer.max_potential,
+        playback_speed=visualizer.playback_speed,
+    )
+
+
+def _encode_segment(
+    scene: dict[str, Any], start: int, stop: int, filename: str
+) -> None:
+    """Encode one segment in a worker process."""
+    import matplotlib.pyplot as plt
+
+    plt.switch_backend("Agg")
+    visualizer = PaulTrapVisualizer(**scene)
+    try:
+        encode(visualizer, range(start, stop), filename)
+    finally:
+        plt.close(visualizer.fig)
+
+
+def concatenate(segments: Sequence[str | Path], filename: str | Path) -> None:
+    """
+    Join video segments with identical encoding settings without re-encoding.
+    :raises RuntimeError: If ffmpeg fails.
+    """
+    segments_dir = Path(segments[0]).parent
+    listing = segments_dir / "segments.txt"
+    listing.write_text(
+        "".join(f"file '{Path(segment).resolve()}'\n" for segment in segments)
+    )
+    result = subprocess.run(
+        [
+            ffmpeg_executable(),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(listing),
+            "-c",
+            "copy",
+            str(filename),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            "ffmpeg failed to concatenate segments:\n"
+            f"{result.stderr.decode(errors='replace')}"
+        )
+
+
+def save_video(
+    visualizer: PaulTrapVisualizer,
+    filename: str | Path,
+    workers: int | None = None,
+) -> None:
+    """
+    Save the animation of a visualizer as a video file.
+
+    Videos of at least two ``PLOT_CONFIG.video_segment_frames`` frames are split
+    into segments that are rendered and encoded in parallel, then concatenated.
+    :param visualizer: Visualizer whose animation to save.
+    :param filename: Output video file; its extension selects the container.
+    :param workers: Number of worker processes, all cores if omitted; 1 encodes
+        the whole video in the current process.
+    :raises ValueError: If the animation has no fixed end or no frames.
+    """
+    n_frames = visualizer.n_frames
+    if n_frames is None:
+        raise ValueError("Only animations with a fixed end can be saved as video.")
+    if n_frames < 1:
+        raise ValueError("The animation has no frames to save as video.")
+    ffmpeg_executable()
+    workers = workers if workers is not None else os.cpu_count() or 1
+    n_segments = min(workers, n_frames // PLOT_CONFIG.video_segment_frames)
+
+    with PROFILER.timer("video_save"):
+        if n_segments <= 1:
+            encode(visualizer, range(n_frames), filename)
+        else:
+            scene = _scene(visualizer)
+            bounds = np.linspace(0, n_frames, n_segments + 1).round().astype(int)
+            suffix = Path(filename).suffix
+            with tempfile.TemporaryDirectory(
+                dir=Path(filename).resolve().parent
+            ) as directory:
+                segments = [
+                    os.path.join(directory, f"segment_{index:04d}{suffix}")
+                    for index in range(n_segments)
+                ]
+                # Spawned workers, so that no GUI state of this process is inherited
+                with ProcessPoolExecutor(
+                    n_segments, mp_context=get_context("spawn")
+                ) as executor:
+                    futures = [
+                        executor.submit(_encode_segment, scene, start, stop, segment)
+                        for start, stop, segment in zip(
+                            bounds[:-1], bounds[1:], segments
+                        )
+                    ]
+                    for future in futures:
+                        future.result()
+                concatenate(segments, filename)
+    PROFILER.count("bytes_written", os.path.getsize(filename))
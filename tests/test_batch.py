@@ -0,0 +1,75 @@
+"""Manifest validation and crash recovery of the batch runner."""
+
+import multiprocessing
+import os
+
+import pytest
+
+import quadrupole_field.main
+from quadrupole_field.batch import load_jobs, run_batch, run_job
+
+
+def test_section_that_is_not_a_table_is_reported():
+    manifest = {"jobs": [{"name": "a", "trap": 3}, {"name": "b"}]}
+    with pytest.raises(ValueError, match="a: trap must be a table"):
+        load_jobs(manifest)
+
+
+def test_output_paths_shared_through_defaults_are_rejected():
+    manifest = {
+        "defaults": {"output": {"checkpoint_file": "run.ckpt"}},
+        "jobs": [{"name": "a"}, {"name": "b"}],
+    }
+    with pytest.raises(ValueError, match="b: output.checkpoint_file 'run.ckpt'"):
+        load_jobs(manifest)
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="workers must inherit the patched simulation",
+)
+def test_jobs_are_resubmitted_after_a_worker_dies(tmp_path, monkeypatch):
+    crash_marker = tmp_path / "crashed"
+
+    def run_simulation(*configs):
+        # Kill the first worker to pick up a job, as the out-of-memory killer would
+        if not crash_marker.exists():
+            crash_marker.touch()
+            os._exit(1)
+
+    monkeypatch.setattr(quadrupole_field.main, "run_simulation", run_simulation)
+    jobs = load_jobs({"jobs": [{"name": "a"}, {"name": "b"}, {"name": "c"}]})
+    results = run_batch(jobs, tmp_path, max_workers=2, retries=1)
+    assert [result.status for result in results] == ["ok", "ok", "ok"]
+
+
+def test_options_rejected_at_run_time_are_rejected_up_front():
+    manifest = {
+        "jobs": [
+            {"name": "a", "output": {"live": True}},
+            {
+                "name": "b",
+                "simulation": {"dimensionless": True},
+                "output": {"checkpoint_file": "b.ckpt"},
+            },
+        ]
+    }
+    with pytest.raises(ValueError) as error:
+        load_jobs(manifest)
+    assert "a: output.live" in str(error.value)
+    assert "b: simulation.dimensionless" in str(error.value)
+
+
+@pytest.mark.parametrize(
+    "exception, attempts", [(ValueError("bad"), 1), (OSError("disk full"), 3)]
+)
+def test_only_transient_errors_are_retried(tmp_path, monkeypatch, exception, attempts):
+    def run_simulation(*configs):
+        raise exception
+
+    monkeypatch.setattr(quadrupole_field.main, "run_simulation", run_simulation)
+    (job,) = load_jobs({"jobs": [{"name": "a"}]})
+    result = run_job(job, str(tmp_path), retries=2)
+    assert result.status == "failed"
+    assert result.attempts == attempts
+    assert result.error == f"{type(exception).__name__}: {exception}"
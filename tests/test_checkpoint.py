@@ -0,0 +1,129 @@
+"""Resuming a checkpointed run must reproduce the uninterrupted run."""
+
+import signal
+import threading
+
+import numpy as np
+import pytest
+
+from quadrupole_field.main import stream_to_disk
+from quadrupole_field.simulation.checkpoint import (
+    Checkpointer,
+    load_checkpoint,
+    save_checkpoint,
+)
+from quadrupole_field.simulation.config import OutputConfig, SimulationConfig
+from quadrupole_field.simulation.output import (
+    ChunkedTrajectoryWriter,
+    load_trajectory,
+    read_manifest,
+)
+from quadrupole_field.simulation.schedule import SineSchedule
+from quadrupole_field.simulation.simulation import Simulation
+
+CHUNK_SIZE = 100
+
+
+def make_run() -> tuple[Simulation, SineSchedule]:
+    simulation = Simulation(
+        a=1.0,
+        charge=1.0,
+        mass=1.0,
+        initial_position=(0.05, 0.05),
+        initial_velocity=(-0.25, 0.25),
+        dt=0.001,
+    )
+    schedule = SineSchedule(50.0, 5.0, simulation.trap.polarity)
+    return simulation, schedule
+
+
+@pytest.mark.parametrize("record_stride", [1, 3])
+def test_resume_matches_uninterrupted_run(tmp_path, record_stride):
+    sim_config = SimulationConfig(total_time=1.0, record_stride=record_stride)
+
+    simulation, schedule = make_run()
+    stream_to_disk(
+        simulation,
+        schedule,
+        sim_config,
+        OutputConfig(trajectory_dir=str(tmp_path / "full"), chunk_size=CHUNK_SIZE),
+    )
+
+    # Checkpoint after the second chunk, then crash after the fourth
+    checkpoint = tmp_path / "checkpoint.npz"
+    simulation, schedule = make_run()
+    writer = ChunkedTrajectoryWriter(tmp_path / "resumed")
+    chunks = simulation.iter_chunks(
+        schedule, sim_config.total_time, record_stride, CHUNK_SIZE
+    )
+    for index, chunk in enumerate(chunks):
+        writer.write(chunk)
+        if index == 1:
+            save_checkpoint(checkpoint, simulation, schedule)
+        if index == 3:
+            break
+
+    simulation, schedule, _ = load_checkpoint(checkpoint)
+    stream_to_disk(
+        simulation,
+        schedule,
+        sim_config,
+        OutputConfig(
+            trajectory_dir=str(tmp_path / "resumed"),
+            chunk_size=CHUNK_SIZE,
+            resume_from=str(checkpoint),
+        ),
+    )
+
+    full = read_manifest(tmp_path / "full")
+    resumed = read_manifest(tmp_path / "resumed")
+    assert resumed["complete"]
+    assert resumed["n_records"] == full["n_records"]
+    for expected, actual in zip(
+        load_trajectory(tmp_path / "full"), load_trajectory(tmp_path / "resumed")
+    ):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_truncate_rewrites_straddling_chunk(tmp_path):
+    simulation, schedule = make_run()
+    with ChunkedTrajectoryWriter(tmp_path) as writer:
+        for chunk in simulation.iter_chunks(schedule, 0.25, chunk_size=CHUNK_SIZE):
+            writer.write(chunk)
+        expected = load_trajectory(tmp_path)
+        writer.truncate(150)
+
+    assert read_manifest(tmp_path)["n_records"] == 150
+    assert len(read_manifest(tmp_path)["chunks"]) == 2
+    assert sorted(path.name for path in tmp_path.glob("chunk_*")) == [
+        "chunk_000000.npz",
+        "chunk_000001.npz",
+    ]
+    for full, truncated in zip(expected, load_trajectory(tmp_path)):
+        np.testing.assert_array_equal(truncated, full[:150])
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="needs SIGUSR1")
+def test_checkpointer_restores_signal_handler(tmp_path):
+    simulation, schedule = make_run()
+    previous = signal.getsignal(signal.SIGUSR1)
+    with Checkpointer(tmp_path / "checkpoint.npz", schedule) as checkpointer:
+        signal.raise_signal(signal.SIGUSR1)
+        assert checkpointer.due()
+    assert signal.getsignal(signal.SIGUSR1) is previous
+
+
+def test_checkpointer_off_main_thread_saves_periodically(tmp_path):
+    simulation, schedule = make_run()
+    checkpointers = []
+
+    def create():
+        checkpointers.append(
+            Checkpointer(tmp_path / "checkpoint.npz", schedule, interval=0.0)
+        )
+
+    thread = threading.Thread(target=create)
+    thread.start()
+    thread.join()
+    assert len(checkpointers) == 1
+    assert checkpointers[0].due()
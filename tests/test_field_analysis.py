@@ -0,0 +1,31 @@
+"""The maximum potential must hold for voltage histories of any shape."""
+
+import numpy as np
+
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.utils.field_analysis import (
+    calculate_max_potential,
+    get_potential_basis,
+    outside_rods,
+)
+
+
+def exact_max_potential(trap, voltages_history, a):
+    basis = get_potential_basis(trap, a)
+    mask = outside_rods(trap, basis.x, basis.y)
+    return max(
+        float(np.nanmax(np.abs(basis.potential_at(voltages))[mask]))
+        for voltages in voltages_history
+    )
+
+
+def test_max_potential_of_rotating_voltages():
+    # Not a multiple of one pattern, so the step with the largest voltage is not
+    # necessarily the one with the largest potential
+    trap = Trap(1.0)
+    phase = np.linspace(0, 9, 200)[:, np.newaxis] + np.arange(4) * np.pi / 2
+    voltages_history = 50 * np.cos(phase)
+    assert np.isclose(
+        calculate_max_potential(trap, voltages_history, 1.0),
+        exact_max_potential(trap, voltages_history, 1.0),
+    )
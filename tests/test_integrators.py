@@ -0,0 +1,86 @@
+"""Integrators against the exact solution of a harmonic oscillator."""
+
+import numpy as np
+import pytest
+
+from quadrupole_field.core.integrators import (
+    INTEGRATORS,
+    VelocityVerletIntegrator,
+    get_integrator,
+)
+
+
+def spring(position, t):
+    return -position
+
+
+def integrate(name, dt, duration=2.0):
+    integrator = get_integrator(name, tolerance=1e-10)
+    position = np.array([[1.0, 0.0], [0.0, 0.5]])
+    velocity = np.array([[0.0, 1.0], [-0.5, 0.0]])
+    n_steps = round(duration / dt)
+    for step in range(n_steps):
+        position, velocity = integrator.step(position, velocity, step * dt, dt, spring)
+    time = n_steps * dt
+    # x(t) = x0 cos t + v0 sin t for unit angular frequency
+    exact = np.array([[1.0, 0.0], [0.0, 0.5]]) * np.cos(time) + np.array(
+        [[0.0, 1.0], [-0.5, 0.0]]
+    ) * np.sin(time)
+    return float(np.max(np.abs(position - exact)))
+
+
+@pytest.mark.parametrize("name", ["verlet", "yoshida4"])
+def test_convergence_order(name):
+    order = get_integrator(name).order
+    coarse = integrate(name, 0.1)
+    fine = integrate(name, 0.05)
+    assert np.log2(coarse / fine) == pytest.approx(order, abs=0.2)
+
+
+def test_euler_cromer_converges():
+    assert integrate("euler_cromer", 0.005) < integrate("euler_cromer", 0.01) < 0.1
+
+
+@pytest.mark.parametrize("name", ["rk45", "dop853"])
+def test_adaptive_meets_tolerance(name):
+    # The output interval is far larger than any stable fixed step
+    assert integrate(name, 0.5) < 1e-7
+
+
+def test_symplectic_energy_is_bounded():
+    integrator = get_integrator("yoshida4")
+    position, velocity = np.array([1.0, 0.0]), np.array([0.0, 1.0])
+    dt = 0.2
+    energies = []
+    for step in range(5000):
+        position, velocity = integrator.step(position, velocity, step * dt, dt, spring)
+        energies.append(0.5 * (position @ position + velocity @ velocity))
+    assert np.ptp(energies) < 1e-3
+
+
+def test_verlet_reuses_acceleration_only_for_its_own_output():
+    calls = []
+
+    def counting_spring(position, t):
+        calls.append(t)
+        return -position
+
+    integrator = VelocityVerletIntegrator()
+    position, velocity = np.array([1.0, 0.0]), np.array([0.0, 1.0])
+    position, velocity = integrator.step(position, velocity, 0.0, 0.1, counting_spring)
+    integrator.step(position, velocity, 0.1, 0.1, counting_spring)
+    assert len(calls) == 3
+
+    # A different starting state must not pick up the cached acceleration
+    moved = position + 0.5
+    cached = integrator.step(moved, velocity, 0.2, 0.1, counting_spring)
+    fresh = VelocityVerletIntegrator().step(moved, velocity, 0.2, 0.1, spring)
+    np.testing.assert_array_equal(cached[0], fresh[0])
+    np.testing.assert_array_equal(cached[1], fresh[1])
+
+
+def test_get_integrator_names():
+    for name in INTEGRATORS:
+        assert get_integrator(name).name == name
+    with pytest.raises(ValueError, match="Unknown integrator"):
+        get_integrator("leapfrog")
@@ -0,0 +1,39 @@
+"""The live animation must never block the GUI thread on the simulation."""
+
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.simulation.live import LiveSimulation
+from quadrupole_field.simulation.schedule import SineSchedule
+from quadrupole_field.simulation.simulation import Simulation
+from quadrupole_field.visualization.config import PLOT_CONFIG
+from quadrupole_field.visualization.live_display import LiveTrapVisualizer
+
+
+def test_frame_without_samples_waits_one_frame_at_most():
+    simulation = Simulation(
+        a=1.0,
+        charge=1.0,
+        mass=1.0,
+        initial_position=(0.05, 0.05),
+        initial_velocity=(0.0, 0.0),
+        dt=0.001,
+    )
+    schedule = SineSchedule(50.0, 5.0, simulation.trap.polarity)
+    # Never started, so no samples ever arrive
+    live = LiveSimulation(simulation, schedule)
+    visualizer = LiveTrapVisualizer(
+        live, 1.0, Trap(1.0), simulation.dt, schedule, max_field=1.0
+    )
+
+    start = time.perf_counter()
+    artists = visualizer.update_frame(0)
+    elapsed = time.perf_counter() - start
+
+    assert artists == visualizer.artists
+    assert visualizer.current_frame is None
+    assert elapsed < 5 / PLOT_CONFIG.animation_fps
@@ -0,0 +1,81 @@
+"""Mathieu stability lookups against the Hill determinant and known points."""
+
+import numpy as np
+import pytest
+
+from quadrupole_field.utils import mathieu
+from quadrupole_field.utils.mathieu import (
+    characteristic_exponent,
+    cos_pi_beta,
+    hill_cos_pi_beta,
+    is_stable,
+)
+
+# Edge of the first stability region on the a = 0 axis
+Q_EDGE = 0.908046
+
+
+@pytest.mark.parametrize(
+    "a, q",
+    [
+        (0.1, 0.5),  # Inside the table
+        (0.0, 2.0),  # q beyond the table
+        (1.5, 0.2),  # a beyond the table
+        ([0.1, -0.3, 0.0, 1.5], [0.5, 1.2, 2.0, 0.2]),  # Mixed
+    ],
+)
+def test_lookup_matches_hill_determinant(a, q):
+    expected = hill_cos_pi_beta(a, q)
+    actual = cos_pi_beta(a, q)
+    assert np.shape(actual) == np.shape(expected)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
+
+
+def test_interpolation_between_grid_points():
+    rng = np.random.default_rng(0)
+    a = rng.uniform(-1, 1, 500)
+    q = rng.uniform(0, 1.5, 500)
+    np.testing.assert_allclose(cos_pi_beta(a, q), hill_cos_pi_beta(a, q), atol=1e-9)
+
+
+def test_stability_edge_on_a_zero_axis():
+    assert is_stable(0.0, Q_EDGE - 1e-3)
+    assert not is_stable(0.0, Q_EDGE + 1e-3)
+    np.testing.assert_array_equal(
+        is_stable(0.0, [0.3, Q_EDGE - 1e-3, Q_EDGE + 1e-3, 2.0]),
+        [True, True, False, False],
+    )
+
+
+def test_stability_outside_the_table():
+    assert not is_stable(0.0, 2.0)
+    assert not is_stable(1.5, 0.2)
+
+
+def test_characteristic_exponent():
+    # Without RF drive the motion is harmonic with β = √a
+    np.testing.assert_allclose(characteristic_exponent(0.25, 0.0), 0.5, atol=1e-9)
+    # Adiabatic approximation β ≈ q/√2 for small q
+    np.testing.assert_allclose(
+        characteristic_exponent(0.0, 0.05), 0.05 / np.sqrt(2), rtol=1e-3
+    )
+    assert np.isnan(characteristic_exponent(0.0, Q_EDGE + 1e-3))
+
+
+def test_table_is_cached_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUADRUPOLE_FIELD_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(mathieu, "TABLE_A_GRID", (-1.0, 1.0, 41))
+    monkeypatch.setattr(mathieu, "TABLE_Q_GRID", (0.0, 1.5, 31))
+    mathieu._bicubic_coefficients.cache_clear()
+    try:
+        built = cos_pi_beta(0.1, 0.5)
+        assert len(list(tmp_path.glob("mathieu_table_*.npy"))) == 1
+
+        def fail(a, q):
+            raise AssertionError("table rebuilt instead of loaded")
+
+        mathieu._bicubic_coefficients.cache_clear()
+        monkeypatch.setattr(mathieu, "hill_cos_pi_beta", fail)
+        assert cos_pi_beta(0.1, 0.5) == built
+    finally:
+        mathieu._bicubic_coefficients.cache_clear()
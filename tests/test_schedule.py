@@ -0,0 +1,42 @@
+"""Voltage schedules must survive a round trip through their dictionary form."""
+
+import json
+
+import numpy as np
+import pytest
+
+from quadrupole_field.simulation.schedule import (
+    PiecewiseSchedule,
+    RFDCSchedule,
+    SineSchedule,
+    SquareWaveSchedule,
+    schedule_from_dict,
+)
+
+POLARITY = [1.0, -1.0, 1.0, -1.0]
+
+SCHEDULES = [
+    RFDCSchedule(50.0, 5.0, POLARITY, dc_offset=3.0, phase=0.25),
+    SineSchedule(50.0, 5.0, POLARITY, phase=0.5),
+    SquareWaveSchedule(40.0, 2.0, POLARITY, duty_cycle=0.3, dc_offset=-1.0),
+    PiecewiseSchedule([0.0, 0.1, 0.3], [0.0, 20.0, -5.0], POLARITY),
+    PiecewiseSchedule([0.0, 0.1, 0.3], [0.0, 20.0, -5.0], POLARITY, periodic=True),
+]
+
+
+@pytest.mark.parametrize("schedule", SCHEDULES, ids=lambda s: type(s).__name__)
+def test_round_trip(schedule):
+    data = json.loads(json.dumps(schedule.to_dict()))
+    restored = schedule_from_dict(data)
+
+    assert type(restored) is type(schedule)
+    assert restored.to_dict() == schedule.to_dict()
+    assert restored.period == schedule.period
+    assert restored.amplitude == schedule.amplitude
+    times = np.linspace(-0.2, 1.3, 301)
+    np.testing.assert_array_equal(restored.voltages(times), schedule.voltages(times))
+
+
+def test_unknown_type():
+    with pytest.raises(ValueError, match="Unknown voltage schedule type"):
+        schedule_from_dict({"type": "triangle", "polarity": POLARITY})
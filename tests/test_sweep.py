@@ -0,0 +1,31 @@
+"""Sweeps batch grid points into ensembles without changing their outcome."""
+
+import numpy as np
+
+from quadrupole_field.simulation.sweep import SweepSettings, run_stability_sweep
+
+SETTINGS = SweepSettings(n_periods=10, steps_per_period=32)
+
+
+def test_batched_grid_matches_single_points():
+    rf_amplitudes = [20.0, 120.0, 400.0]
+    dc_offsets = [-10.0, 0.0]
+    charge_to_mass = [0.5, 1.0]
+    result = run_stability_sweep(
+        rf_amplitudes,
+        dc_offsets,
+        charge_to_mass=charge_to_mass,
+        settings=SETTINGS,
+        max_workers=1,
+    )
+    assert result.survival_time.shape == (3, 2, 1, 2)
+    for i, rf in enumerate(rf_amplitudes):
+        for j, dc in enumerate(dc_offsets):
+            for k, ratio in enumerate(charge_to_mass):
+                single = run_stability_sweep(
+                    rf, dc, charge_to_mass=ratio, settings=SETTINGS, max_workers=1
+                )
+                assert single.loss_reason[0, 0, 0, 0] == result.loss_reason[i, j, 0, k]
+                np.testing.assert_allclose(
+                    single.survival_time[0, 0, 0, 0], result.survival_time[i, j, 0, k]
+                )
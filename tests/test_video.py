@@ -0,0 +1,36 @@
+"""Video export must fail clearly instead of writing nothing."""
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+
+from quadrupole_field.core.trap import Trap
+from quadrupole_field.visualization.paul_trap_display import PaulTrapVisualizer
+from quadrupole_field.visualization.video import encode, save_video
+
+
+def make_visualizer(n_samples):
+    return PaulTrapVisualizer(
+        np.zeros((n_samples, 2)),
+        np.zeros((n_samples, 2)),
+        np.zeros((n_samples, 4)),
+        a=1.0,
+        trap=Trap(1.0),
+        dt=0.01,
+        max_field=1.0,
+        max_potential=1.0,
+    )
+
+
+def test_animation_without_frames_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="no frames"):
+        save_video(make_visualizer(0), tmp_path / "empty.mp4")
+    assert not (tmp_path / "empty.mp4").exists()
+
+
+def test_empty_frame_range_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="at least one frame"):
+        encode(make_visualizer(10), range(0), tmp_path / "empty.mp4")